@@ -0,0 +1,129 @@
+"""
+Fingerprinted static assets
+
+Every file in the static directory is published under a name that includes
+a hash of its content (e.g. /static/images/logo.3f2a9c1d.svg), so it can be
+served with long-lived immutable cache headers. Only the files listed in
+config.STATIC_PLAIN_NAMES keep their original names as well, for links from
+outside the site.
+
+The mapping from logical URLs to fingerprinted URLs is written to
+asset-manifest.json in the output directory. Templates resolve URLs through
+the asset_url filter and global, and asset URLs in frontmatter are
+rewritten before rendering.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from build_manifest import file_digest
+from site_output import write_file_if_changed
+
+# URL prefix of the static directory in the output
+STATIC_URL_PREFIX = '/static/'
+
+# Written to the root of the output directory
+MANIFEST_NAME = 'asset-manifest.json'
+
+# Asset URLs of this process in both directions, see set_asset_manifest()
+_assets = {}
+_sources = {}
+
+# Static and fingerprinted URLs looked up since the last pop_resolved_assets()
+_resolved = set()
+
+
+def fingerprint_name(name, digest):
+    """Insert the first 8 digits of digest before a file name's extension"""
+    stem, dot, suffix = name.rpartition('.')
+    if not dot or not stem:
+        return f'{name}.{digest[:8]}'
+    return f'{stem}.{digest[:8]}.{suffix}'
+
+
+def build_asset_manifest(static_dir, cache_path):
+    """
+    Return {logical URL: fingerprinted URL} for every file in static_dir
+
+    File digests are kept in cache_path by (mtime_ns, size), so unchanged
+    files are not read again.
+    """
+    static_dir = Path(static_dir)
+    cache_path = Path(cache_path)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cached = {}
+
+    digests = {}
+    assets = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        rel_root = Path(root).relative_to(static_dir)
+        for name in sorted(files):
+            rel_path = (rel_root / name).as_posix()
+            st = os.stat(os.path.join(root, name))
+            signature = [st.st_mtime_ns, st.st_size]
+            entry = cached.get(rel_path)
+            if entry and entry[0] == signature:
+                digest = entry[1]
+            else:
+                digest = file_digest(os.path.join(root, name))
+            digests[rel_path] = [signature, digest]
+            fingerprinted = (rel_root / fingerprint_name(name, digest)).as_posix()
+            assets[STATIC_URL_PREFIX + rel_path] = STATIC_URL_PREFIX + fingerprinted
+
+    write_file_if_changed(cache_path, json.dumps(digests, sort_keys=True).encode('utf-8'))
+    return assets
+
+
+def write_asset_manifest(output, assets):
+    """Write asset-manifest.json into the output sink; return True if it changed"""
+    data = json.dumps(assets, indent=2, sort_keys=True) + '\n'
+    return output.write(MANIFEST_NAME, data.encode('utf-8'))
+
+
+def set_asset_manifest(assets):
+    """Use assets ({logical URL: fingerprinted URL}) to resolve asset URLs in this process"""
+    _assets.clear()
+    _assets.update(assets)
+    _sources.clear()
+    _sources.update((fingerprinted, url) for url, fingerprinted in assets.items())
+    _resolved.clear()
+
+
+def asset_url(url):
+    """Template filter and global: return the fingerprinted URL of an asset"""
+    if url in _assets or isinstance(url, str) and url.startswith(STATIC_URL_PREFIX):
+        _resolved.add(url)
+    return _assets.get(url, url)
+
+
+def pop_resolved_assets():
+    """
+    Return {URL: fingerprinted URL or None} of the URLs looked up since the last call
+
+    Pages record the assets they link to, so a changed static file only
+    invalidates the pages that use it.
+    """
+    resolved = {url: _assets.get(url) for url in sorted(_resolved)}
+    _resolved.clear()
+    return resolved
+
+
+def asset_source_url(url):
+    """Return the logical URL of a fingerprinted asset URL"""
+    return _sources.get(url, url)
+
+
+def rewrite_asset_urls(value):
+    """Return a copy of a frontmatter value with asset URLs replaced by fingerprinted URLs"""
+    if isinstance(value, dict):
+        return {key: rewrite_asset_urls(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rewrite_asset_urls(item) for item in value]
+    if isinstance(value, str):
+        return asset_url(value)
+    return value
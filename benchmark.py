@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Summarum site generator
+
+Generates a synthetic content corpus of configurable size, then times
+generate_site.py on it in separate processes:
+
+- cold:        no output directory and no build caches
+- warm:        full rebuild with warm caches
+- noop:        incremental rebuild with nothing changed
+- incremental: incremental rebuild after editing a single page
+
+Each run reports wall time, throughput in pages per second and peak RSS.
+Results can be saved as named baselines in benchmarks/baselines/ and later
+runs compared against them to catch regressions. The committed 1k baseline
+was recorded on a single-core machine; save a local one before comparing
+on different hardware.
+
+Usage:
+    python3 benchmark.py --pages 1k
+    python3 benchmark.py --pages 10k --jobs 0 --save-baseline 10k
+    python3 benchmark.py --pages 10k --jobs 0 --compare 10k
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import config
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+BASELINE_DIR = PROJECT_ROOT / 'benchmarks' / 'baselines'
+WORK_DIR = PROJECT_ROOT / config.CACHE_DIR / 'benchmarks'
+
+# Bump when the corpus generator changes so cached corpora are regenerated
+CORPUS_VERSION = 2
+
+SCENARIOS = ['cold', 'warm', 'noop', 'incremental']
+
+# Relative slowdown (in wall time) that counts as a regression
+REGRESSION_THRESHOLD = 0.20
+
+WORDS = (
+    "balance account portfolio value track series number screenshot privacy device "
+    "sync chart trend month year total wallet mileage weight budget savings stock "
+    "crypto entry manual update share photo extract currency history overview graph "
+    "simple local data offline export import widget daily weekly record goal"
+).split()
+
+LANGUAGES = {
+    'python': "def total(values):\n    return sum(v.amount for v in values if v.amount > 0)\n",
+    'javascript': "const total = values\n  .filter(v => v.amount > 0)\n  .reduce((a, v) => a + v.amount, 0);\n",
+    'bash': "for f in content/*.md; do\n  wc -w \"$f\"\ndone\n",
+    'json': '{\n  "series": "Checking",\n  "values": [1200.5, 1340.0, 980.25]\n}\n',
+}
+
+ICONS = ['chart-bar', 'lock', 'lightning', 'download', 'plus']
+COLORS = ['orange', 'yellow', 'coral']
+SCREENSHOTS = ['iPhone_Screenshot.png', 'iPad_Screenshot.png', 'macOS_Screenshot.png']
+
+
+def parse_page_count(value):
+    """Parse page counts such as 500, 1k or 50k"""
+    value = value.strip().lower()
+    if value.endswith('k'):
+        return int(float(value[:-1]) * 1000)
+    return int(value)
+
+
+def _sentence(rng, min_words=6, max_words=18):
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return ' '.join(words).capitalize() + '.'
+
+
+def _paragraph(rng):
+    return ' '.join(_sentence(rng) for _ in range(rng.randint(2, 5)))
+
+
+def _yaml_str(text):
+    return json.dumps(text, ensure_ascii=False)
+
+
+def generate_landing_page(rng, title):
+    """Return a landing page with all fields validate_landing_page() requires"""
+    lines = [
+        '---',
+        f'title: {_yaml_str(title)}',
+        'template: landing',
+        f'description: {_yaml_str(_sentence(rng))}',
+        f'tagline: {_yaml_str(_sentence(rng, 3, 6))}',
+        f'hero_description: {_yaml_str(_paragraph(rng))}',
+        'cta_buttons:',
+        '  - label: "Get the app"',
+        '    url: "https://example.com/app"',
+        f'    color: "{rng.choice(COLORS)}"',
+        '    icon: "/static/images/app-store-badge.svg"',
+        '    is_badge: true',
+        'features:',
+    ]
+    for _ in range(rng.randint(3, 6)):
+        lines += [
+            f'  - title: {_yaml_str(_sentence(rng, 2, 4))}',
+            f'    description: {_yaml_str(_sentence(rng))}',
+            f'    icon: "/static/icons/{rng.choice(ICONS)}.svg"',
+            f'    color: "{rng.choice(COLORS)}"',
+        ]
+    lines.append('screenshots:')
+    for image in SCREENSHOTS:
+        lines += [
+            f'  - image: "/static/images/{image}"',
+            f'    alt: {_yaml_str(_sentence(rng, 3, 6))}',
+        ]
+    lines += [
+        'contact_section:',
+        '  title: "Get in touch"',
+        f'  description: {_yaml_str(_sentence(rng))}',
+        '  email: "hello@example.com"',
+        '---',
+        '',
+        '## ' + _sentence(rng, 2, 5),
+        '',
+        _paragraph(rng),
+        '',
+    ]
+    return '\n'.join(lines)
+
+
+def generate_content_page(rng, title):
+    """Return a regular page with headings, lists, code fences and tables"""
+    lines = [
+        '---',
+        f'title: {_yaml_str(title)}',
+        'template: page',
+        f'description: {_yaml_str(_sentence(rng))}',
+        '---',
+        '',
+    ]
+    for _ in range(rng.randint(2, 6)):
+        lines += ['## ' + _sentence(rng, 2, 6), '', _paragraph(rng), '']
+        kind = rng.random()
+        if kind < 0.3:
+            lines += [f'- {_sentence(rng, 3, 8)}' for _ in range(rng.randint(3, 7))] + ['']
+        elif kind < 0.55:
+            language = rng.choice(sorted(LANGUAGES))
+            lines += [f'```{language}', LANGUAGES[language].rstrip('\n'), '```', '']
+        elif kind < 0.75:
+            lines += ['| Series | Value | Change |', '|--------|------:|-------:|']
+            for _ in range(rng.randint(3, 8)):
+                lines.append(
+                    f'| {rng.choice(WORDS).title()} | {rng.uniform(0, 10000):.2f} '
+                    f'| {rng.uniform(-20, 20):+.1f}% |'
+                )
+            lines.append('')
+        else:
+            lines += ['> ' + _sentence(rng), '', '---', '']
+    return '\n'.join(lines)
+
+
+def generate_corpus(content_dir, pages, seed=0, landing_ratio=0.02):
+    """Write a synthetic corpus of the given number of pages into content_dir"""
+    rng = random.Random(seed)
+    content_dir = Path(content_dir)
+    content_dir.mkdir(parents=True, exist_ok=True)
+
+    (content_dir / 'index.md').write_text(generate_landing_page(rng, 'Welcome'), encoding='utf-8')
+    for i in range(1, pages):
+        title = f'{_sentence(rng, 2, 5)[:-1]} {i}'
+        if rng.random() < landing_ratio:
+            text = generate_landing_page(rng, title)
+        else:
+            text = generate_content_page(rng, title)
+        (content_dir / f'page-{i:06d}.md').write_text(text, encoding='utf-8')
+
+
+def prepare_project(pages, seed):
+    """Create (or reuse) a project directory holding a corpus of the given size"""
+    project_dir = WORK_DIR / f'corpus-{pages}-{seed}'
+    stamp_file = project_dir / 'corpus.json'
+    stamp = {'version': CORPUS_VERSION, 'pages': pages, 'seed': seed}
+
+    if not (stamp_file.exists() and json.loads(stamp_file.read_text()) == stamp):
+        if project_dir.exists():
+            shutil.rmtree(project_dir)
+        print(f"📝 Generating synthetic corpus with {pages} pages...")
+        started = time.perf_counter()
+        generate_corpus(project_dir / config.CONTENT_DIR, pages, seed)
+        stamp_file.write_text(json.dumps(stamp))
+        print(f"   ✅ Generated in {time.perf_counter() - started:.1f}s")
+
+    # Share the real templates and static files with the corpus
+    for name in (config.TEMPLATE_DIR, config.STATIC_DIR):
+        link = project_dir / name
+        if not link.exists():
+            link.symlink_to(PROJECT_ROOT / name, target_is_directory=True)
+    return project_dir
+
+
+def run_build(project_dir, args):
+    """Run generate_site.py in project_dir; return (wall seconds, peak RSS bytes or None)"""
+    cmd = [sys.executable, str(PROJECT_ROOT / 'generate_site.py'), *args]
+    with tempfile.TemporaryFile() as stderr:
+        started = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=project_dir, stdout=subprocess.DEVNULL, stderr=stderr)
+        if hasattr(os, 'wait4'):
+            _, status, rusage = os.wait4(proc.pid, 0)
+            wall = time.perf_counter() - started
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is kilobytes on Linux, bytes on macOS; for a waited
+            # child it covers the largest process in its tree
+            peak_rss = rusage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+        else:
+            proc.wait()
+            wall = time.perf_counter() - started
+            peak_rss = None
+
+        if proc.returncode != 0:
+            stderr.seek(0)
+            sys.stderr.write(stderr.read().decode('utf-8', 'replace'))
+            raise SystemExit(f"❌ Build failed: {' '.join(cmd)}")
+    return wall, peak_rss
+
+
+def run_benchmark(pages, seed=0, jobs=1):
+    """Run all scenarios against a corpus and return the results"""
+    project_dir = prepare_project(pages, seed)
+    jobs_args = ['--jobs', str(jobs)]
+    results = {}
+
+    def record(scenario, args, pages_built):
+        wall, peak_rss = run_build(project_dir, args + jobs_args)
+        results[scenario] = {
+            'wall_s': round(wall, 4),
+            'pages_per_s': round(pages_built / wall, 1) if wall else None,
+            'peak_rss_bytes': peak_rss,
+        }
+        rss = f"{peak_rss / 1024 / 1024:.0f} MB" if peak_rss else "n/a"
+        print(f"   {scenario:<12} {wall:8.3f}s  {pages_built / wall:10.1f} pages/s  peak RSS {rss}")
+
+    print(f"⏱️  Benchmarking {pages} pages with {jobs} job(s)...")
+
+    # cold: no previous output and no caches
+    for name in (config.OUTPUT_DIR, config.CACHE_DIR):
+        shutil.rmtree(project_dir / name, ignore_errors=True)
+    record('cold', [], pages)
+
+    record('warm', [], pages)
+    record('noop', ['--incremental'], pages)
+
+    # incremental: one edited page, restored afterwards so the cached corpus
+    # is the same for every run
+    edited = project_dir / config.CONTENT_DIR / 'page-000001.md'
+    if edited.exists():
+        original = edited.read_bytes()
+        try:
+            edited.write_bytes(original + b'\nEdited for the incremental benchmark.\n')
+            record('incremental', ['--incremental'], 1)
+        finally:
+            edited.write_bytes(original)
+
+    return {
+        'pages': pages,
+        'seed': seed,
+        'jobs': jobs,
+        'machine': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+        },
+        'scenarios': results,
+    }
+
+
+def compare_to_baseline(result, baseline):
+    """Print the change against a baseline; return True if any scenario regressed"""
+    if baseline.get('machine') != result['machine']:
+        print("⚠️  Baseline was recorded on a different machine; numbers may not be comparable")
+
+    regressed = False
+    print("📈 Compared to baseline:")
+    for scenario, current in result['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(scenario)
+        if not previous:
+            continue
+        change = (current['wall_s'] - previous['wall_s']) / previous['wall_s']
+        marker = '❌' if change > REGRESSION_THRESHOLD else '✅'
+        regressed |= change > REGRESSION_THRESHOLD
+        print(f"   {marker} {scenario:<12} {previous['wall_s']:8.3f}s -> {current['wall_s']:8.3f}s ({change:+.1%})")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the site generator on a synthetic corpus")
+    parser.add_argument('--pages', type=parse_page_count, default=parse_page_count('1k'),
+                        help="corpus size, e.g. 1000, 10k, 50k (default: 1k)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for the corpus")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="worker processes passed to generate_site.py (0 = one per CPU core)")
+    parser.add_argument('--save-baseline', metavar='NAME',
+                        help="store the results as benchmarks/baselines/NAME.json")
+    parser.add_argument('--compare', metavar='NAME',
+                        help="compare against benchmarks/baselines/NAME.json; exit 1 on regression")
+    parser.add_argument('--output', metavar='FILE', help="also write the results as JSON to FILE")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.pages, args.seed, args.jobs)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2, sort_keys=True) + '\n')
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+        baseline_file = BASELINE_DIR / f'{args.save_baseline}.json'
+        baseline_file.write_text(json.dumps(result, indent=2, sort_keys=True) + '\n')
+        print(f"💾 Saved baseline to {baseline_file.relative_to(PROJECT_ROOT)}")
+
+    if args.compare:
+        baseline_file = BASELINE_DIR / f'{args.compare}.json'
+        baseline = json.loads(baseline_file.read_text())
+        if compare_to_baseline(result, baseline):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
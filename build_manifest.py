@@ -0,0 +1,173 @@
+"""
+Persistent build manifest for incremental site generation
+
+The manifest records, for every generated page, the inputs it was built from
+(source file hash, template chain, embedded screenshots, linked static
+assets, global context digest) and the digest of the output it produced,
+along with the CSS classes used by that output. Class sets are stored once
+under their digest and shared by every page that uses the same set, so the
+manifest does not grow with a copy of them per page. On the next build, pages
+whose inputs are unchanged and whose output is still intact are skipped.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Bump when the manifest layout changes; older manifests are discarded
+MANIFEST_VERSION = 5
+
+
+def file_digest(filepath):
+    """Return the SHA-256 hex digest of a file's contents"""
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def data_digest(data):
+    """Return the SHA-256 hex digest of a JSON-serializable structure"""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def file_signature(filepath):
+    """Return a cheap (mtime_ns, size) signature for a file, or None if missing"""
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class BuildManifest:
+    """On-disk record of page inputs and outputs from the previous build."""
+
+    def __init__(self, path, data=None):
+        self.path = Path(path)
+        data = data or {}
+        self.context_digest = data.get('context_digest')
+        self.pages = data.get('pages', {})
+        self.class_sets = data.get('class_sets', {})
+
+    @classmethod
+    def load(cls, path):
+        """Load a manifest from disk, returning an empty one if missing or stale."""
+        path = Path(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(path)
+        if data.get('version') != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data)
+
+    def save(self):
+        """Write the manifest to disk atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'version': MANIFEST_VERSION,
+            'context_digest': self.context_digest,
+            'pages': self.pages,
+            'class_sets': self._referenced_class_sets(),
+        }
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def source_digest(self, key, filepath):
+        """
+        Return the content digest of a source file.
+
+        The stored digest is reused when the file's mtime and size are
+        unchanged, so unchanged sources are never re-read.
+        """
+        signature = file_signature(filepath)
+        entry = self.pages.get(key)
+        if entry and entry.get('source_signature') == signature:
+            return entry['source_digest']
+        return file_digest(filepath)
+
+    def is_page_current(self, key, source_digest, template_digests, image_digests, assets, output):
+        """Check whether a page's recorded inputs and its output in the output sink are still valid."""
+        entry = self.pages.get(key)
+        if entry is None or entry['source_digest'] != source_digest:
+            return False
+
+        for name, digest in entry['templates'].items():
+            if template_digests(name) != digest:
+                return False
+
+        for url, digest in entry['images'].items():
+            if image_digests(url) != digest:
+                return False
+
+        for url, fingerprinted in entry['assets'].items():
+            if assets.get(url) != fingerprinted:
+                return False
+
+        signature = output.signature(entry['output'])
+        if signature is None:
+            return False
+        if signature != entry['output_signature']:
+            # Touched but possibly identical; fall back to comparing content
+            if output.digest(entry['output']) != entry['output_digest']:
+                return False
+            entry['output_signature'] = signature
+        return True
+
+    def record_page(self, key, source_file, source_digest, templates, images, assets,
+                    output, output_path, output_digest, classes=()):
+        """
+        Record the inputs and output of a freshly built page.
+
+        templates and images map the template chain and the embedded
+        screenshots to the digests they had when the page was built, assets
+        the static URLs the page looked up to their fingerprinted URLs.
+
+        classes are the CSS class names used by the output, kept so that the
+        site stylesheet can be generated without re-reading unchanged pages.
+        The page refers to them by the digest of the set, see intern_classes.
+
+        output_path is relative to the root of the output sink, so the
+        manifest stays valid when a staged build is swapped into place.
+        """
+        self.pages[key] = {
+            'source_digest': source_digest,
+            'source_signature': file_signature(source_file),
+            'templates': templates,
+            'images': images,
+            'assets': assets,
+            'output': Path(output_path).as_posix(),
+            'output_digest': output_digest,
+            'output_signature': output.signature(output_path),
+            'classes': self.intern_classes(classes),
+        }
+
+    def intern_classes(self, classes):
+        """Store a set of CSS class names once and return the digest naming it."""
+        classes = sorted(classes)
+        digest = data_digest(classes)[:16]
+        self.class_sets.setdefault(digest, classes)
+        return digest
+
+    def _referenced_class_sets(self):
+        """Return the class sets still used by a recorded page."""
+        digests = {entry.get('classes') for entry in self.pages.values()}
+        return {digest: classes for digest, classes in self.class_sets.items() if digest in digests}
+
+    def used_classes(self):
+        """Return the set of CSS class names used by all recorded pages."""
+        classes = set()
+        for digest in {entry.get('classes') for entry in self.pages.values()}:
+            classes.update(self.class_sets.get(digest, ()))
+        return classes
+
+    def forget_page(self, key):
+        """Drop a page from the manifest, returning its entry if present."""
+        return self.pages.pop(key, None)
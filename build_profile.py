@@ -0,0 +1,138 @@
+"""
+Build profiling and instrumentation
+
+BuildProfiler records wall time, CPU time and peak traced memory for each
+build phase, both in total and per page, and writes them as a JSON report
+that can be diffed between builds. NullProfiler has the same interface and
+does nothing, so the build code can be instrumented unconditionally.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPORT_VERSION = 1
+
+
+def _empty_stats():
+    return {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'peak_alloc_bytes': 0}
+
+
+def _add_stats(total, stats):
+    total['calls'] += stats['calls']
+    total['wall_s'] += stats['wall_s']
+    total['cpu_s'] += stats['cpu_s']
+    total['peak_alloc_bytes'] = max(total['peak_alloc_bytes'], stats['peak_alloc_bytes'])
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class NullProfiler:
+    """Profiler interface that records nothing."""
+
+    enabled = False
+
+    def phase(self, name, page=None):
+        return contextlib.nullcontext()
+
+    def pop_page_stats(self, page):
+        return {}
+
+    def merge_page(self, page, stats):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class BuildProfiler:
+    """
+    Collects per-phase and per-page timings and memory peaks
+
+    Phases must not be nested: each phase resets the tracemalloc peak.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.phases = {}
+        self.pages = {}
+        self.peak_traced = 0
+        self.started_wall = time.perf_counter()
+        self.started_cpu = time.process_time()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def phase(self, name, page=None):
+        """Measure the enclosed block as one call of the named phase"""
+        tracemalloc.reset_peak()
+        start_alloc = tracemalloc.get_traced_memory()[0]
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            stats = {
+                'calls': 1,
+                'wall_s': time.perf_counter() - start_wall,
+                'cpu_s': time.process_time() - start_cpu,
+                'peak_alloc_bytes': max(0, tracemalloc.get_traced_memory()[1] - start_alloc),
+            }
+            self.peak_traced = max(self.peak_traced, tracemalloc.get_traced_memory()[1])
+            _add_stats(self.phases.setdefault(name, _empty_stats()), stats)
+            if page is not None:
+                page_phases = self.pages.setdefault(page, {})
+                _add_stats(page_phases.setdefault(name, _empty_stats()), stats)
+
+    def pop_page_stats(self, page):
+        """Remove and return the phases recorded for one page, e.g. to ship them out of a worker"""
+        return self.pages.pop(page, {})
+
+    def merge_page(self, page, stats):
+        """Merge phase stats recorded for a page elsewhere, e.g. in a worker process"""
+        page_phases = self.pages.setdefault(page, {})
+        for name, phase_stats in stats.items():
+            _add_stats(page_phases.setdefault(name, _empty_stats()), phase_stats)
+            _add_stats(self.phases.setdefault(name, _empty_stats()), phase_stats)
+
+    def report(self, **metadata):
+        """Return the profile as a JSON-serializable dict"""
+        return {
+            'version': REPORT_VERSION,
+            **metadata,
+            'total': {
+                'wall_s': time.perf_counter() - self.started_wall,
+                'cpu_s': time.process_time() - self.started_cpu,
+                'peak_traced_bytes': max(self.peak_traced, tracemalloc.get_traced_memory()[1]),
+                'peak_rss_bytes': peak_rss_bytes(),
+            },
+            'phases': self.phases,
+            'pages': self.pages,
+        }
+
+    def write_report(self, path, **metadata):
+        """Write the JSON report to path"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(**metadata), f, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_path, path)
@@ -0,0 +1,152 @@
+"""
+Cached syntax highlighting for Markdown code blocks
+
+CachedCodeHiliteExtension is a drop-in replacement for the 'codehilite'
+Markdown extension. Every highlighted block is cached by language, options
+and code, in memory for the current process and in a persistent DiskCache,
+so identical snippets across pages and across builds go through Pygments
+only once. The in-memory cache keeps the MEMORY_CACHE_SIZE most recently
+used blocks, so long-running processes such as the dev server stay bounded.
+
+Highlighted blocks only carry CSS classes; the matching Pygments styles
+are emitted once as a shared stylesheet (see get_pygments_stylesheet()).
+"""
+
+import collections
+import hashlib
+import json
+import threading
+import types
+
+from markdown.extensions import codehilite, fenced_code
+from markdown.extensions.codehilite import CodeHilite, CodeHiliteExtension, HiliteTreeprocessor
+from markdown.extensions.fenced_code import FencedBlockPreprocessor
+
+try:
+    import pygments
+    from pygments.formatters import HtmlFormatter
+except ImportError:
+    pygments = None
+
+# Bump when the highlighting code changes its output, so cached blocks and
+# pages converted with the previous version are not reused
+CACHE_VERSION = 1
+
+# Persistent cache shared by all converters in this process, see set_highlight_cache()
+_disk_cache = None
+
+# Most recently used highlighted blocks, by cache key
+MEMORY_CACHE_SIZE = 2048
+_memory_cache = collections.OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def set_highlight_cache(cache):
+    """Use a DiskCache to persist highlighted blocks across builds"""
+    global _disk_cache
+    _disk_cache = cache
+
+
+class CachedCodeHilite(CodeHilite):
+    """CodeHilite that reuses previously highlighted output for identical blocks."""
+
+    def cache_key(self, shebang):
+        data = json.dumps({
+            'version': CACHE_VERSION,
+            'pygments': getattr(pygments, '__version__', None),
+            'src': self.src,
+            'lang': self.lang,
+            'shebang': shebang,
+            'guess_lang': self.guess_lang,
+            'use_pygments': self.use_pygments,
+            'lang_prefix': self.lang_prefix,
+            'formatter': self.pygments_formatter,
+            'options': self.options,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def hilite(self, shebang=True):
+        key = self.cache_key(shebang)
+        with _memory_lock:
+            html = _memory_cache.get(key)
+            if html is not None:
+                _memory_cache.move_to_end(key)
+        if html is not None:
+            return html
+
+        if _disk_cache is not None:
+            cached = _disk_cache.get(key)
+            if cached is not None:
+                html = cached.decode('utf-8')
+        if html is None:
+            html = super().hilite(shebang)
+            if _disk_cache is not None:
+                _disk_cache.put(key, html.encode('utf-8'))
+        with _memory_lock:
+            _memory_cache[key] = html
+            while len(_memory_cache) > MEMORY_CACHE_SIZE:
+                _memory_cache.popitem(last=False)
+        return html
+
+
+def _using_cached_hilite(function, module):
+    """
+    Return a copy of a method of module in which the global name CodeHilite
+    refers to CachedCodeHilite
+
+    The Markdown processors instantiate CodeHilite by its module global;
+    rebinding their methods to a namespace of their own leaves the module,
+    and every other Markdown instance, untouched.
+    """
+    namespace = dict(vars(module), CodeHilite=CachedCodeHilite)
+    return types.FunctionType(
+        function.__code__, namespace, function.__name__,
+        function.__defaults__, function.__closure__,
+    )
+
+
+class CachedHiliteTreeprocessor(HiliteTreeprocessor):
+    """Highlight indented code blocks through CachedCodeHilite."""
+
+    run = _using_cached_hilite(HiliteTreeprocessor.run, codehilite)
+
+
+class CachedFencedBlockPreprocessor(FencedBlockPreprocessor):
+    """Highlight fenced code blocks through CachedCodeHilite."""
+
+    run = _using_cached_hilite(FencedBlockPreprocessor.run, fenced_code)
+
+
+class CachedCodeHiliteExtension(CodeHiliteExtension):
+    """
+    The codehilite extension, with highlighted blocks cached
+
+    Subclasses CodeHiliteExtension so fenced code blocks pick up its
+    configuration exactly as they do for codehilite. Load it after 'extra'
+    (or 'fenced_code'): it replaces the fenced code preprocessor of that
+    Markdown instance with one that highlights through the cache.
+    """
+
+    def extendMarkdown(self, md):
+        hiliter = CachedHiliteTreeprocessor(md)
+        hiliter.config = self.getConfigs()
+        md.treeprocessors.register(hiliter, 'hilite', 30)
+
+        if 'fenced_code_block' in md.preprocessors:
+            fenced = md.preprocessors['fenced_code_block']
+            md.preprocessors.register(
+                CachedFencedBlockPreprocessor(md, fenced.config), 'fenced_code_block', 25
+            )
+
+        md.registerExtension(self)
+
+
+def makeExtension(**kwargs):
+    return CachedCodeHiliteExtension(**kwargs)
+
+
+def get_pygments_stylesheet(style, css_class='codehilite'):
+    """Return the CSS rules for highlighted blocks in the given Pygments style"""
+    if pygments is None:
+        return ''
+    return HtmlFormatter(style=style).get_style_defs(f'.{css_class}') + '\n'
@@ -31,6 +31,65 @@ CONTENT_DIR = "content"
 TEMPLATE_DIR = "templates"
 STATIC_DIR = "static"
 OUTPUT_DIR = "docs"
+CACHE_DIR = ".build_cache"  # Incremental build state, not deployed
+
+# How static files reach the output directory: "copy" (reflinks where the
+# filesystem supports them) or "hardlink" (no data written at all)
+STATIC_LINK_MODE = "copy"
+
+# Upper bound for the on-disk cache of converted Markdown bodies
+MARKDOWN_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Syntax highlighting: Pygments style for the shared code stylesheet, and
+# upper bound for the on-disk cache of highlighted code blocks
+PYGMENTS_STYLE = "monokai"
+HIGHLIGHT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Classes added to pages at runtime (e.g. by scripts) that the generated
+# Tailwind stylesheet must include even if no rendered page uses them
+TAILWIND_SAFELIST = ['hidden']
+
+# The site's own classes, styled by the templates rather than by Tailwind
+# utilities; any other class the stylesheet generator does not support is
+# reported at build time
+TAILWIND_CUSTOM_CLASSES = ['icon-white', 'markdown-content', 'prose', 'prose-invert', 'prose-lg']
+
+# Minify rendered HTML pages (also enabled per build with --minify)
+MINIFY_HTML = False
+
+# Responsive screenshots: widths (in pixels) and formats of the variants
+# generated for images in the 'screenshots' frontmatter
+RESPONSIVE_IMAGE_WIDTHS = [480, 800, 1200, 1600]
+RESPONSIVE_IMAGE_FORMATS = ['avif', 'webp']
+
+# Encoder settings of the variants, passed to Pillow. Slower settings only
+# shave a little off the files but cost seconds per variant on cold builds
+# (fresh clones, CI): AVIF speed 6 makes files about 20% smaller than
+# speed 8 at three times the encoding time, WebP method 6 about 15%
+# smaller than method 4 at ten times. Changing them encodes every variant
+# again under new URLs.
+RESPONSIVE_IMAGE_ENCODER_OPTIONS = {
+    'avif': {'quality': 60, 'speed': 8},
+    'webp': {'quality': 80, 'method': 4},
+}
+
+# Publish static files under content-hashed names, listed in
+# asset-manifest.json (the development server turns this off so that edited
+# static files keep their URLs)
+FINGERPRINT_ASSETS = True
+
+# Static files (relative to STATIC_DIR) also published under their plain
+# names when fingerprinting, for links from outside the site; every other
+# static file is only published once, under its fingerprinted name
+STATIC_PLAIN_NAMES = [
+    'images/og-image.png',
+    'images/logo.svg',
+    'images/summarum_logo.png',
+]
+
+# Write precompressed .gz (and, with the brotli package, .br) variants of
+# HTML, SVG, CSS, JS and JSON output files (also enabled with --precompress)
+PRECOMPRESS = False
 
 # Contact
 CONTACT_EMAIL = "till.gartner@gmail.com"
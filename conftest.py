@@ -0,0 +1 @@
+"""Makes the top-level modules of the generator importable from tests/"""
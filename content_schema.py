@@ -0,0 +1,128 @@
+"""
+Frontmatter schemas for content pages
+
+Each page template has a schema describing the frontmatter it expects.
+Schemas are plain dicts compiled once into validator functions that return
+a list of error messages, so validating a page is a handful of dict and
+type checks.
+
+Schema keys:
+    type       expected Python type (dict for objects, list for arrays)
+    required   field names that must be present (for objects)
+    fields     schemas for individual fields (for objects)
+    items      schema applied to every element (for arrays)
+    non_empty  arrays must contain at least one element
+    empty_message  custom message for an empty array
+"""
+
+TYPE_NAMES = {
+    dict: 'an object/dictionary',
+    list: 'a list/array',
+    str: 'a string',
+    bool: 'a boolean',
+}
+
+LANDING_SCHEMA = {
+    'type': dict,
+    'required': ['tagline', 'hero_description', 'cta_buttons', 'features', 'screenshots', 'contact_section'],
+    'fields': {
+        'cta_buttons': {
+            'type': list,
+            'non_empty': True,
+            'items': {'required': ['label', 'url', 'color', 'icon']},
+        },
+        'features': {
+            'type': list,
+            'non_empty': True,
+            'items': {'required': ['title', 'description', 'icon', 'color']},
+        },
+        'screenshots': {
+            'type': list,
+            'non_empty': True,
+            'empty_message': "'screenshots' array cannot be empty - if the array is empty, this is a configuration error",
+            'items': {'required': ['image', 'alt']},
+        },
+        'contact_section': {
+            'type': dict,
+            'required': ['title', 'description', 'email'],
+        },
+    },
+}
+
+PAGE_SCHEMA = {
+    'type': dict,
+    'fields': {
+        'search': {'type': bool},
+    },
+}
+
+# Schemas by template file name
+SCHEMAS = {
+    'landing.html': LANDING_SCHEMA,
+    'page.html': PAGE_SCHEMA,
+    'search.html': PAGE_SCHEMA,
+}
+
+
+def compile_schema(schema):
+    """
+    Compile a schema into a validate(value, errors, path='') function
+
+    Errors are appended to the errors list; path is the field path used in
+    messages, e.g. 'features[2]'.
+    """
+    expected = schema.get('type')
+    type_name = TYPE_NAMES.get(expected, getattr(expected, '__name__', ''))
+    required = tuple(schema.get('required', ()))
+    fields = {name: compile_schema(sub) for name, sub in schema.get('fields', {}).items()}
+    validate_item = compile_schema(schema['items']) if 'items' in schema else None
+    non_empty = schema.get('non_empty', False)
+    empty_message = schema.get('empty_message')
+
+    def validate(value, errors, path=''):
+        if expected is not None and not isinstance(value, expected):
+            if path:
+                errors.append(f"'{path}' must be {type_name}")
+            else:
+                errors.append(f"Frontmatter must be {type_name}")
+            return
+
+        for name in required:
+            if name not in value:
+                if path:
+                    errors.append(f"{path} missing required field: '{name}'")
+                else:
+                    errors.append(f"Missing required field: '{name}'")
+        for name, validate_field in fields.items():
+            if name in value:
+                validate_field(value[name], errors, f'{path}.{name}' if path else name)
+
+        if expected is list:
+            if non_empty and len(value) == 0:
+                errors.append(empty_message or f"'{path}' array cannot be empty")
+            if validate_item is not None:
+                for i, item in enumerate(value):
+                    validate_item(item, errors, f'{path}[{i}]')
+
+    return validate
+
+
+VALIDATORS = {name: compile_schema(schema) for name, schema in SCHEMAS.items()}
+
+
+def validate_frontmatter(frontmatter, template_name):
+    """Validate frontmatter against its template's schema; return a list of errors"""
+    validator = VALIDATORS.get(template_name)
+    if validator is None:
+        return []
+    errors = []
+    validator(frontmatter, errors)
+    return errors
+
+
+def format_errors(filepath, errors):
+    """Format validation errors for display"""
+    message = f"\n❌ Validation failed for {filepath}:\n"
+    for error in errors:
+        message += f"   • {error}\n"
+    return message
@@ -0,0 +1,120 @@
+"""
+Deploy manifest and diff of the output directory
+
+After every build the output directory is scanned into a manifest of output
+paths and content digests, and compared with the manifest of the previous
+build. The resulting diff lists the files that were added, changed and
+removed, so a deploy only uploads (and a CDN only invalidates) what actually
+changed.
+
+Both files are written to the build cache and are not deployed. Their
+contents depend only on the output, never on when or where it was built.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from build_manifest import file_digest
+from site_output import write_file_atomic
+
+# Bump when the manifest layout changes
+DEPLOY_MANIFEST_VERSION = 1
+
+
+class DeployDiff:
+    """Output paths added, changed and removed since the previous build."""
+
+    def __init__(self, added=(), changed=(), removed=()):
+        self.added = sorted(added)
+        self.changed = sorted(changed)
+        self.removed = sorted(removed)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def __str__(self):
+        return f"{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed"
+
+    def to_dict(self):
+        return {'added': self.added, 'changed': self.changed, 'removed': self.removed}
+
+
+def load_manifest(path):
+    """Return {output path: digest} from a deploy manifest, or None if missing or stale"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if data.get('version') != DEPLOY_MANIFEST_VERSION:
+        return None
+    return data['files']
+
+
+def scan_output(output_dir, signatures_path):
+    """
+    Return {output path: SHA-256 digest} for every file under output_dir
+
+    Paths are relative POSIX paths in sorted order. Digests are cached in
+    signatures_path by (mtime_ns, size), so files left untouched by the
+    build (such as hardlinked static files) are not read again.
+    """
+    output_dir = Path(output_dir)
+    try:
+        with open(signatures_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cached = {}
+
+    signatures = {}
+    files = {}
+    for root, dirs, names in os.walk(output_dir):
+        dirs.sort()
+        rel_root = Path(root).relative_to(output_dir)
+        for name in sorted(names):
+            rel_path = (rel_root / name).as_posix()
+            filepath = os.path.join(root, name)
+            st = os.stat(filepath)
+            signature = [st.st_mtime_ns, st.st_size]
+            entry = cached.get(rel_path)
+            if entry and entry[0] == signature:
+                digest = entry[1]
+            else:
+                digest = file_digest(filepath)
+            signatures[rel_path] = [signature, digest]
+            files[rel_path] = digest
+
+    write_file_atomic(signatures_path, json.dumps(signatures, sort_keys=True).encode('utf-8'))
+    return files
+
+
+def diff_manifests(previous, current):
+    """Compare two {output path: digest} manifests"""
+    return DeployDiff(
+        added=(path for path in current if path not in previous),
+        changed=(path for path, digest in current.items()
+                 if path in previous and previous[path] != digest),
+        removed=(path for path in previous if path not in current),
+    )
+
+
+def update_deploy_manifest(output_dir, state_dir):
+    """
+    Scan output_dir, write the deploy manifest and its diff, and return the diff
+
+    Writes manifest.json and diff.json into state_dir. Without a previous
+    manifest every file counts as added.
+    """
+    state_dir = Path(state_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = state_dir / 'manifest.json'
+
+    previous = load_manifest(manifest_path) or {}
+    current = scan_output(output_dir, state_dir / 'signatures.json')
+    diff = diff_manifests(previous, current)
+
+    manifest = {'version': DEPLOY_MANIFEST_VERSION, 'files': current}
+    for path, data in ((manifest_path, manifest), (state_dir / 'diff.json', diff.to_dict())):
+        write_file_atomic(path, (json.dumps(data, indent=2, sort_keys=True) + '\n').encode('utf-8'))
+    return diff
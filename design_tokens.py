@@ -0,0 +1,93 @@
+"""
+Compiled design token stylesheet
+
+The design tokens in design_variables.py are compiled into one stylesheet of
+CSS custom properties and a JSON export of all token groups. Both files are
+named by the hash of their content, so pages can link them once and browsers
+can cache them indefinitely. Compiled files are kept in the build cache and
+linked into the output directory, so they are only regenerated when the
+tokens change.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import config
+import design_variables
+
+# Output directory for the compiled tokens, relative to the site root
+OUTPUT_SUBDIR = 'assets/tokens'
+
+
+def get_token_groups():
+    """Return every token group defined in design_variables, keyed by lowercase name"""
+    return {
+        name.lower(): value
+        for name, value in vars(design_variables).items()
+        if name.isupper() and isinstance(value, dict)
+    }
+
+
+def render_stylesheet(css_variables=None):
+    """Render CSS custom properties as a :root rule"""
+    if css_variables is None:
+        css_variables = design_variables.get_css_variables()
+    lines = [f'    {name}: {value};\n' for name, value in css_variables.items()]
+    return ':root {\n' + ''.join(lines) + '}\n'
+
+
+def render_json(groups=None):
+    """Render the token groups as JSON"""
+    if groups is None:
+        groups = get_token_groups()
+    return json.dumps(groups, indent=2, sort_keys=True) + '\n'
+
+
+def _compiled_files():
+    """Return (output name, content) for the compiled stylesheet and JSON export"""
+    files = []
+    for suffix, content in (('css', render_stylesheet()), ('json', render_json())):
+        data = content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        files.append((f'tokens.{digest[:12]}.{suffix}', data))
+    return files
+
+
+def get_token_urls():
+    """Return the URLs of the compiled tokens as {'css': ..., 'json': ...}"""
+    return {
+        name.rsplit('.', 1)[1]: f'/{OUTPUT_SUBDIR}/{name}'
+        for name, _ in _compiled_files()
+    }
+
+
+def compile_tokens(output):
+    """
+    Make the compiled tokens available in the output sink
+
+    Files are written to the build cache when no compiled file with the same
+    hash exists yet, and linked into the output. Compiled tokens from
+    earlier token sets are removed from the output. Returns the number of
+    files compiled.
+    """
+    cache_dir = Path(config.CACHE_DIR) / 'tokens'
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    compiled = 0
+    wanted = set()
+    for name, data in _compiled_files():
+        wanted.add(name)
+        cache_path = cache_dir / name
+        if not cache_path.exists():
+            tmp_path = cache_path.with_name(f'.{name}.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, cache_path)
+            compiled += 1
+        output.link(f'{OUTPUT_SUBDIR}/{name}', cache_path)
+
+    for name in output.list(OUTPUT_SUBDIR):
+        if name not in wanted:
+            output.remove(f'{OUTPUT_SUBDIR}/{name}')
+    return compiled
@@ -4,24 +4,48 @@ Development server for Summarum website with auto-rebuild on file changes.
 
 This script:
 - Watches for changes in content, templates, and config files
-- Automatically rebuilds the site when changes are detected
-- Serves the site on a local HTTP server
+- Rebuilds only what a change affects: the edited page, the pages using an
+  edited template, or the one edited static file (config changes rebuild
+  the whole site)
+- Builds the site in memory and serves it on a local HTTP server, with
+  static files served straight from static/ (docs/ is never touched)
+- Serves many browsers at once: a thread per connection, HTTP/1.1
+  keep-alive, ETag/Last-Modified revalidation (304s), byte ranges and
+  gzipped text responses
+- Reloads open pages when a rebuild finishes (Server-Sent Events), swapping
+  edited stylesheets in place without a reload
 - Provides colored console output for better visibility
 """
 
+import collections
+import email.utils
+import gzip
+import hashlib
+import importlib
+import io
+import json
 import os
+import posixpath
+import re
 import sys
 import time
 import threading
 import http.server
-import socketserver
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
+from urllib.parse import unquote, urlsplit
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
 # Import the site generator
+import config
+import design_variables
 import generate_site
+from asset_manifest import STATIC_URL_PREFIX
+from build_manifest import BuildManifest
+from output_sink import MemorySink
+from precompress import COMPRESSIBLE_SUFFIXES
+from search_index import page_url
 
 # Configuration
 HOST = "localhost"
@@ -30,6 +54,58 @@ OUTPUT_DIR = "docs"
 WATCH_PATHS = ["content", "templates", "static"]
 WATCH_FILES = ["design_variables.py", "config.py", "generate_site.py"]
 
+# Static files keep their URLs in development builds, so an edited static
+# file is served as is without rebuilding the pages that link it
+BUILD_OPTIONS = {'fingerprint': False}
+
+# Server-Sent Events endpoint notifying browsers of finished rebuilds, and
+# seconds between keep-alive comments on idle connections
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_KEEPALIVE = 15
+
+# Seconds an idle keep-alive connection is held open
+CONNECTION_TIMEOUT = 60
+
+# Text files (the suffixes precompress.py handles) are gzipped on the fly
+# for browsers that accept it, at a level that favours speed; smaller ones
+# are not worth it
+GZIP_LEVEL = 6
+GZIP_MIN_SIZE = 256
+
+RANGE_PATTERN = re.compile(r'bytes=(\d*)-(\d*)', re.IGNORECASE)
+
+# Injected before </body> of every HTML page served in development. A
+# 'reload' event reloads the page if it was rebuilt (pages is null when
+# every page was); a 'css' event swaps the edited stylesheets in place,
+# removing the old <link> once the new one has loaded.
+LIVE_RELOAD_SCRIPT = """<script>
+(function () {
+    var source = new EventSource('%(path)s');
+    var path = location.pathname.replace(/index\\.html$/, '');
+    source.addEventListener('reload', function (event) {
+        var pages = JSON.parse(event.data).pages;
+        if (!pages || pages.indexOf(path) !== -1) {
+            location.reload();
+        }
+    });
+    source.addEventListener('css', function (event) {
+        var stylesheets = JSON.parse(event.data).stylesheets;
+        document.querySelectorAll('link[rel="stylesheet"]').forEach(function (link) {
+            var url = new URL(link.href);
+            if (url.origin !== location.origin || stylesheets.indexOf(url.pathname) === -1) {
+                return;
+            }
+            url.searchParams.set('livereload', Date.now());
+            var fresh = link.cloneNode();
+            fresh.href = url.href;
+            fresh.onload = function () { link.remove(); };
+            link.after(fresh);
+        });
+    });
+})();
+</script>
+""" % {'path': LIVE_RELOAD_PATH}
+
 # ANSI color codes for terminal output
 class Colors:
     BLUE = '\033[94m'
@@ -41,25 +117,188 @@ class Colors:
     CYAN = '\033[96m'
 
 
+class LiveReload:
+    """Broadcasts rebuild notifications to the browsers listening for them."""
+
+    def __init__(self, history=16):
+        self.condition = threading.Condition()
+        self.last_id = 0
+        self.events = collections.deque(maxlen=history)  # (id, event, JSON data)
+
+    def notify(self, event, data):
+        """Send an event to every connected browser."""
+        with self.condition:
+            self.last_id += 1
+            self.events.append((self.last_id, event, json.dumps(data)))
+            self.condition.notify_all()
+
+    def wait(self, after_id, timeout):
+        """
+        Return the events newer than after_id, waiting up to timeout seconds for one.
+
+        When some of them are no longer in the history, a single 'reload'
+        of every page is returned instead, as the missed events are unknown.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.last_id > after_id, timeout)
+            if self.events and self.events[0][0] > after_id + 1:
+                return [(self.last_id, 'reload', json.dumps({'pages': None}))]
+            return [entry for entry in self.events if entry[0] > after_id]
+
+
+def inject_live_reload(html):
+    """Insert the live reload client before the closing </body> tag of a page."""
+    script = LIVE_RELOAD_SCRIPT.encode('utf-8')
+    end = html.lower().rfind(b'</body>')
+    if end == -1:
+        return html + script
+    return html[:end] + script + html[end:]
+
+
+def accepts_gzip(accept_encoding):
+    """Return True if an Accept-Encoding header allows a gzipped response."""
+    for coding in (accept_encoding or '').split(','):
+        name, _, params = coding.partition(';')
+        if name.strip().lower() not in ('gzip', '*'):
+            continue
+        quality = params.strip().lower()
+        if not quality.startswith('q='):
+            return True
+        try:
+            return float(quality[2:]) > 0
+        except ValueError:
+            return False
+    return False
+
+
+def gzip_etag(etag):
+    """Return the ETag of the gzipped representation of a file."""
+    return etag[:-1] + '-gzip"'
+
+
+def parse_byte_range(header, size):
+    """
+    Return the range of byte positions a Range header asks for in a body of
+    size bytes.
+
+    Returns None when the header is to be ignored (malformed, or asking for
+    several ranges, which are served as the whole file), and an empty range
+    when the range is unsatisfiable.
+    """
+    match = RANGE_PATTERN.fullmatch(header.strip())
+    if match is None or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if not first:
+        # The last bytes of the file
+        return range(max(size - int(last), 0), size) if int(last) else range(0)
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return range(0)
+    stop = int(last) + 1 if last else size
+    return range(start, min(stop, size))
+
+
+class DependencyGraph:
+    """
+    Maps source files to the output files built from them.
+
+    Pages are read from the build manifest of the last build (content
+    file, template chain, embedded screenshots, linked static assets).
+    Static files map to themselves and the pages using them, and the config
+    modules in WATCH_FILES to every page.
+    """
+
+    def __init__(self, project_root, state_dir):
+        self.project_root = Path(project_root)
+        self.state_dir = Path(state_dir)  # Where the build keeps its manifest
+        self.template_pages = {}  # template name -> page keys
+        self.static_pages = {}    # static URL -> page keys
+        self.load()
+
+    def load(self):
+        """Rebuild the graph from the state of the last build."""
+        manifest = BuildManifest.load(self.project_root / self.state_dir / 'manifest.json')
+        self.template_pages = {}
+        self.static_pages = {}
+        for page, entry in manifest.pages.items():
+            self._add_page(page, entry)
+
+    def update(self, rebuilt):
+        """Record the dependencies of rebuilt pages ({page key: manifest entry or None})."""
+        for page, entry in rebuilt.items():
+            for pages in (*self.template_pages.values(), *self.static_pages.values()):
+                pages.discard(page)
+            if entry is not None:
+                self._add_page(page, entry)
+
+    def _add_page(self, page, entry):
+        for name in entry['templates']:
+            self.template_pages.setdefault(name, set()).add(page)
+        # Unfingerprinted URLs stay the same when their files change
+        fingerprinted = [url for url, fingerprinted in entry['assets'].items() if fingerprinted]
+        for url in (*entry['images'], *fingerprinted):
+            self.static_pages.setdefault(url, set()).add(page)
+
+    def affected(self, changed_files):
+        """
+        Work out what the changed files affect.
+
+        Returns (full, pages, static_files): whether the whole site must be
+        rebuilt, the content files (page keys) to re-render and the static
+        files (relative to the static directory) to copy.
+        """
+        full = False
+        pages = set()
+        static_files = set()
+        for changed_file in changed_files:
+            rel_path = Path(os.path.relpath(changed_file, self.project_root))
+            top = rel_path.parts[0]
+            if rel_path.as_posix() in WATCH_FILES:
+                full = True
+            elif top == config.CONTENT_DIR:
+                if rel_path.suffix == '.md':
+                    pages.add(rel_path.as_posix())
+            elif top == config.TEMPLATE_DIR:
+                name = rel_path.relative_to(config.TEMPLATE_DIR).as_posix()
+                pages.update(self.template_pages.get(name, ()))
+            elif top == config.STATIC_DIR:
+                static_path = rel_path.relative_to(config.STATIC_DIR).as_posix()
+                static_files.add(static_path)
+                # Pages link to static files by fingerprinted URL and
+                # embed screenshots with their variants
+                pages.update(self.static_pages.get(STATIC_URL_PREFIX + static_path, ()))
+        return full, pages, static_files
+
+
+def reload_config_modules():
+    """Re-import the config modules and the generator so builds see their changes."""
+    importlib.reload(design_variables)
+    importlib.reload(config)
+    importlib.reload(generate_site)
+
+
 class SiteRebuilder(FileSystemEventHandler):
-    """Handles file system events and triggers site rebuild."""
+    """Handles file system events and rebuilds what they affect."""
 
-    def __init__(self, project_root):
+    def __init__(self, project_root, output, live_reload=None):
         super().__init__()
         self.project_root = project_root
-        self.last_rebuild = 0
+        self.output = output
+        self.live_reload = live_reload
         self.rebuild_delay = 1.0  # Debounce: wait 1 second before rebuilding
         self.rebuild_timer = None
+        self.pending = set()  # Files changed since the last rebuild
         self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.graph = DependencyGraph(project_root, output.state_dir)
 
-    def should_process_event(self, event):
-        """Check if the event should trigger a rebuild."""
-        # Ignore directory events
-        if event.is_directory:
-            return False
-
+    def should_process_path(self, path):
+        """Check if a change to path should trigger a rebuild."""
         # Ignore hidden files and system files
-        path = Path(event.src_path)
+        path = Path(path)
         if any(part.startswith('.') for part in path.parts):
             return False
 
@@ -74,108 +313,349 @@ class SiteRebuilder(FileSystemEventHandler):
 
         return True
 
-    def schedule_rebuild(self, event):
-        """Schedule a rebuild with debouncing."""
-        if not self.should_process_event(event):
+    def schedule_rebuild(self, *paths):
+        """Schedule a rebuild with debouncing, collecting every changed path."""
+        paths = [path for path in paths if self.should_process_path(path)]
+        if not paths:
             return
 
         with self.lock:
+            self.pending.update(os.path.abspath(path) for path in paths)
+
             # Cancel any pending rebuild
             if self.rebuild_timer is not None:
                 self.rebuild_timer.cancel()
 
             # Schedule a new rebuild
-            self.rebuild_timer = threading.Timer(
-                self.rebuild_delay,
-                self.rebuild_site,
-                args=[event.src_path]
-            )
+            self.rebuild_timer = threading.Timer(self.rebuild_delay, self.rebuild_site)
             self.rebuild_timer.start()
 
-    def rebuild_site(self, changed_file):
-        """Rebuild the site."""
+    def rebuild_site(self):
+        """Rebuild what the files changed since the last rebuild affect."""
         with self.lock:
             self.rebuild_timer = None
+            changed_files = sorted(self.pending)
+            self.pending.clear()
+        if not changed_files:
+            return
 
-            # Check if enough time has passed since last rebuild
-            current_time = time.time()
-            if current_time - self.last_rebuild < self.rebuild_delay:
-                return
-
-            self.last_rebuild = current_time
-
+        # Changes arriving during a rebuild are picked up by the next one
+        with self.build_lock:
             # Print rebuild notification
             timestamp = datetime.now().strftime("%H:%M:%S")
-            rel_path = os.path.relpath(changed_file, self.project_root)
-
-            print(f"\n{Colors.CYAN}[{timestamp}]{Colors.RESET} "
-                  f"{Colors.YELLOW}Change detected:{Colors.RESET} {rel_path}")
-            print(f"{Colors.BLUE}🔨 Rebuilding site...{Colors.RESET}")
-
+            for changed_file in changed_files:
+                rel_path = os.path.relpath(changed_file, self.project_root)
+                print(f"\n{Colors.CYAN}[{timestamp}]{Colors.RESET} "
+                      f"{Colors.YELLOW}Change detected:{Colors.RESET} {rel_path}")
+
+            # Save current directory and change to project root
+            current_dir = os.getcwd()
+            os.chdir(self.project_root)
             try:
-                # Save current directory and change to project root
-                current_dir = os.getcwd()
-                os.chdir(self.project_root)
-
-                # Run the site generator
-                generate_site.generate_site()
-                print(f"{Colors.GREEN}✅ Rebuild complete!{Colors.RESET}\n")
-
-                # Restore directory
-                os.chdir(current_dir)
+                start = time.perf_counter()
+                events = self.apply_changes(changed_files)
+                elapsed = time.perf_counter() - start
+                print(f"{Colors.GREEN}✅ Rebuild complete in {elapsed:.2f}s!{Colors.RESET}\n")
+                if self.live_reload is not None:
+                    for event, data in events:
+                        self.live_reload.notify(event, data)
             except Exception as e:
                 print(f"{Colors.RED}❌ Rebuild failed: {e}{Colors.RESET}\n")
-                # Make sure to restore directory even on error
-                try:
-                    os.chdir(current_dir)
-                except:
-                    pass
+            finally:
+                os.chdir(current_dir)
+
+    def apply_changes(self, changed_files):
+        """
+        Rebuild the outputs that depend on changed_files.
+
+        Returns the live reload events for the rebuild as (event, data)
+        pairs: 'css' with the URLs of edited stylesheets, and 'reload' with
+        the URLs of rebuilt pages (None for every page).
+        """
+        full, pages, static_files = self.graph.affected(changed_files)
+
+        if full:
+            print(f"{Colors.BLUE}🔨 Configuration changed, rebuilding site...{Colors.RESET}")
+            reload_config_modules()
+            generate_site.generate_site(incremental=True, output=self.output, **BUILD_OPTIONS)
+            self.graph.load()
+            return [('reload', {'pages': None})]
+
+        events = []
+        stylesheets = []
+        reload_all = False
+        for static_path in sorted(static_files):
+            result = self.output.sync_static_file(
+                'static', config.STATIC_DIR, static_path, config.STATIC_LINK_MODE,
+            )
+            if result != 'unchanged':
+                print(f"{Colors.BLUE}📦 {result.capitalize()} static/{static_path}{Colors.RESET}")
+                if static_path.endswith('.css') and result != 'removed':
+                    stylesheets.append(STATIC_URL_PREFIX + static_path)
+                else:
+                    reload_all = True
+        if stylesheets:
+            events.append(('css', {'stylesheets': stylesheets}))
+
+        if pages:
+            print(f"{Colors.BLUE}🔨 Rebuilding {len(pages)} affected "
+                  f"page{'s' if len(pages) != 1 else ''}...{Colors.RESET}")
+            rebuilt = generate_site.rebuild_pages(
+                [Path(page) for page in pages], fingerprint=BUILD_OPTIONS['fingerprint'],
+                output=self.output,
+            )
+            if rebuilt is None:
+                self.graph.load()
+                reload_all = True
+            else:
+                self.graph.update(rebuilt)
+                events.append(('reload', {
+                    'pages': sorted(page_url(entry['output']) for entry in rebuilt.values() if entry),
+                }))
+        elif not static_files:
+            print(f"{Colors.BLUE}💤 No page depends on the change{Colors.RESET}")
+
+        if reload_all:
+            events = [event for event in events if event[0] != 'reload']
+            events.append(('reload', {'pages': None}))
+        return events
 
     def on_modified(self, event):
         """Called when a file is modified."""
-        self.schedule_rebuild(event)
+        if not event.is_directory:
+            self.schedule_rebuild(event.src_path)
 
     def on_created(self, event):
         """Called when a file is created."""
-        self.schedule_rebuild(event)
+        if not event.is_directory:
+            self.schedule_rebuild(event.src_path)
 
     def on_deleted(self, event):
         """Called when a file is deleted."""
-        self.schedule_rebuild(event)
+        if not event.is_directory:
+            self.schedule_rebuild(event.src_path)
 
+    def on_moved(self, event):
+        """Called when a file is renamed; editors often save this way."""
+        if not event.is_directory:
+            self.schedule_rebuild(event.src_path, event.dest_path)
 
-class QuietHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    """HTTP request handler with minimal logging."""
 
-    def __init__(self, *args, directory=None, **kwargs):
-        """Initialize with a fixed directory."""
-        super().__init__(*args, directory=directory, **kwargs)
+class QuietHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """HTTP request handler for the in-memory site with minimal logging and live reload."""
+
+    # Keep-alive connections; every response other than the live reload
+    # stream has a Content-Length
+    protocol_version = 'HTTP/1.1'
+    timeout = CONNECTION_TIMEOUT
+
+    def __init__(self, *args, output=None, live_reload=None, **kwargs):
+        """Initialize with the MemorySink holding the site."""
+        self.output = output
+        self.live_reload = live_reload
+        self.body_length = None
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        """Serve a file, or the live reload event stream."""
+        if self.live_reload is not None and urlsplit(self.path).path == LIVE_RELOAD_PATH:
+            self.send_event_stream()
+        else:
+            super().do_GET()
+
+    def send_head(self):
+        """
+        Send the headers of a file of the site and return its body as a file
+        object, with the live reload client injected into pages
+
+        A 304 without a body is sent when the browser's copy is current, a
+        single byte range is sent as a 206, and text files are gzipped for
+        browsers that accept it.
+        """
+        url_path = unquote(urlsplit(self.path).path)
+        rel_path = posixpath.normpath(url_path).lstrip('/')
+        if url_path.endswith('/'):
+            rel_path = posixpath.join(rel_path, 'index.html')
+
+        content = self.output.resolve(rel_path)
+        if content is None:
+            if self.output.resolve(posixpath.join(rel_path, 'index.html')) is not None:
+                # Directory without a trailing slash, as SimpleHTTPRequestHandler does
+                self.send_response(301)
+                self.send_header('Location', url_path + '/')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return None
+            self.send_error(404, "File not found")
+            return None
+
+        if isinstance(content, Path):
+            # Static files and cached build artifacts are read from disk
+            try:
+                f = open(content, 'rb')
+            except OSError:
+                self.send_error(404, "File not found")
+                return None
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            mtime = stat.st_mtime
+            etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+        else:
+            if self.live_reload is not None and rel_path.endswith('.html'):
+                content = inject_live_reload(content)
+            f = io.BytesIO(content)
+            size = len(content)
+            mtime = None
+            etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+
+        byte_range = None
+        if 'Range' in self.headers and self.headers.get('If-Range', etag) == etag:
+            byte_range = parse_byte_range(self.headers['Range'], size)
+        compressible = posixpath.splitext(rel_path)[1] in COMPRESSIBLE_SUFFIXES
+        compress = (compressible and byte_range is None and size >= GZIP_MIN_SIZE
+                    and accepts_gzip(self.headers.get('Accept-Encoding')))
+        response_etag = gzip_etag(etag) if compress else etag
+
+        if self.is_not_modified(etag, mtime):
+            f.close()
+            self.send_response(304)
+            self.send_validators(response_etag, mtime, compressible)
+            self.end_headers()
+            return None
+
+        if byte_range is not None and not byte_range:
+            f.close()
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+
+        if compress:
+            data = f.read()
+            f.close()
+            f = io.BytesIO(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))
+            self.body_length = f.getbuffer().nbytes
+        elif byte_range is not None:
+            f.seek(byte_range.start)
+            self.body_length = len(byte_range)
+        else:
+            self.body_length = size
+
+        self.send_response(206 if byte_range is not None else 200)
+        self.send_header('Content-Type', self.guess_type(rel_path))
+        self.send_header('Content-Length', str(self.body_length))
+        if compress:
+            self.send_header('Content-Encoding', 'gzip')
+        if byte_range is not None:
+            self.send_header('Content-Range',
+                             f'bytes {byte_range.start}-{byte_range.stop - 1}/{size}')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_validators(response_etag, mtime, compressible)
+        self.end_headers()
+        return f
+
+    def is_not_modified(self, etag, mtime):
+        """
+        Return True if the conditional headers show the browser's copy of a
+        file is current; etag is that of the file before any compression
+        """
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            # Weak comparison, and either encoding of the file will do
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in tags or any(tag in tags for tag in (etag, gzip_etag(etag)))
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is None or mtime is None:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # Last-Modified has a resolution of one second
+        return int(mtime) <= since.timestamp()
+
+    def send_validators(self, etag, mtime, compressible):
+        """Send the caching headers of a file."""
+        self.send_header('ETag', etag)
+        if mtime is not None:
+            self.send_header('Last-Modified', self.date_time_string(mtime))
+        # Revalidate on every load, which the validators make cheap
+        self.send_header('Cache-Control', 'no-cache')
+        if compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+
+    def copyfile(self, source, outputfile):
+        """Copy the body_length bytes of a response; files on disk are sent with sendfile()."""
+        if isinstance(source, io.BufferedReader):
+            self.connection.sendfile(source, source.tell(), self.body_length)
+        else:
+            outputfile.write(source.read(self.body_length))
+
+    def send_event_stream(self):
+        """Stream rebuild notifications until the browser disconnects."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        # The stream has no length, so it ends with the connection
+        self.send_header('Connection', 'close')
+        self.end_headers()
+
+        # A reconnecting browser gets the events it missed (or a full reload
+        # if they are older than the history), unless they came from an
+        # earlier run of the server
+        last_id = self.live_reload.last_id
+        try:
+            resume_id = int(self.headers.get('Last-Event-ID', ''))
+        except ValueError:
+            resume_id = None
+        if resume_id is not None and resume_id <= last_id:
+            last_id = resume_id
+
+        try:
+            self.wfile.write(b'retry: 1000\n\n')
+            self.wfile.flush()
+            while True:
+                events = self.live_reload.wait(last_id, LIVE_RELOAD_KEEPALIVE)
+                if not events:
+                    # Detects browsers that went away
+                    self.wfile.write(b': keep-alive\n\n')
+                for last_id, event, data in events:
+                    self.wfile.write(f'id: {last_id}\nevent: {event}\ndata: {data}\n\n'.encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
 
     def log_message(self, format, *args):
         """Override to reduce verbosity."""
-        # Only log errors
-        if args[1] != '200':
+        # Only log errors (successful requests, redirects and 304s are quiet)
+        if not str(args[1]).startswith(('2', '3')):
             timestamp = datetime.now().strftime("%H:%M:%S")
             print(f"{Colors.CYAN}[{timestamp}]{Colors.RESET} "
                   f"{Colors.RED}{self.address_string()} - {format % args}{Colors.RESET}")
 
 
-def start_http_server(project_root):
+def start_http_server(output, live_reload=None):
     """Start the HTTP server in a separate thread."""
-    # Use absolute path for serving directory
-    serve_dir = os.path.join(project_root, OUTPUT_DIR)
-
-    # Create server with handler that uses fixed directory
-    Handler = lambda *args, **kwargs: QuietHTTPRequestHandler(*args, directory=serve_dir, **kwargs)
-    with socketserver.TCPServer((HOST, PORT), Handler) as httpd:
+    # Create server with handler that serves the in-memory site; every
+    # connection gets a thread, as keep-alive connections and live reload
+    # streams stay open, and a slow download never holds up other browsers
+    Handler = lambda *args, **kwargs: QuietHTTPRequestHandler(
+        *args, output=output, live_reload=live_reload, **kwargs
+    )
+    with http.server.ThreadingHTTPServer((HOST, PORT), Handler) as httpd:
         print(f"{Colors.GREEN}📡 Server running at {Colors.BOLD}http://{HOST}:{PORT}/{Colors.RESET}")
-        print(f"{Colors.CYAN}📂 Serving files from: {Colors.RESET}{serve_dir}\n")
+        print(f"{Colors.CYAN}📂 Serving the site from memory, static files from: "
+              f"{Colors.RESET}{config.STATIC_DIR}/\n")
         httpd.serve_forever()
 
 
-def start_file_watcher(project_root):
+def start_file_watcher(project_root, output, live_reload=None):
     """Start watching for file changes."""
-    event_handler = SiteRebuilder(project_root)
+    event_handler = SiteRebuilder(project_root, output, live_reload)
     observer = Observer()
 
     # Watch specified directories (use absolute paths)
@@ -206,10 +686,11 @@ def main():
     # Save the project root directory
     project_root = os.getcwd()
 
-    # Initial build
+    # Initial build, kept in memory
+    output = MemorySink()
     print(f"{Colors.BLUE}🚀 Performing initial build...{Colors.RESET}")
     try:
-        generate_site.generate_site()
+        generate_site.generate_site(output=output, **BUILD_OPTIONS)
         print(f"{Colors.GREEN}✅ Initial build complete!{Colors.RESET}\n")
     except Exception as e:
         print(f"{Colors.RED}❌ Initial build failed: {e}{Colors.RESET}")
@@ -217,17 +698,20 @@ def main():
         sys.exit(1)
 
     # Start file watcher
-    observer = start_file_watcher(project_root)
+    live_reload = LiveReload()
+    observer = start_file_watcher(project_root, output, live_reload)
 
     # Start HTTP server in a separate thread
-    server_thread = threading.Thread(target=start_http_server, args=(project_root,), daemon=True)
+    server_thread = threading.Thread(
+        target=start_http_server, args=(output, live_reload), daemon=True,
+    )
     server_thread.start()
 
     # Instructions
     print(f"{Colors.YELLOW}💡 Tips:{Colors.RESET}")
     print(f"   • Edit files in content/, templates/, or config files")
     print(f"   • Site will automatically rebuild on changes")
-    print(f"   • Refresh your browser to see updates")
+    print(f"   • Open pages reload by themselves, stylesheets are swapped in place")
     print(f"   • Press {Colors.BOLD}Ctrl+C{Colors.RESET} to stop\n")
 
     print(f"{Colors.GREEN}✨ Development server is ready!{Colors.RESET}")
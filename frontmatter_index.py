@@ -0,0 +1,165 @@
+"""
+Persistent frontmatter index for content files
+
+Stores each page's parsed YAML frontmatter in a SQLite database, keyed by
+path and by a hash of the frontmatter block. Lookups for unchanged files
+(same mtime and size) never open the file; changed files are read only up
+to the closing '---', so Markdown bodies are never read or parsed.
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+from pathlib import Path
+
+import yaml
+
+try:
+    # libyaml-backed loader, much faster than the pure-Python one
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+FRONTMATTER_DELIMITER = '---'
+
+
+def load_yaml(text):
+    """Parse a YAML frontmatter block, using libyaml when available"""
+    return yaml.load(text, Loader=SafeLoader) or {}
+
+
+def split_frontmatter(content):
+    """
+    Split file content into (frontmatter_text, markdown_body)
+
+    frontmatter_text is None when the content has no frontmatter block.
+    """
+    if content.startswith(FRONTMATTER_DELIMITER):
+        parts = content.split(FRONTMATTER_DELIMITER, 2)
+        if len(parts) >= 3:
+            return parts[1], parts[2].strip()
+    return None, content
+
+
+def read_frontmatter_text(filepath):
+    """
+    Read only the frontmatter block of a file
+
+    Stops reading at the closing delimiter. Returns None when the file has
+    no (complete) frontmatter block.
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        if f.read(len(FRONTMATTER_DELIMITER)) != FRONTMATTER_DELIMITER:
+            return None
+        lines = []
+        for line in f:
+            end = line.find(FRONTMATTER_DELIMITER)
+            if end != -1:
+                lines.append(line[:end])
+                return ''.join(lines)
+            lines.append(line)
+    return None
+
+
+def read_frontmatter(filepath):
+    """Read and parse only the frontmatter of a file"""
+    text = read_frontmatter_text(filepath)
+    return load_yaml(text) if text is not None else {}
+
+
+class FrontmatterIndex:
+    """SQLite-backed cache of parsed frontmatter, keyed by path and hash."""
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS frontmatter (
+                path TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            )
+        ''')
+
+    def close(self):
+        """Commit pending updates and close the database"""
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _row(self, key):
+        return self.conn.execute(
+            'SELECT digest, mtime_ns, size, data FROM frontmatter WHERE path = ?', (key,)
+        ).fetchone()
+
+    def _store(self, key, digest, mtime_ns, size, frontmatter):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO frontmatter (path, digest, mtime_ns, size, data) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (key, digest, mtime_ns, size,
+             pickle.dumps(frontmatter, protocol=pickle.HIGHEST_PROTOCOL)),
+        )
+
+    def get(self, filepath):
+        """Return the parsed frontmatter of filepath, updating the index if needed"""
+        key = Path(filepath).as_posix()
+        st = os.stat(filepath)
+        row = self._row(key)
+        if row and row[1] == st.st_mtime_ns and row[2] == st.st_size:
+            return pickle.loads(row[3])
+
+        text = read_frontmatter_text(filepath)
+        digest = hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+        if row and row[0] == digest:
+            # File touched or body edited, frontmatter unchanged
+            frontmatter = pickle.loads(row[3])
+        else:
+            frontmatter = load_yaml(text) if text is not None else {}
+
+        self._store(key, digest, st.st_mtime_ns, st.st_size, frontmatter)
+        return frontmatter
+
+    def get_cached(self, filepath):
+        """Return the indexed frontmatter of filepath if the file is unchanged, else None"""
+        st = os.stat(filepath)
+        row = self._row(Path(filepath).as_posix())
+        if row and row[1] == st.st_mtime_ns and row[2] == st.st_size:
+            return pickle.loads(row[3])
+        return None
+
+    def update(self, filepath, signature, text, frontmatter):
+        """
+        Record frontmatter parsed elsewhere, e.g. in a worker process
+
+        signature is the (mtime_ns, size) of the file taken before text was read.
+        """
+        digest = hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+        mtime_ns, size = signature
+        self._store(Path(filepath).as_posix(), digest, mtime_ns, size, frontmatter)
+
+    def pages(self):
+        """Iterate over (path, frontmatter) for every indexed page, in path order"""
+        for path, data in self.conn.execute('SELECT path, data FROM frontmatter ORDER BY path'):
+            yield path, pickle.loads(data)
+
+    def remove(self, filepath):
+        """Drop the index entry of filepath"""
+        self.conn.execute('DELETE FROM frontmatter WHERE path = ?', (Path(filepath).as_posix(),))
+
+    def prune(self, filepaths):
+        """Drop index entries for files not in filepaths"""
+        keep = {Path(p).as_posix() for p in filepaths}
+        stale = [
+            (path,) for (path,) in self.conn.execute('SELECT path FROM frontmatter')
+            if path not in keep
+        ]
+        self.conn.executemany('DELETE FROM frontmatter WHERE path = ?', stale)
@@ -3,129 +3,181 @@
 Static site generator for Summarum website
 """
 
+import argparse
+import contextlib
+import cProfile
+import io
+import itertools
+import json
 import os
+import hashlib
 import shutil
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from datetime import datetime
-import yaml
+from datetime import datetime, timezone
 import markdown
-from jinja2 import Environment, FileSystemLoader
+import jinja2
+import yaml
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    ModuleLoader,
+    TemplateNotFound,
+    meta,
+    pass_context,
+)
 
 import config
+from asset_manifest import (
+    MANIFEST_NAME as ASSET_MANIFEST_NAME,
+    asset_url,
+    build_asset_manifest,
+    fingerprint_name,
+    pop_resolved_assets,
+    rewrite_asset_urls,
+    set_asset_manifest,
+    write_asset_manifest,
+)
+from code_highlight import CACHE_VERSION as HIGHLIGHT_CACHE_VERSION, get_pygments_stylesheet, set_highlight_cache
+from build_manifest import BuildManifest, data_digest, file_digest
+from build_profile import NULL_PROFILER, BuildProfiler
+from content_schema import format_errors, validate_frontmatter
+from deploy_manifest import update_deploy_manifest
+from design_tokens import OUTPUT_SUBDIR as TOKENS_SUBDIR, compile_tokens, get_token_urls
+from frontmatter_index import (
+    FrontmatterIndex,
+    load_yaml,
+    read_frontmatter_text,
+    split_frontmatter,
+)
+from html_minify import minify_chunks
+from markdown_cache import CACHE_VERSION as MARKDOWN_CACHE_VERSION, DiskCache, MarkdownConverter
+from precompress import VariantWriter, compress_tree, is_compressed_variant, remove_variants
+from output_sink import DirectorySink
+from search_index import SearchIndex, page_terms, page_url
+from responsive_images import (
+    build_image_variants,
+    collect_screenshot_urls,
+    get_formats,
+    image_digest,
+    responsive_image,
+)
+from tailwind_css import ClassCollector, generate_css
 
 
-def parse_markdown_file(filepath):
-    """Parse markdown file with YAML frontmatter"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+# Output subdirectories written by other build stages
+RESERVED_OUTPUT_DIRS = {'static', 'assets', 'search'}
 
-    # Split frontmatter and content
-    if content.startswith('---'):
-        parts = content.split('---', 2)
-        if len(parts) >= 3:
-            frontmatter = yaml.safe_load(parts[1])
-            markdown_content = parts[2].strip()
-        else:
-            frontmatter = {}
-            markdown_content = content
-    else:
-        frontmatter = {}
-        markdown_content = content
+# Output directory of the generated stylesheets, relative to the site root
+STYLESHEET_SUBDIR = 'assets/css'
+
+# Pages sent to a worker process at a time, and batches in flight per worker.
+# Together they bound how many pages are held in memory during a build.
+PAGE_BATCH_SIZE = 8
+BATCHES_PER_WORKER = 4
+
+# Bump when a change to the template helpers changes compiled templates;
+# cached bytecode and precompiled templates of other versions are not used
+TEMPLATE_CACHE_VERSION = 2
+
+# codehilite, with highlighted code blocks cached across pages and builds
+MARKDOWN_EXTENSIONS = ['extra', 'code_highlight:CachedCodeHiliteExtension']
+
+
+def parse_markdown_file(filepath, md=None, frontmatter=None, profiler=NULL_PROFILER):
+    """
+    Parse markdown file with YAML frontmatter
+
+    Pass a MarkdownConverter as md to reuse one Markdown instance and the
+    persistent HTML cache instead of building a fresh converter. Pass frontmatter
+    (e.g. from the frontmatter index) to skip parsing the YAML block again.
+    """
+    page = Path(filepath).as_posix()
+    with profiler.phase('read', page):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        # Split frontmatter and content
+        frontmatter_text, markdown_content = split_frontmatter(content)
+
+    if frontmatter is None:
+        with profiler.phase('yaml_parse', page):
+            frontmatter = load_yaml(frontmatter_text) if frontmatter_text is not None else {}
 
     # Convert markdown to HTML
-    html_content = markdown.markdown(markdown_content, extensions=['extra', 'codehilite'])
+    with profiler.phase('markdown', page):
+        if md is None:
+            html_content = markdown.markdown(markdown_content, extensions=MARKDOWN_EXTENSIONS)
+        else:
+            html_content = md.convert(markdown_content)
 
     return frontmatter, html_content
 
 
 def validate_landing_page(frontmatter, filepath):
     """Validate landing page frontmatter has all required fields"""
-    errors = []
-
-    # Check required top-level fields
-    required_fields = ['tagline', 'hero_description', 'cta_buttons', 'features', 'screenshots', 'contact_section']
-    for field in required_fields:
-        if field not in frontmatter:
-            errors.append(f"Missing required field: '{field}'")
-
-    # Validate cta_buttons
-    if 'cta_buttons' in frontmatter:
-        if not isinstance(frontmatter['cta_buttons'], list):
-            errors.append("'cta_buttons' must be a list/array")
-        elif len(frontmatter['cta_buttons']) == 0:
-            errors.append("'cta_buttons' array cannot be empty")
-        else:
-            for i, button in enumerate(frontmatter['cta_buttons']):
-                button_required = ['label', 'url', 'color', 'icon']
-                for field in button_required:
-                    if field not in button:
-                        errors.append(f"cta_buttons[{i}] missing required field: '{field}'")
-
-    # Validate features
-    if 'features' in frontmatter:
-        if not isinstance(frontmatter['features'], list):
-            errors.append("'features' must be a list/array")
-        elif len(frontmatter['features']) == 0:
-            errors.append("'features' array cannot be empty")
-        else:
-            for i, feature in enumerate(frontmatter['features']):
-                feature_required = ['title', 'description', 'icon', 'color']
-                for field in feature_required:
-                    if field not in feature:
-                        errors.append(f"features[{i}] missing required field: '{field}'")
-
-    # Validate screenshots
-    if 'screenshots' in frontmatter:
-        if not isinstance(frontmatter['screenshots'], list):
-            errors.append("'screenshots' must be a list/array")
-        elif len(frontmatter['screenshots']) == 0:
-            errors.append("'screenshots' array cannot be empty - if the array is empty, this is a configuration error")
-        else:
-            for i, screenshot in enumerate(frontmatter['screenshots']):
-                screenshot_required = ['image', 'alt']
-                for field in screenshot_required:
-                    if field not in screenshot:
-                        errors.append(f"screenshots[{i}] missing required field: '{field}'")
-
-    # Validate contact_section
-    if 'contact_section' in frontmatter:
-        if not isinstance(frontmatter['contact_section'], dict):
-            errors.append("'contact_section' must be an object/dictionary")
-        else:
-            contact_required = ['title', 'description', 'email']
-            for field in contact_required:
-                if field not in frontmatter['contact_section']:
-                    errors.append(f"contact_section missing required field: '{field}'")
-
+    errors = validate_frontmatter(frontmatter, 'landing.html')
     if errors:
-        error_message = f"\n❌ Validation failed for {filepath}:\n"
-        for error in errors:
-            error_message += f"   • {error}\n"
-        raise ValueError(error_message)
+        raise ValueError(format_errors(filepath, errors))
 
     print(f"   ✅ Validation passed for landing page")
 
 
-def generate_site():
-    """Main site generation function"""
-    print("🚀 Generating Summarum website...")
+def parse_frontmatter_file(filepath):
+    """
+    Read and parse the frontmatter of one file for --check
 
-    # Setup paths
-    content_dir = Path(config.CONTENT_DIR)
-    template_dir = Path(config.TEMPLATE_DIR)
-    static_dir = Path(config.STATIC_DIR)
-    output_dir = Path(config.OUTPUT_DIR)
+    Returns (signature, text, frontmatter, error); error is a message when
+    the YAML block cannot be parsed.
+    """
+    st = os.stat(filepath)
+    text = read_frontmatter_text(filepath)
+    try:
+        frontmatter = load_yaml(text) if text is not None else {}
+    except yaml.YAMLError as e:
+        message = ' '.join(line.strip() for line in str(e).splitlines())
+        return None, text, None, f"Invalid YAML frontmatter: {message}"
+    return (st.st_mtime_ns, st.st_size), text, frontmatter, None
 
-    # Clean and create output directory
-    if output_dir.exists():
-        shutil.rmtree(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Initialize Jinja2
-    env = Environment(loader=FileSystemLoader(template_dir))
+def parse_frontmatter_files(filepaths):
+    """Parse a batch of frontmatter blocks in a worker process"""
+    return [parse_frontmatter_file(filepath) for filepath in filepaths]
 
-    # Add config to template context
-    template_context = {
+
+def check_page(filepath, frontmatter, template_dir):
+    """Return the validation errors for one page's frontmatter"""
+    if not isinstance(frontmatter, dict):
+        return validate_frontmatter(frontmatter, 'page.html')
+
+    template = frontmatter.get('template', 'page.html')
+    if not isinstance(template, str):
+        return ["'template' must be a string"]
+    template_name = get_template_name(frontmatter)
+    if not (template_dir / template_name).is_file():
+        return [f"Template not found: '{template_name}'"]
+    return validate_frontmatter(frontmatter, template_name)
+
+
+def get_build_date():
+    """
+    Return the date the site is built for
+
+    SOURCE_DATE_EPOCH, when set, pins the date so that repeated builds of
+    the same inputs produce identical output.
+    """
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), tz=timezone.utc)
+    return datetime.now(timezone.utc)
+
+
+def build_template_context():
+    """Build the site-wide template context from config and design variables"""
+    return {
         'site': {
             'name': config.SITE_NAME,
             'tagline': config.SITE_TAGLINE,
@@ -137,7 +189,7 @@ def generate_site():
         'macos_download_link': config.MACOS_DOWNLOAD_LINK,
         'google_analytics_id': config.GOOGLE_ANALYTICS_ID,
         'enable_analytics': config.ENABLE_ANALYTICS,
-        'current_year': datetime.now().year,
+        'current_year': get_build_date().year,
         # Design system variables
         'brand_colors': config.BRAND_COLORS,
         'background_colors': config.BACKGROUND_COLORS,
@@ -154,77 +206,1015 @@ def generate_site():
         'feature_card_styles': config.FEATURE_CARD_STYLES,
         'gradients': config.GRADIENTS,
         'tailwind_config': config.get_tailwind_config(),
+        # Content-hashed URLs of the compiled design tokens ('css', 'json')
+        'design_tokens': get_token_urls(),
     }
 
-    # Process markdown files
-    markdown_files = list(content_dir.glob('*.md'))
-    print(f"📄 Found {len(markdown_files)} content files")
 
-    for md_file in markdown_files:
-        print(f"   Processing {md_file.name}...")
-        frontmatter, html_content = parse_markdown_file(md_file)
+def get_template_name(frontmatter):
+    """Get template name from frontmatter or use default"""
+    template_name = frontmatter.get('template', 'page.html')
+    if not template_name.endswith('.html'):
+        template_name = f'{template_name}.html'
+    return template_name
+
+
+def discover_content_files(content_dir):
+    """
+    Yield the Markdown files under content_dir, recursively and in sorted order
+
+    Files are yielded as directories are scanned, without collecting the
+    whole tree first. Hidden files and directories are skipped.
+    """
+    entries = sorted(os.scandir(content_dir), key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.name.startswith('.'):
+            continue
+        if entry.is_dir():
+            yield from discover_content_files(Path(entry.path))
+        elif entry.name.endswith('.md'):
+            yield Path(entry.path)
+
+
+def get_output_path(md_file, content_dir):
+    """Determine the output path of a content file relative to the site root, mirroring its directory"""
+    relative = md_file.relative_to(content_dir).with_suffix('.html')
+    if len(relative.parts) > 1 and relative.parts[0] in RESERVED_OUTPUT_DIRS:
+        raise ValueError(
+            f"Content directory '{relative.parts[0]}/' clashes with generated output "
+            f"in {md_file}"
+        )
+    return relative
+
+
+def resolve_template_chain(env, template_name):
+    """Return the template and every template it extends, includes or imports"""
+    chain = set()
+    pending = [template_name]
+    while pending:
+        name = pending.pop()
+        if name in chain:
+            continue
+        chain.add(name)
+        source, _, _ = env.loader.get_source(env, name)
+        for referenced in meta.find_referenced_templates(env.parse(source)):
+            # None means a dynamic reference that cannot be resolved statically
+            if referenced is not None:
+                pending.append(referenced)
+    return sorted(chain)
+
+
+class TemplateDigests:
+    """Digests and template chains of the templates, each looked up once per build."""
+
+    def __init__(self, env):
+        self.env = env
+        self._digests = {}
+        self._chains = {}
+
+    def digest(self, name):
+        """Return the digest of a template's source, or None if it does not exist"""
+        if name not in self._digests:
+            try:
+                source, _, _ = self.env.loader.get_source(self.env, name)
+            except TemplateNotFound:
+                self._digests[name] = None
+            else:
+                self._digests[name] = data_digest(source)
+        return self._digests[name]
+
+    def chain(self, name):
+        """Return {template name: digest} for a template and every template it uses"""
+        if name not in self._chains:
+            self._chains[name] = {
+                used: self.digest(used) for used in resolve_template_chain(self.env, name)
+            }
+        return self._chains[name]
+
+
+def get_template_digests(template_dir):
+    """Digest the source of every template, keyed by template name"""
+    loader = FileSystemLoader(template_dir)
+    env = Environment(loader=loader)
+    return {
+        name: data_digest(loader.get_source(env, name)[0])
+        for name in loader.list_templates()
+    }
+
+
+@pass_context
+def asset_url_filter(context, url):
+    """
+    Template filter: asset_url()
+
+    Taking the context keeps Jinja2 from resolving literal URLs at compile
+    time, which would keep stale fingerprints in cached and precompiled
+    templates.
+    """
+    return asset_url(url)
+
+
+def add_template_helpers(env):
+    """Register the site's template globals and filters on a Jinja2 environment"""
+    env.globals['responsive_image'] = responsive_image
+    env.globals['asset_url'] = asset_url
+    env.filters['asset_url'] = asset_url_filter
+
+
+def compile_templates(template_dir):
+    """Compile all templates ahead of time into importable Python modules"""
+    compiled_dir = Path(config.CACHE_DIR) / 'templates-compiled'
+    if compiled_dir.exists():
+        shutil.rmtree(compiled_dir)
+
+    env = Environment(loader=FileSystemLoader(template_dir))
+    add_template_helpers(env)
+    env.compile_templates(compiled_dir, zip=None, ignore_errors=False)
+
+    # Record what the modules were compiled from so stale ones are ignored
+    stamp = {
+        'jinja2': jinja2.__version__,
+        'version': TEMPLATE_CACHE_VERSION,
+        'templates': get_template_digests(template_dir),
+    }
+    with open(compiled_dir / 'templates.json', 'w', encoding='utf-8') as f:
+        json.dump(stamp, f, sort_keys=True)
+
+    print(f"   ✅ Compiled {len(stamp['templates'])} templates to {compiled_dir}")
+
+
+def load_precompiled_templates(template_dir):
+    """Return a loader for precompiled templates, or None if missing or stale"""
+    compiled_dir = Path(config.CACHE_DIR) / 'templates-compiled'
+    try:
+        with open(compiled_dir / 'templates.json', 'r', encoding='utf-8') as f:
+            stamp = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    if stamp.get('jinja2') != jinja2.__version__:
+        return None
+    if stamp.get('version') != TEMPLATE_CACHE_VERSION:
+        return None
+    if stamp.get('templates') != get_template_digests(template_dir):
+        return None
+    return ModuleLoader(compiled_dir)
+
+
+def create_environment(template_dir):
+    """
+    Create the Jinja2 environment used to render pages
+
+    Templates compiled ahead of time with --compile-templates are loaded
+    directly as long as they match the current template sources. Otherwise
+    templates are compiled on demand through a persistent bytecode cache,
+    which Jinja2 keys by template name and invalidates by source checksum.
+    """
+    loader = load_precompiled_templates(template_dir)
+    if loader is None:
+        loader = FileSystemLoader(template_dir)
+
+    bytecode_dir = Path(config.CACHE_DIR) / 'templates-bytecode'
+    bytecode_dir.mkdir(parents=True, exist_ok=True)
+    bytecode_cache = FileSystemBytecodeCache(
+        str(bytecode_dir), f'__jinja2_v{TEMPLATE_CACHE_VERSION}_%s.cache',
+    )
+    env = Environment(loader=loader, bytecode_cache=bytecode_cache)
+    add_template_helpers(env)
+    return env
+
+
+def open_markdown_cache():
+    """Open the persistent cache of converted Markdown bodies"""
+    return DiskCache(Path(config.CACHE_DIR) / 'markdown.sqlite', config.MARKDOWN_CACHE_MAX_BYTES)
+
+
+def open_highlight_cache():
+    """Open the persistent cache of highlighted code blocks"""
+    return DiskCache(Path(config.CACHE_DIR) / 'highlight.sqlite', config.HIGHLIGHT_CACHE_MAX_BYTES)
+
+
+# Per-process rendering state, set up once per worker by init_page_worker()
+_page_worker = {}
+
+
+def init_page_worker(template_dir, template_context, output, profile=False, minify=False,
+                     assets=None, precompress=False):
+    """Create the Jinja2 environment and Markdown converter for this process"""
+    set_asset_manifest(assets or {})
+    _page_worker['profiler'] = BuildProfiler() if profile else NULL_PROFILER
+    _page_worker['env'] = create_environment(template_dir)
+    _page_worker['md'] = MarkdownConverter(MARKDOWN_EXTENSIONS, cache=open_markdown_cache())
+    set_highlight_cache(open_highlight_cache())
+    _page_worker['context'] = template_context
+    _page_worker['minify'] = minify
+    _page_worker['precompress'] = precompress
+    _page_worker['output'] = output
+
+
+def build_page(task):
+    """
+    Parse, validate, render and write a single page
+
+    Runs inside a page worker. Anything the page prints is captured and
+    returned as 'log' so the caller can replay it in a deterministic order,
+    along with the page's phase timings when profiling.
+    """
+    md_file = task['source']
+    env = _page_worker['env']
+    profiler = _page_worker['profiler']
+    page = task['page']
+
+    # Forget assets resolved outside page builds in this process
+    pop_resolved_assets()
+
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        frontmatter, html_content = parse_markdown_file(
+            md_file, _page_worker['md'], task['frontmatter'], profiler,
+        )
 
         # Validate landing page (index.md) has required fields
-        if md_file.stem == 'index' and frontmatter.get('template') == 'landing':
-            validate_landing_page(frontmatter, md_file.name)
+        with profiler.phase('validate', page):
+            if md_file.stem == 'index' and frontmatter.get('template') == 'landing':
+                validate_landing_page(frontmatter, md_file.name)
+
+    template_name = get_template_name(frontmatter)
+
+    # Search index terms, unless the page opts out with 'search: false'
+    search = None
+    if frontmatter.get('search', True) is not False:
+        with profiler.phase('search', page):
+            title = frontmatter.get('title', config.SITE_NAME)
+            description = frontmatter.get('description', config.SITE_DESCRIPTION)
+            search = {
+                'title': title,
+                'description': description,
+                'terms': page_terms(title, description, html_content),
+            }
 
-        # Determine output filename
-        if md_file.stem == 'index':
-            output_file = output_dir / 'index.html'
+    # Render, minify, compress and write as one stream; the phases are
+    # interleaved, so they are timed together
+    with profiler.phase('render', page):
+        output_digest, classes, variants = write_page(
+            render_page(env, _page_worker['context'], template_name, frontmatter, html_content),
+            _page_worker['output'], task['output'], _page_worker['minify'],
+            _page_worker['precompress'],
+        )
+
+    return {
+        'output_digest': output_digest,
+        'variants': variants,
+        'template': template_name,
+        'classes': classes,
+        'assets': pop_resolved_assets(),
+        'search': search,
+        'log': log.getvalue(),
+        'profile': profiler.pop_page_stats(page),
+    }
+
+
+def render_page(env, template_context, template_name, frontmatter, html_content):
+    """Render a page through its template, returning an iterator of HTML chunks"""
+    template = env.get_template(template_name)
+    # Pass all frontmatter to page context, with asset URLs fingerprinted
+    # and content added
+    page_context = {
+        **rewrite_asset_urls(frontmatter),
+        'content': html_content,
+    }
+    # Ensure title and description have defaults if not in frontmatter
+    if 'title' not in page_context:
+        page_context['title'] = config.SITE_NAME
+    if 'description' not in page_context:
+        page_context['description'] = config.SITE_DESCRIPTION
+
+    context = {
+        **template_context,
+        'page': page_context
+    }
+
+    return template.generate(**context)
+
+
+def write_page(chunks, output, output_path, minify=False, precompress=False):
+    """
+    Write a page that arrives as an iterable of HTML chunks to output_path
+
+    Each chunk is scanned for CSS classes, minified, hashed, written through
+    a buffered file of the output sink and, with precompress (directory
+    output only), fed to the .gz/.br encoders as it arrives, so the page is
+    never held in memory as a whole. Returns
+    (output digest, sorted class names, suffixes of the variants written
+    or None).
+    """
+    collector = ClassCollector()
+
+    def collect_classes(chunks):
+        for chunk in chunks:
+            collector.feed(chunk)
+            yield chunk
+
+    chunks = collect_classes(chunks)
+    if minify:
+        chunks = minify_chunks(chunks)
+
+    digest = hashlib.sha256()
+    with contextlib.ExitStack() as stack:
+        f = stack.enter_context(output.open(output_path))
+        if precompress:
+            variants = stack.enter_context(VariantWriter(output.root / output_path))
         else:
-            output_file = output_dir / f'{md_file.stem}.html'
-
-        # Get template name from frontmatter or use default
-        template_name = frontmatter.get('template', 'page.html')
-        if not template_name.endswith('.html'):
-            template_name = f'{template_name}.html'
-
-        # Render template
-        template = env.get_template(template_name)
-        # Pass all frontmatter to page context, with content added
-        page_context = {
-            **frontmatter,
-            'content': html_content,
-        }
-        # Ensure title and description have defaults if not in frontmatter
-        if 'title' not in page_context:
-            page_context['title'] = config.SITE_NAME
-        if 'description' not in page_context:
-            page_context['description'] = config.SITE_DESCRIPTION
-
-        context = {
-            **template_context,
-            'page': page_context
-        }
-
-        rendered_html = template.render(**context)
-
-        # Write output file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(rendered_html)
-
-        print(f"   ✅ Generated {output_file}")
-
-    # Copy static files
-    print(f"📦 Copying static assets...")
-    if static_dir.exists():
-        # Copy entire static directory to output
-        static_output = output_dir / 'static'
-        if static_output.exists():
-            shutil.rmtree(static_output)
-        shutil.copytree(static_dir, static_output)
-        print(f"   ✅ Copied static files to {static_output}")
+            variants = None
+        for chunk in chunks:
+            data = chunk.encode('utf-8')
+            digest.update(data)
+            f.write(data)
+            if variants is not None:
+                variants.write(data)
+
+    return (
+        digest.hexdigest(),
+        sorted(collector.close()),
+        variants.variants if variants is not None else None,
+    )
+
+
+def build_pages(tasks):
+    """Build a batch of pages in a page worker"""
+    return [build_page(task) for task in tasks]
+
+
+def run_page_builds(tasks, template_dir, template_context, output, jobs=1, profile=False,
+                    minify=False, assets=None, precompress=False):
+    """
+    Build pages into the output sink, yielding (task, result) pairs in the
+    same order as tasks
+
+    tasks may be any iterable and is consumed lazily. With jobs > 1 the pages
+    are spread over a process pool in small batches, keeping only a bounded
+    number of batches in flight; each worker keeps its own Jinja2
+    environment and Markdown converter. Pages for an in-memory sink are
+    always built in this process. assets maps logical asset URLs to
+    fingerprinted URLs.
+    """
+    if jobs <= 1 or output.in_memory:
+        init_page_worker(
+            template_dir, template_context, output, profile, minify, assets, precompress,
+        )
+        for task in tasks:
+            yield task, build_page(task)
+        return
+
+    tasks = iter(tasks)
+    in_flight = deque()
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=init_page_worker,
+        initargs=(template_dir, template_context, output, profile, minify, assets, precompress),
+    ) as executor:
+        while True:
+            batch = list(itertools.islice(tasks, PAGE_BATCH_SIZE))
+            if batch:
+                in_flight.append((batch, executor.submit(build_pages, batch)))
+            if in_flight and (not batch or len(in_flight) >= jobs * BATCHES_PER_WORKER):
+                done_batch, future = in_flight.popleft()
+                yield from zip(done_batch, future.result())
+            elif not batch:
+                break
+
+
+def get_site_assets(static_dir, fingerprint=True):
+    """Return {logical URL: fingerprinted URL} of the static files, or {} without fingerprints"""
+    if not fingerprint or not static_dir.exists():
+        return {}
+    return build_asset_manifest(static_dir, Path(config.CACHE_DIR) / 'assets.json')
+
+
+def get_context_digest(template_context, minify):
+    """
+    Digest everything that every page depends on
+
+    Any change to config, design variables, the image settings, the
+    Markdown and highlighting cache versions or the generator itself
+    invalidates every page. Embedded screenshots and
+    linked static assets are recorded per page instead (see
+    record_built_page()).
+    """
+    return data_digest({
+        'context': template_context,
+        'generator': file_digest(__file__),
+        'minify': minify and file_digest(Path(__file__).with_name('html_minify.py')),
+        'markdown': [MARKDOWN_CACHE_VERSION, HIGHLIGHT_CACHE_VERSION],
+        'images': {
+            'helper': file_digest(Path(__file__).with_name('responsive_images.py')),
+            'widths': config.RESPONSIVE_IMAGE_WIDTHS,
+            'encoders': config.RESPONSIVE_IMAGE_ENCODER_OPTIONS,
+            'formats': get_formats(),
+        },
+    })
+
+
+def record_built_page(task, result, manifest, search_index, templates, build, output_dir,
+                      profiler=NULL_PROFILER):
+    """
+    Record a page rendered by run_page_builds() in the manifest and the search index
+
+    Shared by generate_site() and rebuild_pages(). Returns the manifest
+    entry of the page.
+    """
+    print(f"   Processing {task['source'].relative_to(config.CONTENT_DIR)}...")
+    print(result['log'], end='')
+    profiler.merge_page(task['page'], result['profile'])
+
+    # Screenshot variants are referenced by content hash, so the page is
+    # rebuilt when a screenshot it embeds changes
+    images = {
+        url: image_digest(url) for url in collect_screenshot_urls([task['frontmatter']])
+    }
+    output_path = task['output']
+    manifest.record_page(
+        task['page'], task['source'], task['source_digest'], templates.chain(result['template']),
+        images, result['assets'], build, output_path, result['output_digest'], result['classes'],
+    )
+
+    search = result['search'] or {}
+    search_index.update_page(
+        task['page'], page_url(output_path), search.get('title'),
+        search.get('description'), search.get('terms'),
+    )
+
+    print(f"   ✅ Generated {output_dir / output_path}")
+    return manifest.pages[task['page']]
+
+
+def remove_page_output(manifest, page_key, build, output_dir):
+    """Forget a page that no longer exists and delete its output file"""
+    entry = manifest.forget_page(page_key)
+    if entry is not None and build.remove(entry['output']):
+        print(f"   🗑️  Removed {output_dir / entry['output']}")
+
+
+def render_tailwind_stylesheet(manifest, profiler=NULL_PROFILER):
+    """
+    Render the Tailwind stylesheet with only the utilities used by the pages
+
+    The stylesheet is built from the classes recorded for every page in the
+    manifest, so unchanged pages are not read again. Returns (stylesheet,
+    classes the stylesheet does not support).
+    """
+    with profiler.phase('tailwind'):
+        classes = manifest.used_classes() | set(config.TAILWIND_SAFELIST)
+        stylesheet, unknown = generate_css(classes, config.get_tailwind_config())
+    unsupported = [name for name in unknown if name not in config.TAILWIND_CUSTOM_CLASSES]
+    return stylesheet.encode('utf-8'), unsupported
+
+
+def stylesheet_path(name, data, fingerprint):
+    """Return the output path of a generated stylesheet, content-hashed with fingerprint"""
+    if fingerprint:
+        name = fingerprint_name(name, hashlib.sha256(data).hexdigest())
+    return f'{STYLESHEET_SUBDIR}/{name}'
+
+
+def add_stylesheet_urls(assets, stylesheets, fingerprint):
+    """
+    Add the generated stylesheets ({name: content}) to assets
+
+    Pages link them through asset_url like static files, so with
+    fingerprint they can be cached as immutable.
+    """
+    if fingerprint:
+        for name, data in stylesheets.items():
+            assets[f'/{STYLESHEET_SUBDIR}/{name}'] = '/' + stylesheet_path(name, data, fingerprint)
+
+
+def write_stylesheets(build, stylesheets, fingerprint, output_dir):
+    """Write the generated stylesheets ({name: content}) and remove the ones they replace"""
+    wanted = set()
+    for name, data in stylesheets.items():
+        path = stylesheet_path(name, data, fingerprint)
+        wanted.add(path)
+        if build.write(path, data):
+            print(f"   🎨 Generated {output_dir / path}")
+    for name in build.list(STYLESHEET_SUBDIR):
+        path = f'{STYLESHEET_SUBDIR}/{name}'
+        if name.endswith('.css') and path not in wanted:
+            build.remove(path)
+
+
+def report_unsupported_classes(unsupported):
+    """Warn about classes the Tailwind stylesheet does not support"""
+    # Typos and utilities the generator does not cover would otherwise
+    # silently go unstyled
+    if unsupported:
+        print(f"   ⚠️  Unsupported Tailwind classes (not in the stylesheet): {', '.join(unsupported)}")
+
+
+def check_site(jobs=1):
+    """
+    Validate the frontmatter of every content file without building
+
+    Frontmatter that is unchanged since it was last indexed is taken from the
+    frontmatter index; the rest is parsed in jobs worker processes. Every
+    page is checked against its template's schema and all errors are
+    reported together. Nothing is rendered and the output directory is not
+    touched. Returns the number of pages with errors.
+    """
+    print("🔍 Checking Summarum content...")
+
+    content_dir = Path(config.CONTENT_DIR)
+    template_dir = Path(config.TEMPLATE_DIR)
+    md_files = list(discover_content_files(content_dir))
+
+    results = {}
+    with FrontmatterIndex(Path(config.CACHE_DIR) / 'frontmatter.sqlite') as frontmatter_index:
+        to_parse = []
+        for md_file in md_files:
+            frontmatter = frontmatter_index.get_cached(md_file)
+            if frontmatter is None:
+                to_parse.append(md_file)
+            else:
+                results[md_file] = (frontmatter, None)
+
+        batches = [
+            to_parse[i:i + PAGE_BATCH_SIZE]
+            for i in range(0, len(to_parse), PAGE_BATCH_SIZE)
+        ]
+        if jobs > 1 and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                parsed = executor.map(parse_frontmatter_files, batches)
+                parsed = list(itertools.chain.from_iterable(parsed))
+        else:
+            parsed = [parse_frontmatter_file(md_file) for md_file in to_parse]
+
+        for md_file, (signature, text, frontmatter, error) in zip(to_parse, parsed):
+            results[md_file] = (frontmatter, error)
+            if error is None:
+                frontmatter_index.update(md_file, signature, text, frontmatter)
+
+    failed = 0
+    for md_file in md_files:
+        frontmatter, error = results[md_file]
+        errors = [error] if error else check_page(md_file, frontmatter, template_dir)
+        if errors:
+            failed += 1
+            print(format_errors(md_file.relative_to(content_dir).as_posix(), errors))
+
+    if failed:
+        print(f"❌ {failed} of {len(md_files)} content files failed validation")
+    else:
+        print(f"✅ {len(md_files)} content files passed validation")
+    return failed
+
+
+def generate_site(incremental=False, jobs=1, profile=None, minify=None, precompress=None,
+                  fingerprint=None, output=None):
+    """
+    Main site generation function
+
+    With incremental=True, the output directory is kept and only pages whose
+    source, template chain or site context changed since the last build are
+    regenerated, each file being replaced atomically. Otherwise the site is
+    built from scratch in a staging directory that is swapped into place
+    once complete, so the output directory never holds a partial site.
+
+    output is the sink the site is written to, by default a DirectorySink
+    for config.OUTPUT_DIR; the development server passes a MemorySink.
+    Precompression and the deploy manifest only apply to directory output.
+
+    jobs sets the number of worker processes used to parse and render pages.
+
+    profile is an optional path; when given, per-phase and per-page timings
+    and memory peaks are written there as a JSON report.
+
+    minify enables HTML minification of rendered pages, precompress writes
+    .gz/.br variants of compressible output files, and fingerprint
+    publishes static files under content-hashed names; None uses
+    config.MINIFY_HTML, config.PRECOMPRESS and config.FINGERPRINT_ASSETS
+    respectively.
+    """
+    print("🚀 Generating Summarum website...")
+    if minify is None:
+        minify = config.MINIFY_HTML
+    if precompress is None:
+        precompress = config.PRECOMPRESS
+    if fingerprint is None:
+        fingerprint = config.FINGERPRINT_ASSETS
+    profiler = BuildProfiler() if profile else NULL_PROFILER
+
+    if output is None:
+        output = DirectorySink(config.OUTPUT_DIR)
+    if output.in_memory:
+        precompress = False
+
+    # Setup paths
+    content_dir = Path(config.CONTENT_DIR)
+    template_dir = Path(config.TEMPLATE_DIR)
+    static_dir = Path(config.STATIC_DIR)
+    output_dir = Path(str(output))
+    manifest_path = output.state_dir / 'manifest.json'
+
+    # Build in place when incremental, otherwise into a fresh staging
+    # directory (or an empty in-memory sink). Static files are seeded into
+    # a staging directory as hardlinks for the differential sync below.
+    if incremental:
+        manifest = BuildManifest.load(manifest_path)
+    else:
+        manifest = BuildManifest(manifest_path)
+    build = output.begin(incremental)
+
+    # Template sources, used for change detection; pages are rendered by
+    # the environments created in run_page_builds()
+    env = Environment(loader=FileSystemLoader(template_dir))
+
+    # Add config to template context
+    template_context = build_template_context()
+
+    # Fingerprinted URLs of the static assets, resolved by the asset_url
+    # template filter and in frontmatter
+    assets = get_site_assets(static_dir, fingerprint)
+
+    # Generated stylesheets are linked through asset_url as well. The
+    # Tailwind stylesheet depends on the classes of every page, so its URL
+    # is taken from the classes of the last build until the pages are built
+    stylesheets = {
+        'pygments.css': get_pygments_stylesheet(config.PYGMENTS_STYLE).encode('utf-8'),
+        'tailwind.css': render_tailwind_stylesheet(
+            manifest if incremental else BuildManifest.load(manifest_path),
+        )[0],
+    }
+    add_stylesheet_urls(assets, stylesheets, fingerprint)
+    set_asset_manifest(assets)
+
+    context_digest = get_context_digest(template_context, minify)
+    reuse_pages = incremental and manifest.context_digest == context_digest
+    manifest.context_digest = context_digest
+    templates = TemplateDigests(env)
+
+    # Process markdown files as a streaming pipeline: discovery, change
+    # detection, frontmatter lookup and rendering all pull pages one at a
+    # time, so memory use does not grow with the size of the content tree
+    print(f"📄 Processing content files in {content_dir}/...")
+    seen_pages = set()
+    page_counts = {'built': 0, 'reused': 0, 'relinked': 0}
+    # Compressed variants written along with the pages, by output path
+    page_variants = {}
+
+    def select_changed_pages(md_files):
+        for md_file in md_files:
+            page_key = md_file.as_posix()
+            seen_pages.add(page_key)
+            source_digest = manifest.source_digest(page_key, md_file)
+            if reuse_pages and manifest.is_page_current(
+                    page_key, source_digest, templates.digest, image_digest, assets, build):
+                page_counts['reused'] += 1
+                continue
+            yield page_key, md_file, source_digest
+
+    def create_page_tasks(pages, frontmatter_index):
+        # Frontmatter comes from the persistent index, so only changed
+        # frontmatter blocks are parsed
+        for page_key, md_file, source_digest in pages:
+            with profiler.phase('yaml_parse', page_key):
+                frontmatter = frontmatter_index.get(md_file)
+            yield {
+                'page': page_key,
+                'source': md_file,
+                'source_digest': source_digest,
+                'output': get_output_path(md_file, content_dir),
+                'frontmatter': frontmatter,
+            }
+
+    with (
+        FrontmatterIndex(Path(config.CACHE_DIR) / 'frontmatter.sqlite') as frontmatter_index,
+        SearchIndex(output.state_dir / 'search.sqlite', reset=not incremental) as search_index,
+    ):
+        # Pages are only added to the search index when they are built
+        if search_index.created:
+            reuse_pages = False
+
+        def build_pages(page_tasks, count='built'):
+            results = run_page_builds(
+                page_tasks, template_dir, template_context, build, jobs, profiler.enabled,
+                minify, assets, precompress,
+            )
+            for task, result in results:
+                record_built_page(
+                    task, result, manifest, search_index, templates, build, output_dir, profiler,
+                )
+                page_counts[count] += 1
+                if result['variants'] is not None:
+                    page_variants[task['output'].as_posix()] = {
+                        'digest': result['output_digest'],
+                        'variants': result['variants'],
+                    }
+
+        build_pages(create_page_tasks(
+            select_changed_pages(discover_content_files(content_dir)), frontmatter_index,
+        ))
+
+        # Remove outputs of content files that no longer exist
+        for page_key in sorted(set(manifest.pages) - seen_pages):
+            remove_page_output(manifest, page_key, build, output_dir)
+
+        # Tailwind stylesheet with only the utilities used by the pages. When
+        # its URL changed, the pages linking the old one are built again;
+        # their classes stay the same, so one more pass is enough
+        stylesheets['tailwind.css'], unsupported = render_tailwind_stylesheet(manifest, profiler)
+        tailwind_url = f'/{STYLESHEET_SUBDIR}/tailwind.css'
+        linked_url = assets.get(tailwind_url)
+        add_stylesheet_urls(assets, stylesheets, fingerprint)
+        if assets.get(tailwind_url) != linked_url:
+            set_asset_manifest(assets)
+            stale_pages = [
+                (page_key, Path(page_key), entry['source_digest'])
+                for page_key, entry in sorted(manifest.pages.items())
+                if tailwind_url in entry['assets']
+                and entry['assets'][tailwind_url] != assets[tailwind_url]
+            ]
+            build_pages(create_page_tasks(stale_pages, frontmatter_index), 'relinked')
+
+        frontmatter_index.prune(seen_pages)
+
+        # Sharded search index; incremental builds only rewrite the shards
+        # of terms and pages that changed
+        search_index.prune(seen_pages)
+        with profiler.phase('search_index'):
+            changed = search_index.write(build, full=not incremental)
+        if changed:
+            print(f"   🔎 Updated {changed} search index files in {output_dir / 'search'}")
+        screenshot_urls = collect_screenshot_urls(fm for _, fm in frontmatter_index.pages())
+
+    print(f"   📄 {len(seen_pages)} content files: "
+          f"{page_counts['built']} generated, {page_counts['reused']} unchanged")
+    if page_counts['relinked']:
+        print(f"   🎨 Tailwind stylesheet changed: {page_counts['relinked']} pages "
+              f"generated again to link it")
+
+    # Keep the Markdown and highlighting caches within their size budgets
+    for cache in (open_markdown_cache(), open_highlight_cache()):
+        cache.evict()
+        cache.close()
+
+    # Tailwind stylesheet and shared stylesheet for highlighted code blocks
+    write_stylesheets(build, stylesheets, fingerprint, output_dir)
+    report_unsupported_classes(unsupported)
+
+    # Design token stylesheet and JSON export, compiled once per token set
+    if compile_tokens(build):
+        print(f"   🎨 Compiled design tokens to {output_dir / TOKENS_SUBDIR}")
+
+    # Resized screenshot variants, encoded once and cached by source hash
+    with profiler.phase('images'):
+        stats = build_image_variants(screenshot_urls, build, jobs)
+    if stats.images:
+        print(f"   🖼️  Screenshot variants: {stats}")
+
+    # Sync static files
+    print(f"📦 Syncing static assets...")
+    with profiler.phase('static_copy'):
+        stats = build.sync_static(
+            'static', static_dir, assets, link_mode=config.STATIC_LINK_MODE,
+            keep=lambda path: precompress and is_compressed_variant(path),
+            plain_names=config.STATIC_PLAIN_NAMES,
+        )
+    if build.in_memory:
+        print(f"   ✅ Serving static files from {static_dir}/")
+    elif stats is not None:
+        print(f"   ✅ Synced static files to {output_dir / 'static'}: {stats}")
+    if write_asset_manifest(build, assets):
+        print(f"   🔖 Generated {output_dir / ASSET_MANIFEST_NAME}")
 
     # Generate CNAME file for GitHub Pages
-    cname_file = output_dir / 'CNAME'
-    with open(cname_file, 'w') as f:
-        f.write(config.DOMAIN)
+    build.write('CNAME', config.DOMAIN.encode('utf-8'))
     print(f"📝 Generated CNAME file with domain: {config.DOMAIN}")
 
+    # Precompressed variants, so servers never compress on the fly
+    if precompress:
+        print(f"🗜️  Precompressing output files...")
+        with profiler.phase('compress'):
+            stats = compress_tree(
+                build.root, output.state_dir / 'compression.json',
+                previous_dir=output.root if build is not output else None,
+                jobs=jobs, written=page_variants,
+            )
+        print(f"   ✅ {stats}")
+    elif incremental and not build.in_memory:
+        remove_variants(build.root)
+
+    # Output paths and digests, diffed against the previous build so that
+    # deploys only upload and invalidate what changed
+    if not build.in_memory:
+        deploy_dir = output.state_dir / 'deploy'
+        with profiler.phase('deploy_manifest'):
+            diff = update_deploy_manifest(build.root, deploy_dir)
+        print(f"🚚 Deploy diff against the previous build: {diff} "
+              f"(see {deploy_dir / 'diff.json'})")
+
+    # Swap the finished site into place; an old output directory is deleted
+    # in the background
+    with profiler.phase('publish'):
+        published = output.publish(build)
+    if published:
+        print(f"🔁 Published staged build to {output_dir}")
+
+    manifest.save()
+
+    if profiler.enabled:
+        profiler.write_report(
+            profile,
+            incremental=incremental,
+            jobs=jobs,
+            pages_total=len(seen_pages),
+            pages_built=page_counts['built'],
+        )
+        print(f"📊 Wrote build profile to {profile}")
+
     print(f"\n✨ Site generation complete!")
-    print(f"📂 Output directory: {output_dir.absolute()}")
-    print(f"🌐 Open {output_dir.absolute()}/index.html in your browser to preview")
+    if not output.in_memory:
+        print(f"📂 Output directory: {output_dir.absolute()}")
+        print(f"🌐 Open {output_dir.absolute()}/index.html in your browser to preview")
+
+
+def rebuild_pages(md_files, minify=None, fingerprint=None, output=None):
+    """
+    Rebuild only the given content files in the output sink
+
+    Used by the development server for changes it has traced to individual
+    pages. The pages are rendered in this process and recorded in the
+    manifest, the frontmatter and search indexes and the Tailwind stylesheet
+    as an incremental build would; content files that no longer exist have
+    their output removed. Other pages and the static files are not looked
+    at, so the work does not grow with the size of the site. No compressed
+    variants are written.
+
+    When the site context changed since the last build, or the rebuilt
+    pages change the URL of the Tailwind stylesheet, every page is affected
+    and a full incremental build runs instead. Returns {page key:
+    manifest entry, or None for removed pages}, or None after a full build.
+    """
+    print("🎯 Rebuilding changed pages...")
+    if minify is None:
+        minify = config.MINIFY_HTML
+    if fingerprint is None:
+        fingerprint = config.FINGERPRINT_ASSETS
+    if output is None:
+        output = DirectorySink(config.OUTPUT_DIR)
+
+    content_dir = Path(config.CONTENT_DIR)
+    template_dir = Path(config.TEMPLATE_DIR)
+    output_dir = Path(str(output))
+    manifest = BuildManifest.load(output.state_dir / 'manifest.json')
+
+    env = Environment(loader=FileSystemLoader(template_dir))
+    template_context = build_template_context()
+    assets = get_site_assets(Path(config.STATIC_DIR), fingerprint)
+    stylesheets = {
+        'pygments.css': get_pygments_stylesheet(config.PYGMENTS_STYLE).encode('utf-8'),
+        'tailwind.css': render_tailwind_stylesheet(manifest)[0],
+    }
+    linked_path = stylesheet_path('tailwind.css', stylesheets['tailwind.css'], fingerprint)
+    add_stylesheet_urls(assets, stylesheets, fingerprint)
+    set_asset_manifest(assets)
+
+    rebuilt = {}
+    with (
+        FrontmatterIndex(Path(config.CACHE_DIR) / 'frontmatter.sqlite') as frontmatter_index,
+        SearchIndex(output.state_dir / 'search.sqlite') as search_index,
+    ):
+        context_digest = get_context_digest(template_context, minify)
+        if manifest.context_digest == context_digest and not search_index.created:
+            tasks = []
+            for md_file in sorted(set(map(Path, md_files))):
+                page_key = md_file.as_posix()
+                if not md_file.exists():
+                    remove_page_output(manifest, page_key, output, output_dir)
+                    frontmatter_index.remove(md_file)
+                    search_index.remove_page(page_key)
+                    rebuilt[page_key] = None
+                    continue
+                tasks.append({
+                    'page': page_key,
+                    'source': md_file,
+                    'source_digest': manifest.source_digest(page_key, md_file),
+                    'output': get_output_path(md_file, content_dir),
+                    'frontmatter': frontmatter_index.get(md_file),
+                })
+
+            results = run_page_builds(
+                tasks, template_dir, template_context, output, minify=minify, assets=assets,
+            )
+            templates = TemplateDigests(env)
+            for task, result in results:
+                rebuilt[task['page']] = record_built_page(
+                    task, result, manifest, search_index, templates, output, output_dir,
+                )
+
+            changed = search_index.write(output)
+            if changed:
+                print(f"   🔎 Updated {changed} search index files in {output_dir / 'search'}")
+
+            # Pages may have started or stopped embedding screenshots
+            screenshot_urls = collect_screenshot_urls(fm for _, fm in frontmatter_index.pages())
+
+            stylesheets['tailwind.css'], unsupported = render_tailwind_stylesheet(manifest)
+            tailwind_path = stylesheet_path('tailwind.css', stylesheets['tailwind.css'], fingerprint)
+            if tailwind_path != linked_path:
+                rebuilt = None
+        else:
+            rebuilt = None
+
+    if rebuilt is None:
+        print("   ♻️  Site context or stylesheet changed, rebuilding every affected page")
+        generate_site(
+            incremental=True, minify=minify, precompress=False, fingerprint=fingerprint,
+            output=output,
+        )
+        return None
+
+    build_image_variants(screenshot_urls, output)
+    write_stylesheets(output, stylesheets, fingerprint, output_dir)
+    report_unsupported_classes(unsupported)
+    manifest.save()
+    return rebuilt
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Generate the Summarum website")
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help="keep the output directory and only rebuild pages whose inputs changed",
+    )
+    parser.add_argument(
+        '-j', '--jobs', type=int, metavar='N',
+        help="render pages in N worker processes (0 = one per CPU core; "
+             "default: 1, or one per core with --check)",
+    )
+    parser.add_argument(
+        '--check', action='store_true',
+        help="only validate the frontmatter of all content files and exit "
+             "nonzero on errors, without building",
+    )
+    parser.add_argument(
+        '--minify', action=argparse.BooleanOptionalAction, default=None,
+        help="minify rendered HTML pages (default: config.MINIFY_HTML)",
+    )
+    parser.add_argument(
+        '--precompress', action=argparse.BooleanOptionalAction, default=None,
+        help="write .gz/.br variants of compressible output files "
+             "(default: config.PRECOMPRESS)",
+    )
+    parser.add_argument(
+        '--fingerprint', action=argparse.BooleanOptionalAction, default=None,
+        help="also publish static files under content-hashed names "
+             "(default: config.FINGERPRINT_ASSETS)",
+    )
+    parser.add_argument(
+        '--compile-templates', action='store_true',
+        help="compile templates ahead of time into Python modules and exit",
+    )
+    parser.add_argument(
+        '--profile', nargs='?', const=str(Path(config.CACHE_DIR) / 'profile.json'), metavar='REPORT',
+        help="record per-phase and per-page time and memory and write a JSON report "
+             "(default: .build_cache/profile.json)",
+    )
+    parser.add_argument(
+        '--cprofile', metavar='FILE',
+        help="also dump cProfile statistics of the main process to FILE",
+    )
+    args = parser.parse_args()
+
+    if args.compile_templates:
+        compile_templates(Path(config.TEMPLATE_DIR))
+        return
+
+    if args.jobs is None:
+        args.jobs = 0 if args.check else 1
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+
+    if args.check:
+        if check_site(jobs):
+            sys.exit(1)
+        return
+
+    build_options = {
+        'incremental': args.incremental,
+        'jobs': jobs,
+        'profile': args.profile,
+        'minify': args.minify,
+        'precompress': args.precompress,
+        'fingerprint': args.fingerprint,
+    }
+    if args.cprofile:
+        with cProfile.Profile() as cprofiler:
+            generate_site(**build_options)
+        cprofiler.dump_stats(args.cprofile)
+        print(f"📊 Wrote cProfile statistics to {args.cprofile}")
+    else:
+        generate_site(**build_options)
 
 
 if __name__ == '__main__':
-    generate_site()
+    main()
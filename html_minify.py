@@ -0,0 +1,374 @@
+"""
+HTML minification for rendered pages
+
+A single-pass, regex-based minifier tuned for the pages this generator
+renders. It collapses whitespace, strips comments and compacts inline
+<style> and <script> blocks, while leaving whitespace-sensitive content
+(<pre>, <textarea>, and so highlighted code blocks) byte for byte intact.
+It is conservative by design: whitespace between inline elements is
+collapsed to a single space rather than removed, so rendering never changes.
+"""
+
+import re
+
+# Elements whose surrounding whitespace never affects rendering
+BLOCK_TAGS = frozenset('''
+    address article aside base blockquote body br dd details dialog div dl dt
+    fieldset figcaption figure footer form h1 h2 h3 h4 h5 h6 head header hr
+    html li link main meta nav noscript ol option p section script style
+    summary table tbody td tfoot th thead title tr ul
+'''.split())
+
+# The attributes of a tag, up to its closing '>'; quoted values may contain '>'
+_ATTRS = r'(?:"[^"]*"|\'[^\']*\'|[^\'">])*'
+
+_TOKEN_RE = re.compile(
+    r'(?P<comment><!--.*?-->)'
+    r'|(?P<raw><(?P<raw_tag>pre|textarea|script|style)\b' + _ATTRS + r'>.*?</(?P=raw_tag)\s*>)'
+    r'|(?P<tag></?(?P<tag_name>[a-zA-Z][a-zA-Z0-9-]*)' + _ATTRS + r'>|<![^>]*>)'
+    r'|(?P<text>[^<]+|<)',
+    re.DOTALL | re.IGNORECASE,
+)
+# A tag cut short by the end of the input, possibly inside a quoted value
+_TAG_PREFIX_RE = re.compile(
+    r'<(?:/?(?:[a-zA-Z][a-zA-Z0-9-]*' + _ATTRS + r'(?:"[^"]*|\'[^\']*)?)?|![^>]*)\Z',
+    re.DOTALL,
+)
+_RAW_RE = re.compile(r'(<' + _ATTRS + r'>)(.*)(</[^>]*>)', re.DOTALL)
+_WHITESPACE_RE = re.compile(r'\s+')
+_TAG_PART_RE = re.compile(r'"[^"]*"|\'[^\']*\'|[^"\']+')
+# An unquoted attribute value right before '/>': the space before the slash
+# has to stay, or the slash becomes part of the value
+_UNQUOTED_VALUE_END_RE = re.compile(r'= ?[^\s"\'=]+ />$')
+
+_CSS_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/|[^"\'/]+|/', re.DOTALL)
+_CSS_SPACE_RE = re.compile(r'\s*([{};,>])\s*|:\s+')
+
+_SCRIPT_TYPES_JS = ('', 'text/javascript', 'application/javascript', 'module')
+_SCRIPT_TYPE_RE = re.compile(r'\stype\s*=\s*["\']?([^"\'\s>]*)', re.IGNORECASE)
+
+
+def _minify_tag(tag):
+    """Collapse whitespace between attributes, leaving quoted values untouched"""
+    parts = _TAG_PART_RE.findall(tag)
+    for i, part in enumerate(parts):
+        if part[0] in '"\'':
+            continue
+        part = _WHITESPACE_RE.sub(' ', part)
+        if i == len(parts) - 1:
+            # Only the last part, outside any quotes, holds the end of the tag
+            if part.endswith(' >'):
+                part = part[:-2] + '>'
+            elif part.endswith(' />') and not _UNQUOTED_VALUE_END_RE.search(part):
+                part = part[:-3] + '/>'
+        parts[i] = part
+    return ''.join(parts)
+
+
+def minify_css(css):
+    """Strip comments and insignificant whitespace from a stylesheet"""
+    out = []
+    code = []
+
+    def flush():
+        text = _WHITESPACE_RE.sub(' ', ''.join(code))
+        out.append(_CSS_SPACE_RE.sub(lambda m: m.group(1) or ':', text))
+        code.clear()
+
+    for token in _CSS_TOKEN_RE.findall(css):
+        if token[0] in '"\'':
+            # Strings are copied verbatim
+            flush()
+            out.append(token)
+        elif token.startswith('/*'):
+            code.append(' ')
+        else:
+            code.append(token)
+    flush()
+    return ''.join(out).replace(';}', '}').strip()
+
+
+# After these characters and keywords a '/' starts a regular expression;
+# anywhere else it divides
+_JS_REGEX_PRECEDERS = frozenset('(,=:[!&|?{};+-*%~^<>')
+_JS_REGEX_KEYWORDS = frozenset({
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+    'throw', 'case', 'do', 'else', 'yield', 'await',
+})
+_JS_WORD_END_RE = re.compile(r'[\w$]+$')
+_JS_LINE_BREAK_RE = re.compile(r'[ \t]*\n\s*')
+
+
+def _skip_js_string(js, i):
+    """Return the end of the string literal starting at js[i]"""
+    quote = js[i]
+    i += 1
+    while i < len(js):
+        c = js[i]
+        if c == '\\':
+            i += 2
+        elif c == quote:
+            return i + 1
+        elif c == '\n':
+            # Unterminated; JavaScript strings cannot span lines
+            return i
+        else:
+            i += 1
+    return len(js)
+
+
+def _skip_js_template(js, i):
+    """Return the end of the template literal starting at js[i], substitutions included"""
+    i += 1
+    while i < len(js):
+        c = js[i]
+        if c == '\\':
+            i += 2
+        elif c == '`':
+            return i + 1
+        elif js.startswith('${', i):
+            i = _scan_js(js, i + 2, nested=True)[1]
+        else:
+            i += 1
+    return len(js)
+
+
+def _skip_js_regex(js, i):
+    """Return the end of the regular expression literal starting at js[i], or None"""
+    in_class = False
+    i += 1
+    while i < len(js):
+        c = js[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '\n':
+            return None
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            while i < len(js) and (js[i].isalnum() or js[i] in '_$'):
+                i += 1
+            return i
+        i += 1
+    return None
+
+
+def _regex_allowed(code, after_literal):
+    """
+    Return True if a '/' after the given code starts a regular expression;
+    after_literal is True when that code follows a literal
+    """
+    code = code.rstrip()
+    if not code:
+        # A literal is an operand, so a '/' after it divides
+        return not after_literal
+    if code[-1] in _JS_REGEX_PRECEDERS:
+        return True
+    word = _JS_WORD_END_RE.search(code)
+    return word is not None and word.group() in _JS_REGEX_KEYWORDS
+
+
+def _scan_js(js, i=0, nested=False):
+    """
+    Split a script into code and literal pieces, starting at js[i]
+
+    Returns ([(is_literal, text)], end). Strings, template literals and
+    regular expressions are literal pieces; comments are replaced by a
+    space, or a line break if they span lines. With nested, scanning stops
+    after the '}' that closes a template literal substitution.
+    """
+    pieces = []
+    code = []
+    depth = 0
+    while i < len(js):
+        c = js[i]
+        end = None
+        if c in '"\'':
+            end = _skip_js_string(js, i)
+        elif c == '`':
+            end = _skip_js_template(js, i)
+        elif js.startswith('//', i):
+            end = js.find('\n', i)
+            i = len(js) if end == -1 else end
+            continue
+        elif js.startswith('/*', i):
+            end = js.find('*/', i + 2)
+            end = len(js) if end == -1 else end + 2
+            code.append('\n' if '\n' in js[i:end] else ' ')
+            i = end
+            continue
+        elif c == '/' and _regex_allowed(''.join(code), bool(pieces)):
+            end = _skip_js_regex(js, i)
+
+        if end is not None:
+            pieces.append((False, ''.join(code)))
+            pieces.append((True, js[i:end]))
+            code = []
+            i = end
+            continue
+
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            if nested and depth == 0:
+                code.append(c)
+                i += 1
+                break
+            depth -= 1
+        code.append(c)
+        i += 1
+    pieces.append((False, ''.join(code)))
+    return pieces, i
+
+
+def minify_js(js):
+    """
+    Strip comments, indentation, trailing whitespace and blank lines from a script
+
+    Strings, template literals and regular expressions are copied verbatim.
+    Line breaks are kept so automatic semicolon insertion is unaffected.
+    """
+    out = []
+    for is_literal, text in _scan_js(js)[0]:
+        out.append(text if is_literal else _JS_LINE_BREAK_RE.sub('\n', text))
+    return ''.join(out).strip()
+
+
+def _minify_raw(tag_name, element):
+    """Minify the body of a <style> or <script> element; keep other raw elements as-is"""
+    tag_name = tag_name.lower()
+    if tag_name not in ('style', 'script'):
+        return element
+    start, body, end = _RAW_RE.match(element).groups()
+    start = _minify_tag(start)
+    if tag_name == 'style':
+        return f'{start}{minify_css(body)}{end}'
+    match = _SCRIPT_TYPE_RE.search(start)
+    if match and match.group(1).lower() not in _SCRIPT_TYPES_JS:
+        # JSON, templates and other data blocks are left alone
+        return f'{start}{body.strip()}{end}'
+    return f'{start}{minify_js(body)}{end}'
+
+
+# Elements whose content is only complete once the closing tag has been seen
+RAW_TAGS = frozenset({'pre', 'textarea', 'script', 'style'})
+
+_START = object()
+
+
+class HTMLMinifier:
+    """
+    Incremental minifier for HTML that arrives in chunks
+
+    feed() returns the minified output for every token known to be
+    complete; whatever may still continue (an open tag, an unterminated
+    <script> or comment, trailing text) is held back until more input
+    arrives or close() is called. The output is the same as minify_html()
+    on the whole document.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._pending = None  # last token, until the next one decides its whitespace
+        self._previous = _START  # tag name of the token before it
+
+    def feed(self, chunk):
+        """Add a chunk of HTML and return the minified output it completes"""
+        self._buffer += chunk
+        return self._drain(final=False)
+
+    def close(self):
+        """Return the minified output of everything still held back"""
+        out = self._drain(final=True)
+        if self._pending is not None:
+            out += self._emit(self._pending, None)
+            self._pending = None
+        return out
+
+    @staticmethod
+    def _is_incomplete(match, buffer):
+        if match.end() == len(buffer):
+            return True
+        tag = match.group('tag')
+        if tag is not None:
+            # An unterminated comment, or a raw element without its end tag yet
+            if tag.startswith('<!--'):
+                return True
+            name = match.group('tag_name')
+            return not tag.startswith('</') and name is not None and name.lower() in RAW_TAGS
+        # A '<' that may still become a tag
+        return match.group('text') == '<' and _TAG_PREFIX_RE.match(buffer, match.start()) is not None
+
+    def _drain(self, final):
+        out = []
+        buffer = self._buffer
+        consumed = 0
+        for match in _TOKEN_RE.finditer(buffer):
+            if not final and self._is_incomplete(match, buffer):
+                break
+            consumed = match.end()
+            token = _token(match)
+            if token is None:
+                continue
+            if self._pending is None:
+                self._pending = token
+            elif token[0] and self._pending[0]:
+                # A lone '<' that did not start a tag; merge with the text before it
+                self._pending = (True, None, self._pending[2] + token[2])
+            else:
+                out.append(self._emit(self._pending, token))
+                self._pending = token
+        self._buffer = buffer[consumed:]
+        return ''.join(out)
+
+    def _emit(self, token, next_token):
+        is_text, tag_name, text = token
+        previous = self._previous
+        self._previous = tag_name
+        if not is_text:
+            return text
+        text = _WHITESPACE_RE.sub(' ', text)
+        # Whitespace next to block-level elements never renders
+        if previous is _START or previous in BLOCK_TAGS:
+            text = text.lstrip()
+        if next_token is None or next_token[1] in BLOCK_TAGS:
+            text = text.rstrip()
+        return text
+
+
+def _token(match):
+    """Return the (is_text, tag name or None, minified text) token for a match, or None"""
+    if match.group('comment'):
+        comment = match.group('comment')
+        # Keep conditional comments, they carry markup for old browsers
+        if comment.startswith(('<!--[if', '<!--<![endif')):
+            return (False, None, comment)
+        return None
+    if match.group('raw'):
+        tag_name = match.group('raw_tag')
+        return (False, tag_name.lower(), _minify_raw(tag_name, match.group('raw')))
+    if match.group('tag'):
+        tag_name = match.group('tag_name')
+        return (False, tag_name and tag_name.lower(), _minify_tag(match.group('tag')))
+    return (True, None, match.group('text'))
+
+
+def minify_chunks(chunks):
+    """Minify HTML arriving as an iterable of chunks, yielding the minified output"""
+    minifier = HTMLMinifier()
+    for chunk in chunks:
+        out = minifier.feed(chunk)
+        if out:
+            yield out
+    out = minifier.close()
+    if out:
+        yield out
+
+
+def minify_html(html):
+    """Return a minified copy of an HTML document"""
+    return ''.join(minify_chunks([html]))
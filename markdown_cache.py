@@ -0,0 +1,126 @@
+"""
+Markdown conversion with reusable converters and a persistent HTML cache
+
+MarkdownConverter keeps one markdown.Markdown instance alive and resets it
+between documents instead of rebuilding it and reloading its extensions for
+every page. Converted HTML is stored in a content-addressed DiskCache keyed
+by the body text plus the converter configuration, so unchanged bodies never
+go through the Markdown pipeline again.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import markdown
+
+import code_highlight
+
+try:
+    import pygments
+except ImportError:
+    pygments = None
+
+# Bump when the conversion code changes its output, so HTML cached by the
+# previous version is not reused
+CACHE_VERSION = 1
+
+
+class DiskCache:
+    """
+    Size-bounded, least-recently-used key/value store backed by SQLite
+
+    Safe to share between processes; each process opens its own connection.
+    """
+
+    def __init__(self, db_path, max_bytes):
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)')
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, key):
+        """Return the cached bytes for key, or None"""
+        row = self.conn.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        self.conn.execute('UPDATE entries SET last_used = ? WHERE key = ?', (time.time(), key))
+        return row[0]
+
+    def put(self, key, value):
+        """Store bytes under key"""
+        self.conn.execute(
+            'INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)',
+            (key, value, len(value), time.time()),
+        )
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        rows = self.conn.execute('SELECT key, size FROM entries ORDER BY last_used').fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+            removed += 1
+        self.conn.executemany('DELETE FROM entries WHERE key = ?', stale)
+        return removed
+
+
+class MarkdownConverter:
+    """Markdown to HTML converter that reuses one Markdown instance and caches results."""
+
+    def __init__(self, extensions, extension_configs=None, cache=None):
+        extension_configs = extension_configs or {}
+        self.md = markdown.Markdown(extensions=extensions, extension_configs=extension_configs)
+        self.cache = cache
+        # Anything that can change the generated HTML for the same body
+        self.cache_salt = json.dumps({
+            'version': CACHE_VERSION,
+            'highlight_version': code_highlight.CACHE_VERSION,
+            'markdown': markdown.__version__,
+            'pygments': getattr(pygments, '__version__', None),
+            'extensions': extensions,
+            'extension_configs': extension_configs,
+        }, sort_keys=True, default=str)
+
+    def cache_key(self, text):
+        h = hashlib.sha256(self.cache_salt.encode('utf-8'))
+        h.update(text.encode('utf-8'))
+        return h.hexdigest()
+
+    def convert(self, text):
+        """Convert a Markdown body to HTML"""
+        if self.cache is None:
+            return self.md.reset().convert(text)
+
+        key = self.cache_key(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached.decode('utf-8')
+
+        html = self.md.reset().convert(text)
+        self.cache.put(key, html.encode('utf-8'))
+        return html
@@ -0,0 +1,295 @@
+"""
+Output sinks for the site generator
+
+generate_site() writes everything it produces through a sink, addressed by
+POSIX paths relative to the site root:
+
+- DirectorySink writes into a directory on disk. Full builds go to a
+  staging directory that is swapped into place once complete.
+- MemorySink keeps the site in memory for the development server, which
+  serves it directly. Generated files are held as bytes; files that already
+  exist on disk (static files, compiled tokens, image variants in the build
+  cache) are referenced by path instead of being copied.
+
+Build state that depends on the output (the build manifest, the search index
+database) is kept in the sink's state_dir, so in-memory builds never disturb
+the state of the output directory.
+"""
+
+import hashlib
+import io
+import itertools
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+
+import config
+from build_manifest import file_digest, file_signature
+from site_output import (
+    open_file_atomic,
+    prepare_staging_dir,
+    publish_staging_dir,
+    write_file_if_changed,
+)
+from static_sync import sync_file, sync_tree, transfer_file
+
+# Versions of files written to memory, shared by all MemorySinks so that
+# signatures stay unique when a staged sink is published
+_versions = itertools.count(1)
+
+
+class DirectorySink:
+    """Writes the site into a directory on disk."""
+
+    in_memory = False
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def __str__(self):
+        return str(self.root)
+
+    @property
+    def state_dir(self):
+        return Path(config.CACHE_DIR)
+
+    def begin(self, incremental):
+        """Return the sink a build writes to: this one, or a staging directory for full builds"""
+        if incremental:
+            self.root.mkdir(parents=True, exist_ok=True)
+            return self
+        return DirectorySink(prepare_staging_dir(self.root))
+
+    def publish(self, build):
+        """Swap a finished staged build into place; return True if there was one"""
+        if build.root == self.root:
+            return False
+        publish_staging_dir(build.root, self.root)
+        return True
+
+    @contextmanager
+    def open(self, rel_path):
+        """Open a buffered binary file that replaces rel_path once closed"""
+        path = self.root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open_file_atomic(path) as f:
+            yield f
+
+    def write(self, rel_path, data):
+        """Write bytes to rel_path unless it already holds them; return True if written"""
+        return write_file_if_changed(self.root / rel_path, data)
+
+    def link(self, rel_path, src_path):
+        """Hardlink a file at rel_path unless it is already there; return True if linked"""
+        target = self.root / rel_path
+        src_stat = os.stat(src_path)
+        try:
+            target_stat = target.stat()
+        except FileNotFoundError:
+            target_stat = None
+        # Hardlinks and copies (which keep the mtime) of src_path
+        if (target_stat is not None and target_stat.st_size == src_stat.st_size
+                and target_stat.st_mtime_ns == src_stat.st_mtime_ns):
+            return False
+        transfer_file(src_path, target, src_stat, 'hardlink')
+        return True
+
+    def remove(self, rel_path):
+        """Delete rel_path and the directories it leaves empty; return True if it existed"""
+        path = self.root / rel_path
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        parent = path.parent
+        while parent != self.root and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+        return True
+
+    def exists(self, rel_path):
+        return (self.root / rel_path).is_file()
+
+    def list(self, rel_dir):
+        """Return the sorted names of the files directly in rel_dir"""
+        try:
+            entries = os.scandir(self.root / rel_dir)
+        except FileNotFoundError:
+            return []
+        with entries:
+            return sorted(entry.name for entry in entries if entry.is_file())
+
+    def signature(self, rel_path):
+        """Return a cheap signature that changes whenever rel_path is rewritten, or None"""
+        return file_signature(self.root / rel_path)
+
+    def digest(self, rel_path):
+        return file_digest(self.root / rel_path)
+
+    def sync_static(self, rel_dir, static_dir, assets, link_mode='copy', keep=None,
+                    plain_names=()):
+        """
+        Mirror static_dir at rel_dir
+
+        With fingerprinted names in assets, each file is published under its
+        fingerprinted name only, plus its plain name for the paths in
+        plain_names. These files are always copied (reflinked where
+        possible): a hardlink would let an in-place edit of the source
+        change the content behind an immutable URL. Returns SyncStats, or
+        None when there is no static_dir.
+        """
+        static_output = self.root / rel_dir
+        if not static_dir.exists():
+            if static_output.exists():
+                shutil.rmtree(static_output)
+            return None
+
+        if not assets:
+            return sync_tree(static_dir, static_output, link_mode=link_mode, keep=keep)
+
+        prefix = f'/{rel_dir}/'
+        fingerprints = {
+            url[len(prefix):]: fingerprinted[len(prefix):]
+            for url, fingerprinted in assets.items() if url.startswith(prefix)
+        }
+        plain_names = set(plain_names)
+
+        def targets(rel_path):
+            names = [fingerprints.get(rel_path, rel_path)]
+            if rel_path in plain_names:
+                names.append(rel_path)
+            return names
+
+        return sync_tree(static_dir, static_output, link_mode='copy', keep=keep, targets=targets)
+
+    def sync_static_file(self, rel_dir, static_dir, rel_path, link_mode='copy'):
+        """Mirror one static file; returns 'copied', 'linked', 'removed' or 'unchanged'"""
+        return sync_file(static_dir, self.root / rel_dir, rel_path, link_mode)
+
+
+class MemorySink:
+    """Keeps the site in memory, for the development server."""
+
+    in_memory = True
+
+    def __init__(self):
+        self.files = {}  # rel path -> (version, bytes or Path of a file on disk)
+        self.static = None  # (rel dir, static dir, {fingerprinted path: source path})
+
+    def __str__(self):
+        return '<memory>'
+
+    @property
+    def state_dir(self):
+        return Path(config.CACHE_DIR) / 'memory'
+
+    def begin(self, incremental):
+        """Return the sink a build writes to: this one, or an empty one for full builds"""
+        return self if incremental else MemorySink()
+
+    def publish(self, build):
+        """Take over the files of a finished full build; return True if there was one"""
+        if build is self:
+            return False
+        self.files = build.files
+        self.static = build.static
+        return True
+
+    def _store(self, rel_path, content):
+        self.files[PurePosixPath(rel_path).as_posix()] = (next(_versions), content)
+
+    def _content(self, rel_path):
+        entry = self.files.get(PurePosixPath(rel_path).as_posix())
+        return entry and entry[1]
+
+    @contextmanager
+    def open(self, rel_path):
+        """Open a binary buffer that replaces rel_path once closed"""
+        buffer = io.BytesIO()
+        yield buffer
+        self._store(rel_path, buffer.getvalue())
+
+    def write(self, rel_path, data):
+        """Store bytes at rel_path unless it already holds them; return True if stored"""
+        if self._content(rel_path) == data:
+            return False
+        self._store(rel_path, data)
+        return True
+
+    def link(self, rel_path, src_path):
+        """Serve src_path at rel_path; return True unless it already was"""
+        src_path = Path(src_path)
+        if self._content(rel_path) == src_path:
+            return False
+        self._store(rel_path, src_path)
+        return True
+
+    def remove(self, rel_path):
+        return self.files.pop(PurePosixPath(rel_path).as_posix(), None) is not None
+
+    def exists(self, rel_path):
+        return PurePosixPath(rel_path).as_posix() in self.files
+
+    def list(self, rel_dir):
+        """Return the sorted names of the files directly in rel_dir"""
+        rel_dir = PurePosixPath(rel_dir)
+        return sorted(
+            PurePosixPath(path).name for path in self.files
+            if PurePosixPath(path).parent == rel_dir
+        )
+
+    def signature(self, rel_path):
+        """Return a cheap signature that changes whenever rel_path is rewritten, or None"""
+        entry = self.files.get(PurePosixPath(rel_path).as_posix())
+        if entry is None:
+            return None
+        version, content = entry
+        size = content.stat().st_size if isinstance(content, Path) else len(content)
+        return [version, size]
+
+    def digest(self, rel_path):
+        content = self._content(rel_path)
+        if isinstance(content, Path):
+            return file_digest(content)
+        return hashlib.sha256(content).hexdigest()
+
+    def sync_static(self, rel_dir, static_dir, assets, link_mode='copy', keep=None,
+                    plain_names=()):
+        """
+        Serve static_dir at rel_dir straight from its source files
+
+        Nothing is copied; fingerprinted names in assets map back to their
+        source files, and every file stays available under its plain name.
+        Returns None.
+        """
+        prefix = f'/{rel_dir}/'
+        fingerprints = {
+            fingerprinted[len(prefix):]: url[len(prefix):]
+            for url, fingerprinted in assets.items() if url.startswith(prefix)
+        }
+        self.static = (rel_dir, Path(static_dir), fingerprints)
+        return None
+
+    def sync_static_file(self, rel_dir, static_dir, rel_path, link_mode='copy'):
+        """Static files are served from their sources; returns 'updated' or 'removed'"""
+        return 'updated' if (Path(static_dir) / rel_path).is_file() else 'removed'
+
+    def resolve(self, rel_path):
+        """
+        Return the content of rel_path for serving: bytes, the Path of a file
+        on disk, or None if there is no such file
+        """
+        rel_path = PurePosixPath(rel_path)
+        if '..' in rel_path.parts:
+            return None
+        content = self._content(rel_path)
+        if content is not None or self.static is None:
+            return content
+
+        rel_dir, static_dir, fingerprints = self.static
+        if rel_path.parts[:1] != (rel_dir,):
+            return None
+        source = rel_path.relative_to(rel_dir).as_posix()
+        path = static_dir / fingerprints.get(source, source)
+        return path if path.is_file() else None
@@ -0,0 +1,282 @@
+"""
+Precompressed variants of output files
+
+Writes .gz and .br siblings next to every compressible file in the output
+directory, at maximum compression, so servers that support precompressed
+files (nginx gzip_static/brotli_static, most CDNs) never compress on the fly.
+
+A state file records the content digest each file's variants were made
+from, so only new or changed files are compressed again. When building into
+a fresh staging directory, variants of unchanged files are hardlinked from
+the previous output instead.
+"""
+
+import contextlib
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from build_manifest import file_digest
+from site_output import open_file_atomic, write_file_atomic
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_SUFFIXES = frozenset({'.html', '.svg', '.css', '.js', '.json'})
+
+STATE_VERSION = 1
+
+
+def _gzip(data):
+    # mtime=0 keeps the output reproducible
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+def get_encoders():
+    """Return {suffix: compress function} for the available encodings"""
+    encoders = {'.gz': _gzip}
+    if brotli is not None:
+        encoders['.br'] = _brotli
+    return encoders
+
+
+def is_compressed_variant(path):
+    """Return True for .gz/.br siblings of compressible files"""
+    path = Path(path)
+    return path.suffix in ('.gz', '.br') and Path(path.stem).suffix in COMPRESSIBLE_SUFFIXES
+
+
+def compress_file(filepath):
+    """
+    Write the compressed siblings of one file
+
+    Variants that would not be smaller than the file are skipped (and any
+    stale one removed). Returns the list of suffixes written.
+    """
+    filepath = Path(filepath)
+    data = filepath.read_bytes()
+    written = []
+    for suffix, compress in get_encoders().items():
+        variant = filepath.with_name(filepath.name + suffix)
+        compressed = compress(data)
+        if len(compressed) < len(data):
+            write_file_atomic(variant, compressed)
+            written.append(suffix)
+        elif variant.exists():
+            variant.unlink()
+    return written
+
+
+class _GzipStream:
+    """Incremental equivalent of _gzip()"""
+
+    def __init__(self, f):
+        # No file name in the header and mtime=0 keep the output reproducible
+        self._gzip = gzip.GzipFile(filename='', mode='wb', compresslevel=9, fileobj=f, mtime=0)
+
+    def process(self, data):
+        self._gzip.write(data)
+        return b''
+
+    def finish(self):
+        self._gzip.close()
+        return b''
+
+
+def _stream_encoders():
+    """Return {suffix: factory of a streaming encoder writing to a file}"""
+    encoders = {'.gz': _GzipStream}
+    if brotli is not None:
+        encoders['.br'] = lambda f: brotli.Compressor(quality=11)
+    return encoders
+
+
+class VariantWriter:
+    """
+    Write the compressed siblings of a file while the file itself is written
+
+    Used as a context manager: every chunk passed to write() is fed to one
+    streaming encoder per encoding. On a normal exit the encoders are
+    finished and, as with compress_file(), only variants smaller than the
+    file are kept; their suffixes are then in self.variants. On an
+    exception no variant is written.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        self.size = 0
+        self.variants = []
+        self._stack = contextlib.ExitStack()
+        self._encoders = []
+
+    def __enter__(self):
+        for suffix, factory in _stream_encoders().items():
+            variant = self.filepath.with_name(self.filepath.name + suffix)
+            f = self._stack.enter_context(open_file_atomic(variant))
+            self._encoders.append((suffix, variant, f, factory(f)))
+        return self
+
+    def write(self, data):
+        self.size += len(data)
+        for _, _, f, encoder in self._encoders:
+            f.write(encoder.process(data))
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is not None:
+            return self._stack.__exit__(*exc_info)
+        for _, _, f, encoder in self._encoders:
+            f.write(encoder.finish())
+        self._stack.close()
+        for suffix, variant, _, _ in self._encoders:
+            if variant.stat().st_size < self.size:
+                self.variants.append(suffix)
+            else:
+                variant.unlink()
+        return False
+
+
+def compress_files(filepaths):
+    """Compress a batch of files in a worker process"""
+    return [compress_file(filepath) for filepath in filepaths]
+
+
+class CompressionStats:
+    """Counters describing what a compression pass did."""
+
+    def __init__(self):
+        self.compressed = 0
+        self.reused = 0
+        self.unchanged = 0
+        self.removed = 0
+
+    def __str__(self):
+        return (
+            f"{self.compressed} compressed, {self.reused} reused, "
+            f"{self.unchanged} unchanged, {self.removed} stale variants removed"
+        )
+
+
+def _load_state(state_path, encodings):
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if state.get('version') != STATE_VERSION or state.get('encodings') != encodings:
+        return {}
+    return state.get('files', {})
+
+
+def _save_state(state_path, encodings, files):
+    state_path = Path(state_path)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    data = {'version': STATE_VERSION, 'encodings': encodings, 'files': files}
+    write_file_atomic(state_path, json.dumps(data, indent=2, sort_keys=True).encode('utf-8'))
+
+
+def _variants_present(directory, rel_path, variants):
+    return all((directory / (rel_path + suffix)).is_file() for suffix in variants)
+
+
+def _link_variants(src_dir, dst_dir, rel_path, variants):
+    """Hardlink existing variants from the previous output; return False if any is missing"""
+    if src_dir is None or not _variants_present(src_dir, rel_path, variants):
+        return False
+    for suffix in variants:
+        target = dst_dir / (rel_path + suffix)
+        if target.exists():
+            target.unlink()
+        try:
+            os.link(src_dir / (rel_path + suffix), target)
+        except OSError:
+            return False
+    return True
+
+
+def remove_variants(output_dir):
+    """Delete all compressed variants under output_dir; return how many were removed"""
+    removed = 0
+    for root, dirs, files in os.walk(output_dir):
+        for name in files:
+            if is_compressed_variant(name):
+                os.unlink(os.path.join(root, name))
+                removed += 1
+    return removed
+
+
+def compress_tree(output_dir, state_path, previous_dir=None, jobs=1, written=None):
+    """
+    Bring the compressed variants under output_dir up to date
+
+    previous_dir is the live output directory when output_dir is a staging
+    directory; unchanged files reuse its variants. Variants whose original
+    no longer exists are removed. jobs sets the number of worker processes.
+
+    written maps output paths to {'digest': ..., 'variants': [...]} for
+    files whose variants were already written along with them (see
+    VariantWriter); they are not compressed again.
+    """
+    output_dir = Path(output_dir)
+    previous_dir = Path(previous_dir) if previous_dir is not None else None
+    encodings = sorted(get_encoders())
+    state = _load_state(state_path, encodings)
+    state.update(written or {})
+    stats = CompressionStats()
+    new_state = {}
+    to_compress = []
+
+    for root, dirs, files in os.walk(output_dir):
+        dirs.sort()
+        rel_root = Path(root).relative_to(output_dir)
+        for name in sorted(files):
+            rel_path = (rel_root / name).as_posix()
+            filepath = output_dir / rel_path
+            if is_compressed_variant(filepath):
+                if not (output_dir / rel_path[:-3]).is_file():
+                    filepath.unlink()
+                    stats.removed += 1
+                continue
+            if filepath.suffix not in COMPRESSIBLE_SUFFIXES or name.startswith('.'):
+                continue
+
+            digest = file_digest(filepath)
+            entry = state.get(rel_path)
+            if entry and entry['digest'] == digest:
+                if _variants_present(output_dir, rel_path, entry['variants']):
+                    stats.unchanged += 1
+                    new_state[rel_path] = entry
+                    continue
+                if _link_variants(previous_dir, output_dir, rel_path, entry['variants']):
+                    stats.reused += 1
+                    new_state[rel_path] = entry
+                    continue
+            new_state[rel_path] = {'digest': digest, 'variants': []}
+            to_compress.append(rel_path)
+
+    # Spread the files evenly over the workers, in batches of at most 16
+    batch_size = max(1, min(16, -(-len(to_compress) // max(jobs, 1))))
+    batches = [
+        to_compress[i:i + batch_size] for i in range(0, len(to_compress), batch_size)
+    ]
+    paths = [[output_dir / rel_path for rel_path in batch] for batch in batches]
+    if jobs > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(compress_files, paths))
+    else:
+        results = [compress_files(batch) for batch in paths]
+
+    for batch, batch_results in zip(batches, results):
+        for rel_path, variants in zip(batch, batch_results):
+            new_state[rel_path]['variants'] = variants
+            stats.compressed += 1
+
+    _save_state(state_path, encodings, new_state)
+    return stats
@@ -0,0 +1,257 @@
+"""
+Responsive image variants for screenshots
+
+Images referenced by the 'screenshots' frontmatter are resized with Pillow
+into modern formats (AVIF, WebP) at several widths. Variants are cached in
+the build cache by source hash and encoder settings, so each one is encoded
+once, and linked into the output directory on every build.
+
+Templates emit the markup through the responsive_image() helper, which
+renders a <picture> element with one srcset per format and the original
+image as fallback.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from markupsafe import Markup, escape
+
+import config
+from asset_manifest import asset_source_url
+from build_manifest import data_digest, file_digest
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+# Output directory for variants, relative to the site root
+OUTPUT_SUBDIR = 'assets/images'
+
+MIME_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+}
+
+# Image info by static path, memoized per process: (mtime_ns, size) -> info
+_image_info = {}
+
+
+def get_formats():
+    """Return the configured variant formats the installed Pillow can encode"""
+    if Image is None:
+        return []
+    return [fmt for fmt in config.RESPONSIVE_IMAGE_FORMATS if features.check(fmt)]
+
+
+def static_path(url):
+    """Map a /static/ URL, fingerprinted or not, to the file in the static directory, or None"""
+    prefix = '/static/'
+    if not isinstance(url, str) or not url.startswith(prefix):
+        return None
+    url = asset_source_url(url)
+    path = Path(config.STATIC_DIR) / url[len(prefix):]
+    return path if path.is_file() else None
+
+
+def get_image_info(url):
+    """
+    Return the source and variants of the image at a /static/ URL
+
+    The result is a dict with 'source', 'digest', 'width', 'height' and
+    'variants', a list of (format, width, cache name, output URL), or None
+    when the image is not a local file Pillow can read.
+    """
+    if Image is None:
+        return None
+    path = static_path(url)
+    if path is None:
+        return None
+
+    st = path.stat()
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _image_info.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+    except OSError:
+        return None
+
+    digest = file_digest(path)
+    # Never upscale: images narrower than the largest width get a variant
+    # at their own width instead (replacing any width within 10% of it)
+    widths = sorted(w for w in config.RESPONSIVE_IMAGE_WIDTHS if w < width * 0.9)
+    if width <= max(config.RESPONSIVE_IMAGE_WIDTHS):
+        widths.append(width)
+    variants = []
+    for fmt in get_formats():
+        # Variants are named by source and encoder settings, so changing the
+        # settings encodes them again under new URLs
+        variant_digest = data_digest({
+            'source': digest,
+            'options': config.RESPONSIVE_IMAGE_ENCODER_OPTIONS.get(fmt, {}),
+        })
+        for w in widths:
+            cache_name = f'{variant_digest}-{w}.{fmt}'
+            output_name = f'{path.stem}.{variant_digest[:8]}-{w}w.{fmt}'
+            variants.append((fmt, w, cache_name, f'/{OUTPUT_SUBDIR}/{output_name}'))
+
+    info = {
+        'source': path,
+        'digest': digest,
+        'width': width,
+        'height': height,
+        'variants': variants,
+    }
+    _image_info[path] = (signature, info)
+    return info
+
+
+def responsive_image(src, alt='', sizes='100vw', **attrs):
+    """
+    Template helper: render a <picture> element for an image
+
+    One <source> per format lists all widths in srcset; the <img> keeps the
+    original as fallback. Extra keyword arguments become attributes of the
+    <img>; class_ may be used for class. Images that cannot be processed render as
+    a plain <img>.
+    """
+    info = get_image_info(src)
+    img_attrs = {'src': src, 'alt': alt}
+    if info is not None:
+        img_attrs.update(width=info['width'], height=info['height'])
+    img_attrs.update(loading='lazy', decoding='async')
+    for name, value in attrs.items():
+        img_attrs[name.rstrip('_')] = value
+    img = '<img ' + ' '.join(f'{name}="{escape(value)}"' for name, value in img_attrs.items()) + '>'
+
+    if info is None or not info['variants']:
+        return Markup(img)
+
+    sources = []
+    for fmt in dict.fromkeys(fmt for fmt, _, _, _ in info['variants']):
+        srcset = ', '.join(
+            f'{url} {width}w' for variant_fmt, width, _, url in info['variants']
+            if variant_fmt == fmt
+        )
+        sources.append(
+            f'<source type="{MIME_TYPES[fmt]}" srcset="{escape(srcset)}" sizes="{escape(sizes)}">'
+        )
+    return Markup('<picture>' + ''.join(sources) + img + '</picture>')
+
+
+def collect_screenshot_urls(frontmatters):
+    """Return the sorted image URLs referenced by 'screenshots' in frontmatter"""
+    urls = set()
+    for frontmatter in frontmatters:
+        screenshots = frontmatter.get('screenshots') if isinstance(frontmatter, dict) else None
+        if not isinstance(screenshots, list):
+            continue
+        for screenshot in screenshots:
+            if isinstance(screenshot, dict) and isinstance(screenshot.get('image'), str):
+                urls.add(screenshot['image'])
+    return sorted(urls)
+
+
+def image_digest(url):
+    """Digest of the image behind url, or None; pages embedding it record it"""
+    info = get_image_info(url)
+    return info and info['digest']
+
+
+def encode_variants(source, width, targets):
+    """
+    Resize source to width and save it in each format of targets
+
+    targets is a list of (format, cache path). The source is decoded and
+    resized once for all of them.
+    """
+    with Image.open(source) as image:
+        image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            # Alpha bands (LA, PA, ...) and palette or tRNS transparency
+            image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+        if image.width != width:
+            height = round(image.height * width / image.width)
+            image = image.resize((width, height), Image.LANCZOS)
+        for fmt, cache_path in targets:
+            tmp_path = cache_path.with_name(f'.{cache_path.name}.tmp')
+            options = config.RESPONSIVE_IMAGE_ENCODER_OPTIONS.get(fmt, {})
+            image.save(tmp_path, format=fmt.upper(), **options)
+            os.replace(tmp_path, cache_path)
+    return [cache_path for _, cache_path in targets]
+
+
+def _encode_variants_job(job):
+    return encode_variants(*job)
+
+
+class ImageStats:
+    """Counters describing what the image stage did."""
+
+    def __init__(self):
+        self.images = 0
+        self.encoded = 0
+        self.cached = 0
+        self.removed = 0
+
+    def __str__(self):
+        return (
+            f"{self.images} images: {self.encoded} variants encoded, "
+            f"{self.cached} from cache, {self.removed} removed"
+        )
+
+
+def build_image_variants(urls, output, jobs=1):
+    """
+    Make the variants of the images at urls available in the output sink
+
+    Missing variants are encoded into the build cache in a process pool,
+    then every variant is linked into the output. Variants no longer
+    referenced are removed from the output.
+    """
+    cache_dir = Path(config.CACHE_DIR) / 'images'
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    stats = ImageStats()
+
+    wanted = {}
+    missing = {}  # (source, width) -> [(format, cache path)]
+    for url in urls:
+        info = get_image_info(url)
+        if info is None:
+            continue
+        stats.images += 1
+        for fmt, width, cache_name, output_url in info['variants']:
+            cache_path = cache_dir / cache_name
+            wanted[Path(output_url).name] = cache_path
+            if cache_path.exists():
+                stats.cached += 1
+            else:
+                missing.setdefault((info['source'], width), []).append((fmt, cache_path))
+
+    # The largest encodes first, so the pool finishes evenly
+    encode_jobs = sorted(
+        ((source, width, targets) for (source, width), targets in missing.items()),
+        key=lambda job: -job[1],
+    )
+    if jobs > 1 and len(encode_jobs) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(_encode_variants_job, encode_jobs))
+    else:
+        for job in encode_jobs:
+            encode_variants(*job)
+    stats.encoded = sum(len(targets) for _, _, targets in encode_jobs)
+
+    for name, cache_path in wanted.items():
+        output.link(f'{OUTPUT_SUBDIR}/{name}', cache_path)
+
+    for name in output.list(OUTPUT_SUBDIR):
+        if name not in wanted:
+            output.remove(f'{OUTPUT_SUBDIR}/{name}')
+            stats.removed += 1
+
+    return stats
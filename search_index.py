@@ -0,0 +1,310 @@
+"""
+Prebuilt client-side search index
+
+Pages are tokenized while they are rendered: the title, the description and
+the text of the Markdown HTML. The postings are kept in a SQLite database in
+the build cache, so incremental builds only replace the postings of pages
+that were rebuilt. Full builds start from an empty database, so the doc
+ids (and so the shard files) of a full build only depend on its pages.
+
+The index is published as small static JSON files under search/ in the
+output directory:
+
+    search/meta.json          shard layout and document count
+    search/terms/<key>.json   {term: [doc id, weight, doc id, weight, ...]}
+                              for all terms starting with one prefix
+    search/docs/<n>.json      {doc id: [url, title, description]} for
+                              doc ids n * DOCS_PER_SHARD and up
+
+The browser (static/js/search.js) loads meta.json, the term shards of the
+query terms and the doc shards of the best results, never the whole index.
+After an incremental build only the shards whose contents changed are
+rewritten.
+"""
+
+import html
+import json
+import re
+import sqlite3
+from collections import Counter
+from pathlib import Path
+
+# Output directory of the index, relative to the site root
+OUTPUT_SUBDIR = 'search'
+
+# Bump when the tokenizer or the shard format changes
+INDEX_VERSION = 2
+
+# Characters of a term that select its shard
+PREFIX_LENGTH = 2
+
+# Documents per doc shard
+DOCS_PER_SHARD = 256
+
+# Terms shorter or longer than this are not indexed
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 32
+
+# Words on nearly every page; their postings would list most of the site and
+# make their shards the largest, while adding nothing to the ranking
+STOPWORDS = frozenset('''
+    a an and are as at be but by can do for from has have if in into is it its
+    not of on or so that the their them then there these they this to was we
+    were what when which will with you your
+'''.split())
+
+# Weight of one occurrence of a term, by field
+FIELD_WEIGHTS = {
+    'title': 10,
+    'description': 4,
+    'body': 1,
+}
+
+_TERM_RE = re.compile(r'\w+')
+_TAG_RE = re.compile(r'<(script|style)\b.*?</\1\s*>|<[^>]+>', re.DOTALL | re.IGNORECASE)
+_SHARD_KEY_RE = re.compile(r'[a-z0-9]+$')
+
+
+def html_to_text(markup):
+    """Return the text content of an HTML fragment"""
+    return html.unescape(_TAG_RE.sub(' ', markup))
+
+
+def tokenize(text):
+    """Split text into lowercase index terms, leaving out stopwords"""
+    return [
+        term for term in _TERM_RE.findall(text.lower())
+        if MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH and term not in STOPWORDS
+    ]
+
+
+def page_terms(title, description, html_content):
+    """Return {term: weight} for a page, summing the weights of every occurrence"""
+    weights = Counter()
+    for field, text in (('title', title), ('description', description),
+                        ('body', html_to_text(html_content))):
+        if isinstance(text, str):
+            for term in tokenize(text):
+                weights[term] += FIELD_WEIGHTS[field]
+    return dict(weights)
+
+
+def shard_key(term):
+    """Return the shard file name stem for a term; search.js computes the same"""
+    prefix = term[:PREFIX_LENGTH]
+    if _SHARD_KEY_RE.match(prefix):
+        return prefix
+    return '_' + prefix.encode('utf-8').hex()
+
+
+def page_url(output_path):
+    """Return the site URL of an output file path relative to the output root"""
+    url = '/' + Path(output_path).as_posix()
+    if url.endswith('/index.html'):
+        url = url[:-len('index.html')]
+    return url
+
+
+class SearchIndex:
+    """SQLite-backed postings of every page, tracking which shards changed."""
+
+    def __init__(self, db_path, reset=False):
+        """Open the index at db_path; reset discards its contents, for full builds"""
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30)
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        # A new or discarded index holds no pages, so every page must be
+        # rebuilt to fill it
+        self.created = reset or version != INDEX_VERSION
+        if self.created:
+            # The version is only stamped by close(), so an index emptied
+            # by a build that then failed still counts as new next time
+            self.conn.executescript('''
+                DROP TABLE IF EXISTS docs;
+                DROP TABLE IF EXISTS postings;
+                PRAGMA user_version = 0;
+            ''')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                page TEXT NOT NULL UNIQUE,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc INTEGER NOT NULL,
+                weight INTEGER NOT NULL,
+                PRIMARY KEY (term, doc)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc);
+        ''')
+        self.dirty_terms = set()
+        self.dirty_docs = set()
+
+    def close(self):
+        """Commit pending updates and close the database"""
+        if self.created:
+            self.conn.execute(f'PRAGMA user_version = {INDEX_VERSION}')
+        self.conn.commit()
+        self.conn.close()
+
+    def abort(self):
+        """Discard pending updates and close the database"""
+        self.conn.rollback()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # After a failed build the shards of the pages indexed so far were
+        # not written; the pages are not in a saved manifest either, so the
+        # next build indexes them again and writes their shards
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _drop_postings(self, doc_id):
+        terms = self.conn.execute('SELECT term FROM postings WHERE doc = ?', (doc_id,))
+        self.dirty_terms.update(shard_key(term) for (term,) in terms)
+        self.conn.execute('DELETE FROM postings WHERE doc = ?', (doc_id,))
+
+    def update_page(self, page, url, title, description, terms):
+        """Replace the entry of a page; terms is {term: weight}, None to exclude the page"""
+        row = self.conn.execute(
+            'SELECT id, url, title, description FROM docs WHERE page = ?', (page,)
+        ).fetchone()
+        if terms is None:
+            if row is not None:
+                self.remove_page(page)
+            return
+
+        title = title if isinstance(title, str) else ''
+        description = description if isinstance(description, str) else ''
+        if row is None:
+            doc_id = self.conn.execute(
+                'INSERT INTO docs (page, url, title, description) VALUES (?, ?, ?, ?)',
+                (page, url, title, description),
+            ).lastrowid
+            self.dirty_docs.add(doc_id // DOCS_PER_SHARD)
+        else:
+            doc_id = row[0]
+            if row[1:] != (url, title, description):
+                self.conn.execute(
+                    'UPDATE docs SET url = ?, title = ?, description = ? WHERE id = ?',
+                    (url, title, description, doc_id),
+                )
+                self.dirty_docs.add(doc_id // DOCS_PER_SHARD)
+            old = dict(self.conn.execute(
+                'SELECT term, weight FROM postings WHERE doc = ?', (doc_id,)
+            ))
+            if old == terms:
+                return
+            self._drop_postings(doc_id)
+
+        self.conn.executemany(
+            'INSERT INTO postings (term, doc, weight) VALUES (?, ?, ?)',
+            [(term, doc_id, weight) for term, weight in terms.items()],
+        )
+        self.dirty_terms.update(shard_key(term) for term in terms)
+
+    def remove_page(self, page):
+        """Drop a page from the index"""
+        row = self.conn.execute('SELECT id FROM docs WHERE page = ?', (page,)).fetchone()
+        if row is None:
+            return
+        self._drop_postings(row[0])
+        self.conn.execute('DELETE FROM docs WHERE id = ?', (row[0],))
+        self.dirty_docs.add(row[0] // DOCS_PER_SHARD)
+
+    def prune(self, pages):
+        """Drop the pages not in pages"""
+        keep = set(pages)
+        stale = [page for (page,) in self.conn.execute('SELECT page FROM docs') if page not in keep]
+        for page in stale:
+            self.remove_page(page)
+
+    def _term_shard(self, key):
+        postings = {}
+        if key.startswith('_'):
+            prefix = bytes.fromhex(key[1:]).decode('utf-8')
+        else:
+            prefix = key
+        rows = self.conn.execute(
+            'SELECT term, doc, weight FROM postings WHERE term >= ? AND term < ? '
+            'ORDER BY term, weight DESC, doc',
+            (prefix, prefix + '\U0010ffff'),
+        )
+        for term, doc, weight in rows:
+            if shard_key(term) == key:
+                postings.setdefault(term, []).extend((doc, weight))
+        return postings
+
+    def _doc_shard(self, shard):
+        rows = self.conn.execute(
+            'SELECT id, url, title, description FROM docs WHERE id >= ? AND id < ? ORDER BY id',
+            (shard * DOCS_PER_SHARD, (shard + 1) * DOCS_PER_SHARD),
+        )
+        return {str(doc_id): [url, title, description] for doc_id, url, title, description in rows}
+
+    def write(self, output, full=False):
+        """
+        Write the index files into the output sink
+
+        Only shards that changed since the index was opened are written,
+        unless full is set or the output has no index yet. Returns the
+        number of files written or removed. Updates are committed by
+        close(), once the shards are written.
+        """
+        if full or not output.exists(f'{OUTPUT_SUBDIR}/meta.json'):
+            term_keys = {
+                shard_key(term) for (term,) in self.conn.execute('SELECT DISTINCT term FROM postings')
+            }
+            doc_shards = {
+                doc_id // DOCS_PER_SHARD for (doc_id,) in self.conn.execute('SELECT id FROM docs')
+            }
+            # Shards left behind by earlier builds
+            for name in output.list(f'{OUTPUT_SUBDIR}/terms'):
+                if name.endswith('.json'):
+                    term_keys.add(name[:-len('.json')])
+            for name in output.list(f'{OUTPUT_SUBDIR}/docs'):
+                stem = name[:-len('.json')]
+                if name.endswith('.json') and stem.isdigit():
+                    doc_shards.add(int(stem))
+        else:
+            term_keys = self.dirty_terms
+            doc_shards = self.dirty_docs
+
+        changed = 0
+        for directory, keys, read in (('terms', term_keys, self._term_shard),
+                                      ('docs', doc_shards, self._doc_shard)):
+            for key in sorted(keys):
+                changed += self._write_shard(
+                    output, f'{OUTPUT_SUBDIR}/{directory}/{key}.json', read(key),
+                )
+
+        doc_count = self.conn.execute('SELECT COUNT(*) FROM docs').fetchone()[0]
+        meta = {
+            'version': INDEX_VERSION,
+            'prefix_length': PREFIX_LENGTH,
+            'min_term_length': MIN_TERM_LENGTH,
+            'max_term_length': MAX_TERM_LENGTH,
+            'stopwords': sorted(STOPWORDS),
+            'docs_per_shard': DOCS_PER_SHARD,
+            'doc_count': doc_count,
+        }
+        changed += self._write_shard(output, f'{OUTPUT_SUBDIR}/meta.json', meta)
+        self.dirty_terms = set()
+        self.dirty_docs = set()
+        return changed
+
+    @staticmethod
+    def _write_shard(output, rel_path, data):
+        if not data:
+            return int(output.remove(rel_path))
+        encoded = json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        return int(output.write(rel_path, encoded.encode('utf-8')))
@@ -0,0 +1,163 @@
+"""
+Output directory handling for the site generator
+
+Full builds are written into a staging directory next to the live output
+directory and swapped into place once complete, so anything serving the
+output directory always sees a complete site. Individual files are written
+through a temporary file and renamed, so readers never see partial files.
+"""
+
+import contextlib
+import ctypes
+import errno
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+# renameat2() flags (linux/fs.h)
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+
+
+# Buffer size of files written in pieces with open_file_atomic()
+WRITE_BUFFER_SIZE = 64 * 1024
+
+
+@contextlib.contextmanager
+def open_file_atomic(filepath):
+    """
+    Open a buffered binary file that replaces filepath atomically once closed
+
+    The data is written to a temporary file next to filepath, which is
+    renamed over it when the block exits normally and deleted otherwise.
+    """
+    filepath = Path(filepath)
+    tmp_path = filepath.with_name(f'.{filepath.name}.tmp')
+    try:
+        with open(tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            yield f
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+
+def write_file_atomic(filepath, data):
+    """Write bytes to filepath via a temporary file and an atomic rename"""
+    with open_file_atomic(filepath) as f:
+        f.write(data)
+
+
+def write_file_if_changed(filepath, data):
+    """Atomically write bytes to filepath unless it already holds them; return True if written"""
+    filepath = Path(filepath)
+    try:
+        if filepath.stat().st_size == len(data) and filepath.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    write_file_atomic(filepath, data)
+    return True
+
+
+def link_tree(src_dir, dst_dir):
+    """Recreate src_dir at dst_dir using hardlinks, copying where linking fails"""
+    for root, dirs, files in os.walk(src_dir):
+        target_root = Path(dst_dir) / Path(root).relative_to(src_dir)
+        target_root.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            src_path = os.path.join(root, name)
+            try:
+                os.link(src_path, target_root / name)
+            except OSError:
+                shutil.copy2(src_path, target_root / name)
+
+
+def staging_dir_for(output_dir):
+    """Return the staging directory used for full builds of output_dir"""
+    output_dir = Path(output_dir)
+    return output_dir.with_name(f'.{output_dir.name}.staging')
+
+
+def prepare_staging_dir(output_dir, keep=('static',)):
+    """
+    Create an empty staging directory next to output_dir
+
+    Subdirectories listed in keep are seeded with hardlinks to the live
+    output, so later differential stages (such as the static sync) only
+    have to touch what changed. Leftovers from interrupted builds are
+    removed first.
+    """
+    output_dir = Path(output_dir)
+    for leftover in output_dir.parent.glob(f'.{output_dir.name}.*'):
+        if leftover.is_dir():
+            shutil.rmtree(leftover, ignore_errors=True)
+
+    staging_dir = staging_dir_for(output_dir)
+    staging_dir.mkdir(parents=True)
+    for name in keep:
+        if (output_dir / name).is_dir():
+            link_tree(output_dir / name, staging_dir / name)
+    return staging_dir
+
+
+def _exchange_paths(path_a, path_b):
+    """Atomically exchange two paths with renameat2(); return False if unsupported"""
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        renameat2 = libc.renameat2
+    except (OSError, AttributeError):
+        return False
+
+    result = renameat2(
+        AT_FDCWD, os.fsencode(path_a),
+        AT_FDCWD, os.fsencode(path_b),
+        RENAME_EXCHANGE,
+    )
+    if result == 0:
+        return True
+    err = ctypes.get_errno()
+    if err in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+        return False
+    raise OSError(err, os.strerror(err), str(path_a))
+
+
+def remove_tree_in_background(path):
+    """Delete a directory tree on a background thread and return the thread"""
+    thread = threading.Thread(
+        target=shutil.rmtree, args=(path,), kwargs={'ignore_errors': True},
+        name=f'cleanup-{Path(path).name}',
+    )
+    thread.start()
+    return thread
+
+
+def publish_staging_dir(staging_dir, output_dir):
+    """
+    Swap a finished staging directory into place as output_dir
+
+    On Linux both directories are exchanged atomically with renameat2().
+    Elsewhere the old output is renamed aside first, leaving only a
+    window of two renames in which output_dir does not exist. The previous
+    output is deleted on a background thread.
+    """
+    staging_dir = Path(staging_dir)
+    output_dir = Path(output_dir)
+
+    if not output_dir.exists():
+        os.rename(staging_dir, output_dir)
+        return None
+
+    retired_dir = output_dir.with_name(f'.{output_dir.name}.old-{os.getpid()}')
+    if _exchange_paths(staging_dir, output_dir):
+        os.rename(staging_dir, retired_dir)
+    else:
+        os.rename(output_dir, retired_dir)
+        os.rename(staging_dir, output_dir)
+    return remove_tree_in_background(retired_dir)
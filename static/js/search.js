@@ -0,0 +1,144 @@
+/*
+ * Client-side search over the prebuilt index in /search/ (see search_index.py)
+ *
+ * Only meta.json, the term shards of the query terms and the doc shards of
+ * the best results are fetched; shards are cached for the page's lifetime.
+ * The last query word also matches as a prefix, for search-as-you-type.
+ */
+(function () {
+    const INDEX_URL = '/search/';
+    const PREFIX_MATCH_WEIGHT = 0.5;
+    const shards = new Map();
+
+    function load(path) {
+        if (!shards.has(path)) {
+            shards.set(path, fetch(INDEX_URL + path)
+                .then((response) => (response.ok ? response.json() : {}))
+                .catch(() => ({})));
+        }
+        return shards.get(path);
+    }
+
+    // Same terms as search_index.tokenize(), stopwords included; see search()
+    function tokenize(text, meta) {
+        const words = text.toLowerCase().match(/[\p{L}\p{N}\p{M}_]+/gu) || [];
+        return words.filter((word) => {
+            const length = [...word].length;
+            return length >= meta.min_term_length && length <= meta.max_term_length;
+        });
+    }
+
+    // Same file names as search_index.shard_key()
+    function shardKey(term, meta) {
+        const prefix = [...term].slice(0, meta.prefix_length).join('');
+        if (/^[a-z0-9]+$/.test(prefix)) {
+            return prefix;
+        }
+        const bytes = new TextEncoder().encode(prefix);
+        return '_' + Array.from(bytes, (b) => b.toString(16).padStart(2, '0')).join('');
+    }
+
+    async function termScores(term, isPrefix, meta) {
+        const shard = await load(`terms/${shardKey(term, meta)}.json`);
+        const scores = new Map();
+        for (const [candidate, postings] of Object.entries(shard)) {
+            const exact = candidate === term;
+            if (!exact && !(isPrefix && candidate.startsWith(term))) {
+                continue;
+            }
+            const idf = Math.log(1 + meta.doc_count / (postings.length / 2));
+            const factor = exact ? idf : idf * PREFIX_MATCH_WEIGHT;
+            for (let i = 0; i < postings.length; i += 2) {
+                const doc = postings[i];
+                scores.set(doc, (scores.get(doc) || 0) + postings[i + 1] * factor);
+            }
+        }
+        return scores;
+    }
+
+    async function search(query, limit = 10) {
+        const meta = await load('meta.json');
+        if (!meta.doc_count) {
+            return [];
+        }
+        const typing = !/\s$/.test(query);
+        const words = tokenize(query, meta);
+        // Stopwords are not indexed, but a word still being typed may be
+        // the start of a longer one
+        const stopwords = new Set(meta.stopwords || []);
+        const terms = [...new Set(words.filter(
+            (word, i) => !stopwords.has(word) || (typing && i === words.length - 1)
+        ))];
+        if (terms.length === 0) {
+            return [];
+        }
+        const perTerm = await Promise.all(terms.map(
+            (term, i) => termScores(term, typing && i === terms.length - 1, meta)
+        ));
+
+        // Documents must match every term
+        const [first, ...rest] = perTerm;
+        const ranked = [];
+        for (const [doc, score] of first) {
+            let total = score;
+            if (rest.every((scores) => scores.has(doc))) {
+                rest.forEach((scores) => { total += scores.get(doc); });
+                ranked.push([doc, total]);
+            }
+        }
+        ranked.sort((a, b) => b[1] - a[1] || a[0] - b[0]);
+
+        const top = ranked.slice(0, limit);
+        const docShards = await Promise.all(top.map(
+            ([doc]) => load(`docs/${Math.floor(doc / meta.docs_per_shard)}.json`)
+        ));
+        return top.map(([doc, score], i) => {
+            const [url, title, description] = docShards[i][doc] || ['', '', ''];
+            return { url, title, description, score };
+        }).filter((result) => result.url);
+    }
+
+    // Results are cloned from a <template> in the page, so their classes
+    // are part of the rendered HTML and of the generated stylesheet
+    function renderResults(list, status, template, results, query) {
+        list.replaceChildren(...results.map((result) => {
+            const item = template.content.firstElementChild.cloneNode(true);
+            const link = item.querySelector('[data-field="title"]');
+            link.href = result.url;
+            link.textContent = result.title;
+            item.querySelector('[data-field="description"]').textContent = result.description;
+            return item;
+        }));
+        if (!query.trim()) {
+            status.textContent = '';
+        } else if (results.length === 0) {
+            status.textContent = 'No results';
+        } else {
+            status.textContent = `${results.length} result${results.length === 1 ? '' : 's'}`;
+        }
+    }
+
+    function attach(input) {
+        const list = document.getElementById(input.dataset.searchResults);
+        const status = document.getElementById(input.dataset.searchStatus);
+        const template = document.getElementById(input.dataset.searchTemplate);
+        let pending = 0;
+        const update = async () => {
+            const query = input.value;
+            const ticket = ++pending;
+            const results = await search(query);
+            if (ticket === pending) {
+                renderResults(list, status, template, results, query);
+            }
+        };
+        input.addEventListener('input', update);
+        const initial = new URLSearchParams(window.location.search).get('q');
+        if (initial) {
+            input.value = initial;
+            update();
+        }
+    }
+
+    window.SummarumSearch = { search };
+    document.querySelectorAll('input[data-search-results]').forEach(attach);
+})();
@@ -0,0 +1,244 @@
+"""
+Differential static asset sync
+
+Mirrors a source directory into the output directory. Files are compared by
+size and mtime (falling back to a content hash when only the mtime differs),
+so only changed files are transferred and only removed files are deleted.
+
+Transfers never modify an existing output file in place: the new content is
+written to a temporary file next to the target and renamed over it. This
+keeps hardlinked outputs safe and readers never see half-written files.
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl request for cloning a file's extents (Linux btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+
+# Link modes supported by sync_tree()
+LINK_MODES = ('copy', 'hardlink')
+
+
+class SyncStats:
+    """Counters describing what a sync did."""
+
+    def __init__(self):
+        self.copied = 0
+        self.linked = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.bytes_written = 0
+        self.bytes_avoided = 0
+
+    def __str__(self):
+        return (
+            f"{self.copied} copied, {self.linked} linked, {self.removed} removed, "
+            f"{self.unchanged} unchanged ({format_bytes(self.bytes_avoided)} not rewritten)"
+        )
+
+
+def format_bytes(size):
+    """Format a byte count for humans"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _hash_file(filepath):
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.digest()
+
+
+def _is_unchanged(src_stat, src_path, dst_path, link_mode='copy'):
+    """Check whether dst_path already holds the content of src_path"""
+    try:
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return False
+
+    # A hardlink left by 'hardlink' mode is replaced by a copy in 'copy' mode
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        return link_mode == 'hardlink'
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+        return True
+
+    # Same size, different mtime: compare content and re-align the mtime so
+    # the next sync takes the fast path
+    if _hash_file(src_path) != _hash_file(dst_path):
+        return False
+    os.utime(dst_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    return True
+
+
+def _clone_file(src_path, tmp_path):
+    """Try to reflink src_path to tmp_path; return True on success"""
+    if fcntl is None:
+        return False
+    with open(src_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            return False
+    return True
+
+
+def _copy_file(src_path, tmp_path, size):
+    """Copy file data, preferring in-kernel copies over userspace buffers"""
+    if hasattr(os, 'copy_file_range'):
+        with open(src_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            try:
+                remaining = size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+    # shutil uses sendfile() on Linux and fcopyfile() on macOS where possible
+    shutil.copyfile(src_path, tmp_path)
+
+
+def transfer_file(src_path, dst_path, src_stat, link_mode='copy'):
+    """
+    Atomically place the content of src_path at dst_path
+
+    Returns 'linked' when no data had to be written (hardlink or reflink),
+    otherwise 'copied'.
+    """
+    dst_path = Path(dst_path)
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dst_path.with_name(f'.{dst_path.name}.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    try:
+        result = None
+        if link_mode == 'hardlink':
+            try:
+                os.link(src_path, tmp_path)
+                result = 'linked'
+            except OSError:
+                pass
+        if result is None:
+            if _clone_file(src_path, tmp_path):
+                result = 'linked'
+            else:
+                _copy_file(src_path, tmp_path, src_stat.st_size)
+                result = 'copied'
+            shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+    return result
+
+
+def sync_tree(src_dir, dst_dir, link_mode='copy', keep=None, targets=None):
+    """
+    Make dst_dir an exact mirror of src_dir, touching only what changed
+
+    link_mode 'hardlink' links output files to their sources instead of
+    copying them (falling back to copying across filesystems). In 'copy'
+    mode reflinks are used where the filesystem supports them.
+
+    keep is an optional predicate on paths relative to dst_dir; extra files
+    it accepts (e.g. generated variants of synced files) are not removed.
+
+    targets optionally maps the POSIX path of a file relative to src_dir to
+    the paths it is published at in dst_dir (by default its own path).
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode '{link_mode}', expected one of {LINK_MODES}")
+
+    src_dir = Path(src_dir)
+    dst_dir = Path(dst_dir)
+    stats = SyncStats()
+    wanted = set()
+
+    for root, dirs, files in os.walk(src_dir):
+        dirs.sort()
+        rel_root = Path(root).relative_to(src_dir)
+        for name in sorted(files):
+            rel_path = rel_root / name
+            src_path = src_dir / rel_path
+            src_stat = os.stat(src_path)
+            dst_paths = targets(rel_path.as_posix()) if targets else [rel_path]
+            for dst_rel in map(Path, dst_paths):
+                wanted.add(dst_rel)
+                dst_path = dst_dir / dst_rel
+
+                if _is_unchanged(src_stat, src_path, dst_path, link_mode):
+                    stats.unchanged += 1
+                    stats.bytes_avoided += src_stat.st_size
+                    continue
+
+                if transfer_file(src_path, dst_path, src_stat, link_mode) == 'linked':
+                    stats.linked += 1
+                    stats.bytes_avoided += src_stat.st_size
+                else:
+                    stats.copied += 1
+                    stats.bytes_written += src_stat.st_size
+
+    if dst_dir.exists():
+        for root, dirs, files in os.walk(dst_dir, topdown=False):
+            rel_root = Path(root).relative_to(dst_dir)
+            for name in files:
+                rel_path = rel_root / name
+                if rel_path not in wanted and not (keep and keep(rel_path)):
+                    os.unlink(os.path.join(root, name))
+                    stats.removed += 1
+            if root != str(dst_dir) and not os.listdir(root):
+                os.rmdir(root)
+
+    return stats
+
+
+def sync_file(src_dir, dst_dir, rel_path, link_mode='copy'):
+    """
+    Mirror a single file of src_dir into dst_dir
+
+    The file is transferred if it changed and removed from dst_dir if it no
+    longer exists in src_dir. Returns 'copied', 'linked', 'removed' or
+    'unchanged'.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode '{link_mode}', expected one of {LINK_MODES}")
+
+    src_path = Path(src_dir) / rel_path
+    dst_path = Path(dst_dir) / rel_path
+    try:
+        src_stat = os.stat(src_path)
+    except FileNotFoundError:
+        if not dst_path.exists():
+            return 'unchanged'
+        dst_path.unlink()
+        # Drop directories left empty by the file
+        parent = dst_path.parent
+        while parent != Path(dst_dir) and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+        return 'removed'
+
+    if _is_unchanged(src_stat, src_path, dst_path, link_mode):
+        return 'unchanged'
+    return transfer_file(src_path, dst_path, src_stat, link_mode)
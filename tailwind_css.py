@@ -0,0 +1,870 @@
+"""
+Build-time Tailwind CSS
+
+Generates a static stylesheet containing only the Tailwind utility classes
+the rendered pages actually use, instead of loading the Tailwind Play CDN
+and compiling styles in every visitor's browser.
+
+The generator covers Tailwind's preflight and the utilities, variants and
+default theme values this site uses, extended with the theme from
+design_variables.get_tailwind_config(). Classes it does not recognise (the
+site's own classes such as 'markdown-content', or the 'prose' classes that
+the CDN build never provided either) are left to the page stylesheets and
+reported by generate_css().
+"""
+
+import re
+
+# Tailwind's default breakpoints, in cascade order
+SCREENS = {
+    'sm': '640px',
+    'md': '768px',
+    'lg': '1024px',
+    'xl': '1280px',
+    '2xl': '1536px',
+}
+
+# State variants, in cascade order
+PSEUDO_CLASSES = {
+    'first': ':first-child',
+    'last': ':last-child',
+    'odd': ':nth-child(odd)',
+    'even': ':nth-child(even)',
+    'visited': ':visited',
+    'hover': ':hover',
+    'focus': ':focus',
+    'focus-visible': ':focus-visible',
+    'active': ':active',
+    'disabled': ':disabled',
+}
+
+GRAY = {
+    '50': '#f9fafb', '100': '#f3f4f6', '200': '#e5e7eb', '300': '#d1d5db',
+    '400': '#9ca3af', '500': '#6b7280', '600': '#4b5563', '700': '#374151',
+    '800': '#1f2937', '900': '#111827', '950': '#030712',
+}
+
+DEFAULT_COLORS = {
+    'inherit': 'inherit',
+    'current': 'currentColor',
+    'transparent': 'transparent',
+    'black': '#000',
+    'white': '#fff',
+    **{f'gray-{shade}': value for shade, value in GRAY.items()},
+}
+
+DEFAULT_FONT_FAMILY = {
+    'sans': ['ui-sans-serif', 'system-ui', 'sans-serif', '"Apple Color Emoji"',
+             '"Segoe UI Emoji"', '"Segoe UI Symbol"', '"Noto Color Emoji"'],
+    'mono': ['ui-monospace', 'SFMono-Regular', 'Menlo', 'Monaco', 'Consolas',
+             '"Liberation Mono"', '"Courier New"', 'monospace'],
+}
+
+SPACING = {'px': '1px', '0': '0px'}
+for _step in (0.5, 1, 1.5, 2, 2.5, 3, 3.5, 4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 16, 20,
+              24, 28, 32, 36, 40, 44, 48, 52, 56, 60, 64, 72, 80, 96):
+    SPACING[f'{_step:g}'] = f'{_step / 4:g}rem'
+
+FRACTIONS = {
+    f'{n}/{d}': f'{n / d * 100:.6g}%'
+    for d in (2, 3, 4, 5, 6, 12) for n in range(1, d)
+}
+
+FONT_SIZES = {
+    'xs': ('0.75rem', '1rem'),
+    'sm': ('0.875rem', '1.25rem'),
+    'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'),
+    'xl': ('1.25rem', '1.75rem'),
+    '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'),
+    '4xl': ('2.25rem', '2.5rem'),
+    '5xl': ('3rem', '1'),
+    '6xl': ('3.75rem', '1'),
+    '7xl': ('4.5rem', '1'),
+    '8xl': ('6rem', '1'),
+    '9xl': ('8rem', '1'),
+}
+
+FONT_WEIGHTS = {
+    'thin': '100', 'extralight': '200', 'light': '300', 'normal': '400',
+    'medium': '500', 'semibold': '600', 'bold': '700', 'extrabold': '800',
+    'black': '900',
+}
+
+MAX_WIDTHS = {
+    'none': 'none', '0': '0rem', 'xs': '20rem', 'sm': '24rem', 'md': '28rem',
+    'lg': '32rem', 'xl': '36rem', '2xl': '42rem', '3xl': '48rem', '4xl': '56rem',
+    '5xl': '64rem', '6xl': '72rem', '7xl': '80rem', 'full': '100%',
+    'min': 'min-content', 'max': 'max-content', 'fit': 'fit-content',
+    'prose': '65ch',
+    **{f'screen-{name}': value for name, value in SCREENS.items()},
+}
+
+BORDER_RADIUS = {
+    'none': '0px', 'sm': '0.125rem', '': '0.25rem', 'md': '0.375rem',
+    'lg': '0.5rem', 'xl': '0.75rem', '2xl': '1rem', '3xl': '1.5rem',
+    'full': '9999px',
+}
+
+BOX_SHADOWS = {
+    'sm': ('0 1px 2px 0 rgb(0 0 0 / 0.05)', '0 1px 2px 0 var(--tw-shadow-color)'),
+    '': ('0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+         '0 1px 3px 0 var(--tw-shadow-color), 0 1px 2px -1px var(--tw-shadow-color)'),
+    'md': ('0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+           '0 4px 6px -1px var(--tw-shadow-color), 0 2px 4px -2px var(--tw-shadow-color)'),
+    'lg': ('0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+           '0 10px 15px -3px var(--tw-shadow-color), 0 4px 6px -4px var(--tw-shadow-color)'),
+    'xl': ('0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+           '0 20px 25px -5px var(--tw-shadow-color), 0 8px 10px -6px var(--tw-shadow-color)'),
+    '2xl': ('0 25px 50px -12px rgb(0 0 0 / 0.25)', '0 25px 50px -12px var(--tw-shadow-color)'),
+    'none': ('0 0 #0000', '0 0 #0000'),
+}
+
+LETTER_SPACING = {
+    'tighter': '-0.05em', 'tight': '-0.025em', 'normal': '0em',
+    'wide': '0.025em', 'wider': '0.05em', 'widest': '0.1em',
+}
+
+LINE_HEIGHTS = {
+    'none': '1', 'tight': '1.25', 'snug': '1.375', 'normal': '1.5',
+    'relaxed': '1.625', 'loose': '2',
+    **{str(n): f'{n / 4:g}rem' for n in range(3, 11)},
+}
+
+OPACITY = {str(n): f'{n / 100:g}' for n in (0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50,
+                                           55, 60, 65, 70, 75, 80, 85, 90, 95, 100)}
+
+SCALE = {str(n): f'{n / 100:g}' for n in (0, 50, 75, 90, 95, 100, 105, 110, 125, 150)}
+
+GRADIENT_DIRECTIONS = {
+    't': 'to top', 'tr': 'to top right', 'r': 'to right', 'br': 'to bottom right',
+    'b': 'to bottom', 'bl': 'to bottom left', 'l': 'to left', 'tl': 'to top left',
+}
+
+TRANSITION_TIMING = 'transition-timing-function:cubic-bezier(0.4, 0, 0.2, 1);transition-duration:150ms'
+
+TRANSFORM = (
+    'transform:translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) '
+    'skewX(var(--tw-skew-x)) skewY(var(--tw-skew-y)) scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))'
+)
+
+BOX_SHADOW = 'box-shadow:var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)'
+
+# Utilities without a value, by core plugin
+STATIC_UTILITIES = {
+    'sr_only': {
+        'sr-only': 'position:absolute;width:1px;height:1px;padding:0;margin:-1px;overflow:hidden;'
+                   'clip:rect(0, 0, 0, 0);white-space:nowrap;border-width:0',
+    },
+    'position': {
+        'static': 'position:static', 'fixed': 'position:fixed', 'absolute': 'position:absolute',
+        'relative': 'position:relative', 'sticky': 'position:sticky',
+    },
+    'auto_margins': {'mx-auto': 'margin-left:auto;margin-right:auto', 'my-auto': 'margin-top:auto;margin-bottom:auto',
+     'ml-auto': 'margin-left:auto', 'mr-auto': 'margin-right:auto',
+     'mt-auto': 'margin-top:auto', 'mb-auto': 'margin-bottom:auto'},
+    'display': {
+        'block': 'display:block', 'inline-block': 'display:inline-block', 'inline': 'display:inline',
+        'flex': 'display:flex', 'inline-flex': 'display:inline-flex', 'table': 'display:table',
+        'grid': 'display:grid', 'inline-grid': 'display:inline-grid', 'contents': 'display:contents',
+        'list-item': 'display:list-item', 'hidden': 'display:none',
+    },
+    'height_keywords': {'h-auto': 'height:auto', 'h-full': 'height:100%', 'h-screen': 'height:100vh',
+     'h-min': 'height:min-content', 'h-max': 'height:max-content', 'h-fit': 'height:fit-content'},
+    'min_height_keywords': {'min-h-0': 'min-height:0px', 'min-h-full': 'min-height:100%', 'min-h-screen': 'min-height:100vh'},
+    'width_keywords': {'w-auto': 'width:auto', 'w-full': 'width:100%', 'w-screen': 'width:100vw',
+     'w-min': 'width:min-content', 'w-max': 'width:max-content', 'w-fit': 'width:fit-content'},
+    'flex': {'flex-1': 'flex:1 1 0%', 'flex-auto': 'flex:1 1 auto', 'flex-initial': 'flex:0 1 auto',
+     'flex-none': 'flex:none'},
+    'flex_shrink': {'flex-shrink': 'flex-shrink:1', 'flex-shrink-0': 'flex-shrink:0', 'shrink': 'flex-shrink:1',
+     'shrink-0': 'flex-shrink:0'},
+    'flex_grow': {'flex-grow': 'flex-grow:1', 'flex-grow-0': 'flex-grow:0', 'grow': 'flex-grow:1', 'grow-0': 'flex-grow:0'},
+    'transform': {'transform': TRANSFORM, 'transform-none': 'transform:none'},
+    'cursor': {'cursor-pointer': 'cursor:pointer', 'cursor-default': 'cursor:default'},
+    'list_style': {'list-none': 'list-style-type:none', 'list-disc': 'list-style-type:disc',
+     'list-decimal': 'list-style-type:decimal'},
+    'flex_direction': {'flex-row': 'flex-direction:row', 'flex-row-reverse': 'flex-direction:row-reverse',
+     'flex-col': 'flex-direction:column', 'flex-col-reverse': 'flex-direction:column-reverse'},
+    'flex_wrap': {'flex-wrap': 'flex-wrap:wrap', 'flex-wrap-reverse': 'flex-wrap:wrap-reverse',
+     'flex-nowrap': 'flex-wrap:nowrap'},
+    'align_items': {'items-start': 'align-items:flex-start', 'items-end': 'align-items:flex-end',
+     'items-center': 'align-items:center', 'items-baseline': 'align-items:baseline',
+     'items-stretch': 'align-items:stretch'},
+    'justify_content': {'justify-start': 'justify-content:flex-start', 'justify-end': 'justify-content:flex-end',
+     'justify-center': 'justify-content:center', 'justify-between': 'justify-content:space-between',
+     'justify-around': 'justify-content:space-around', 'justify-evenly': 'justify-content:space-evenly'},
+    'overflow': {'overflow-auto': 'overflow:auto', 'overflow-hidden': 'overflow:hidden',
+     'overflow-visible': 'overflow:visible', 'overflow-scroll': 'overflow:scroll',
+     'overflow-x-auto': 'overflow-x:auto', 'overflow-y-auto': 'overflow-y:auto'},
+    'truncate': {'truncate': 'overflow:hidden;text-overflow:ellipsis;white-space:nowrap'},
+    'whitespace': {'whitespace-normal': 'white-space:normal', 'whitespace-nowrap': 'white-space:nowrap',
+     'whitespace-pre': 'white-space:pre', 'whitespace-pre-wrap': 'white-space:pre-wrap'},
+    'word_break': {'break-words': 'overflow-wrap:break-word', 'break-all': 'word-break:break-all'},
+    'border_style': {'border-solid': 'border-style:solid', 'border-dashed': 'border-style:dashed',
+     'border-dotted': 'border-style:dotted', 'border-none': 'border-style:none'},
+    'bg_none': {'bg-none': 'background-image:none'},
+    'background_clip': {'bg-clip-border': '-webkit-background-clip:border-box;background-clip:border-box',
+     'bg-clip-padding': '-webkit-background-clip:padding-box;background-clip:padding-box',
+     'bg-clip-content': '-webkit-background-clip:content-box;background-clip:content-box',
+     'bg-clip-text': '-webkit-background-clip:text;background-clip:text'},
+    'object_fit': {'object-contain': 'object-fit:contain', 'object-cover': 'object-fit:cover'},
+    'text_align': {'text-left': 'text-align:left', 'text-center': 'text-align:center',
+     'text-right': 'text-align:right', 'text-justify': 'text-align:justify'},
+    'vertical_align': {'align-middle': 'vertical-align:middle', 'align-top': 'vertical-align:top'},
+    'text_transform': {'uppercase': 'text-transform:uppercase', 'lowercase': 'text-transform:lowercase',
+     'capitalize': 'text-transform:capitalize', 'normal-case': 'text-transform:none'},
+    'font_style': {'italic': 'font-style:italic', 'not-italic': 'font-style:normal'},
+    'text_decoration': {'underline': 'text-decoration-line:underline', 'line-through': 'text-decoration-line:line-through',
+     'no-underline': 'text-decoration-line:none'},
+    'font_smoothing': {'antialiased': '-webkit-font-smoothing:antialiased;-moz-osx-font-smoothing:grayscale'},
+    'outline': {'outline-none': 'outline:2px solid transparent;outline-offset:2px'},
+    'transition': {'transition-none': 'transition-property:none',
+     'transition-all': f'transition-property:all;{TRANSITION_TIMING}',
+     'transition': 'transition-property:color, background-color, border-color, text-decoration-color, '
+                   'fill, stroke, opacity, box-shadow, transform, filter, -webkit-backdrop-filter;'
+                   'transition-property:color, background-color, border-color, text-decoration-color, '
+                   f'fill, stroke, opacity, box-shadow, transform, filter, backdrop-filter;{TRANSITION_TIMING}',
+     'transition-colors': 'transition-property:color, background-color, border-color, '
+                          f'text-decoration-color, fill, stroke;{TRANSITION_TIMING}',
+     'transition-opacity': f'transition-property:opacity;{TRANSITION_TIMING}',
+     'transition-shadow': f'transition-property:box-shadow;{TRANSITION_TIMING}',
+     'transition-transform': f'transition-property:transform;{TRANSITION_TIMING}'},
+}
+
+PREFLIGHT = '''\
+*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+::before,::after{--tw-content:''}
+html,:host{line-height:1.5;-webkit-text-size-adjust:100%;-moz-tab-size:4;tab-size:4;font-family:{sans};font-feature-settings:normal;font-variation-settings:normal;-webkit-tap-highlight-color:transparent}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+abbr:where([title]){-webkit-text-decoration:underline dotted;text-decoration:underline dotted}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+code,kbd,samp,pre{font-family:{mono};font-feature-settings:normal;font-variation-settings:normal;font-size:1em}
+small{font-size:80%}
+sub,sup{font-size:75%;line-height:0;position:relative;vertical-align:baseline}
+sub{bottom:-0.25em}
+sup{top:-0.5em}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-feature-settings:inherit;font-variation-settings:inherit;font-size:100%;font-weight:inherit;line-height:inherit;letter-spacing:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,input:where([type='button']),input:where([type='reset']),input:where([type='submit']){-webkit-appearance:button;background-color:transparent;background-image:none}
+:-moz-focusring{outline:auto}
+:-moz-ui-invalid{box-shadow:none}
+progress{vertical-align:baseline}
+::-webkit-inner-spin-button,::-webkit-outer-spin-button{height:auto}
+[type='search']{-webkit-appearance:textfield;outline-offset:-2px}
+::-webkit-search-decoration{-webkit-appearance:none}
+::-webkit-file-upload-button{-webkit-appearance:button;font:inherit}
+summary{display:list-item}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+dialog{padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]:where(:not([hidden="until-found"])){display:none}
+*,::before,::after,::backdrop{--tw-translate-x:0;--tw-translate-y:0;--tw-rotate:0;--tw-skew-x:0;--tw-skew-y:0;--tw-scale-x:1;--tw-scale-y:1;--tw-gradient-from-position: ;--tw-gradient-via-position: ;--tw-gradient-to-position: ;--tw-ring-offset-shadow:0 0 #0000;--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000;--tw-shadow-colored:0 0 #0000}
+'''
+
+_CLASS_ATTR_RE = re.compile(r'''\sclass\s*=\s*(?:"([^"]*)"|'([^']*)')''', re.IGNORECASE)
+_HEX_RE = re.compile(r'#([0-9a-fA-F]{3}|[0-9a-fA-F]{6})$')
+_CALC_OPERATOR_RE = re.compile(r'(?<=[\w%)])([+\-*/])(?=[\d.(]|var\()')
+
+
+def extract_classes(html):
+    """Return the set of class names used in an HTML document"""
+    classes = set()
+    for match in _CLASS_ATTR_RE.finditer(html):
+        classes.update((match.group(1) or match.group(2) or '').split())
+    return classes
+
+
+class ClassCollector:
+    """Collect the class names used in an HTML document that arrives in chunks."""
+
+    def __init__(self):
+        self.classes = set()
+        self._tail = ''
+
+    def feed(self, chunk):
+        # Everything from the last '<' on may be a tag that is still incomplete
+        text = self._tail + chunk
+        cut = text.rfind('<')
+        if cut == -1:
+            cut = len(text)
+        self.classes.update(extract_classes(text[:cut]))
+        self._tail = text[cut:]
+
+    def close(self):
+        """Return the set of class names"""
+        self.classes.update(extract_classes(self._tail))
+        self._tail = ''
+        return self.classes
+
+
+def css_escape(name):
+    """Escape a class name for use in a CSS selector"""
+    out = []
+    for i, char in enumerate(name):
+        if char.isalnum() and char.isascii() or char in '-_':
+            if i == 0 and char.isdigit():
+                out.append(f'\\{ord(char):x} ')
+            else:
+                out.append(char)
+        else:
+            out.append('\\' + char)
+    return ''.join(out)
+
+
+def _split_variants(name):
+    """Split 'md:hover:w-[calc(1px+2px)]' into (['md', 'hover'], 'w-[calc(1px+2px)]')"""
+    parts = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(name):
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == ':' and depth == 0:
+            parts.append(name[start:i])
+            start = i + 1
+    parts.append(name[start:])
+    return parts[:-1], parts[-1]
+
+
+def _arbitrary(value):
+    """Return the CSS value of an arbitrary '[...]' value, or None"""
+    if not (value.startswith('[') and value.endswith(']')) or len(value) < 3:
+        return None
+    value = value[1:-1].replace('_', ' ')
+    # Tailwind adds the spaces calc() requires around + and -
+    if re.match(r'(calc|min|max|clamp)\(', value):
+        value = _CALC_OPERATOR_RE.sub(r' \1 ', value)
+    return value
+
+
+def _hex_to_rgb(value):
+    match = _HEX_RE.match(value)
+    if not match:
+        return None
+    digits = match.group(1)
+    if len(digits) == 3:
+        digits = ''.join(c * 2 for c in digits)
+    return ' '.join(str(int(digits[i:i + 2], 16)) for i in (0, 2, 4))
+
+
+class Theme:
+    """Tailwind's default theme values, extended with the site's config."""
+
+    def __init__(self, tailwind_config=None):
+        tailwind_config = tailwind_config or {}
+        self.colors = dict(DEFAULT_COLORS)
+        for name, value in tailwind_config.get('colors', {}).items():
+            if isinstance(value, dict):
+                for shade, shade_value in value.items():
+                    key = name if shade == 'DEFAULT' else f'{name}-{shade}'
+                    self.colors[key] = shade_value
+            else:
+                self.colors[name] = value
+        self.font_family = dict(DEFAULT_FONT_FAMILY)
+        self.font_family.update(tailwind_config.get('fontFamily', {}))
+
+    def font_stack(self, name):
+        family = self.font_family.get(name)
+        if family is None:
+            return None
+        return ', '.join(family) if isinstance(family, (list, tuple)) else family
+
+    def color(self, value):
+        """Resolve 'brand-orange' or 'black/50' to (css color, rgb triple or None, alpha)"""
+        alpha = None
+        if '/' in value and not value.startswith('['):
+            value, opacity = value.rsplit('/', 1)
+            alpha = OPACITY.get(opacity) or _arbitrary(opacity)
+            if alpha is None:
+                return None
+        color = self.colors.get(value)
+        if color is None:
+            color = _arbitrary(value)
+            if color is None or not (color.startswith('#') or color.startswith(('rgb', 'hsl'))):
+                return None
+        return color, _hex_to_rgb(color), alpha
+
+
+def _color_declarations(theme, value, prop, opacity_var=None):
+    """Declarations setting prop to a theme color, honouring Tailwind's opacity variables"""
+    resolved = theme.color(value)
+    if resolved is None:
+        return None
+    color, rgb, alpha = resolved
+    if rgb is None:
+        return f'{prop}:{color}'
+    if alpha is not None:
+        return f'{prop}:rgb({rgb} / {alpha})'
+    if opacity_var is None:
+        return f'{prop}:rgb({rgb} / 1)'
+    return f'{opacity_var}:1;{prop}:rgb({rgb} / var({opacity_var}))'
+
+
+def _transparent(theme, value):
+    resolved = theme.color(value.split('/')[0])
+    if resolved and resolved[1]:
+        return f'rgb({resolved[1]} / 0)'
+    return 'rgb(255 255 255 / 0)'
+
+
+def _spacing(value, negative=False):
+    css = SPACING.get(value) or _arbitrary(value)
+    if css is None:
+        return None
+    return f'-{css}' if negative and css not in ('0px', '0') else css
+
+
+def _sizing(value, extra):
+    return SPACING.get(value) or FRACTIONS.get(value) or extra.get(value) or _arbitrary(value)
+
+
+MARGIN_PROPS = {
+    'm': ('margin',), 'mx': ('margin-left', 'margin-right'), 'my': ('margin-top', 'margin-bottom'),
+    'mt': ('margin-top',), 'mr': ('margin-right',), 'mb': ('margin-bottom',), 'ml': ('margin-left',),
+}
+PADDING_PROPS = {
+    'p': ('padding',), 'px': ('padding-left', 'padding-right'), 'py': ('padding-top', 'padding-bottom'),
+    'pt': ('padding-top',), 'pr': ('padding-right',), 'pb': ('padding-bottom',), 'pl': ('padding-left',),
+}
+INSET_PROPS = {
+    'inset': ('inset',), 'inset-x': ('left', 'right'), 'inset-y': ('top', 'bottom'),
+    'top': ('top',), 'right': ('right',), 'bottom': ('bottom',), 'left': ('left',),
+}
+BORDER_SIDES = {'': ('',), 't': ('-top',), 'r': ('-right',), 'b': ('-bottom',), 'l': ('-left',),
+                'x': ('-left', '-right'), 'y': ('-top', '-bottom')}
+ROUNDED_SIDES = {'': ('',), 't': ('-top-left', '-top-right'), 'r': ('-top-right', '-bottom-right'),
+                 'b': ('-bottom-right', '-bottom-left'), 'l': ('-top-left', '-bottom-left')}
+
+
+def _prefixed(utility, prefixes):
+    """Split 'mx-4' into ('mx', '4') for the longest matching prefix"""
+    for prefix in sorted(prefixes, key=len, reverse=True):
+        if utility.startswith(prefix + '-'):
+            return prefix, utility[len(prefix) + 1:]
+    return None, None
+
+
+def _resolve_inset(utility, theme):
+    negative = utility.startswith('-')
+    prefix, value = _prefixed(utility.lstrip('-'), INSET_PROPS)
+    if prefix is None:
+        return None
+    css = {'auto': 'auto', 'full': '100%'}.get(value) or FRACTIONS.get(value) or _spacing(value)
+    if css is None:
+        return None
+    css = f'-{css}' if negative else css
+    return ';'.join(f'{prop}:{css}' for prop in INSET_PROPS[prefix])
+
+
+def _resolve_z_index(utility, theme):
+    if utility.startswith('z-'):
+        value = utility[2:]
+        if value in ('0', '10', '20', '30', '40', '50', 'auto'):
+            return f'z-index:{value}'
+    return None
+
+
+def _resolve_margin(utility, theme):
+    negative = utility.startswith('-')
+    prefix, value = _prefixed(utility.lstrip('-'), MARGIN_PROPS)
+    if prefix is None:
+        return None
+    css = _spacing(value, negative)
+    if css is None:
+        return None
+    return ';'.join(f'{prop}:{css}' for prop in MARGIN_PROPS[prefix])
+
+
+def _resolve_height(utility, theme):
+    if utility.startswith('h-'):
+        css = _sizing(utility[2:], {})
+        return css and f'height:{css}'
+    return None
+
+
+def _resolve_min_height(utility, theme):
+    if utility.startswith('min-h-'):
+        css = _arbitrary(utility[6:])
+        return css and f'min-height:{css}'
+    return None
+
+
+def _resolve_width(utility, theme):
+    if utility.startswith('w-'):
+        css = _sizing(utility[2:], {})
+        return css and f'width:{css}'
+    return None
+
+
+def _resolve_max_width(utility, theme):
+    if utility.startswith('max-w-'):
+        value = utility[6:]
+        css = MAX_WIDTHS.get(value) or _arbitrary(value)
+        return css and f'max-width:{css}'
+    return None
+
+
+def _resolve_scale(utility, theme):
+    prefix, value = _prefixed(utility, ('scale', 'scale-x', 'scale-y'))
+    css = SCALE.get(value) or (value and _arbitrary(value))
+    if prefix is None or css is None:
+        return None
+    axes = {'scale': ('x', 'y'), 'scale-x': ('x',), 'scale-y': ('y',)}[prefix]
+    return ''.join(f'--tw-scale-{axis}:{css};' for axis in axes) + TRANSFORM
+
+
+def _resolve_grid_cols(utility, theme):
+    if utility.startswith('grid-cols-'):
+        value = utility[10:]
+        if value.isdigit() and 1 <= int(value) <= 12:
+            return f'grid-template-columns:repeat({value}, minmax(0, 1fr))'
+        if value == 'none':
+            return 'grid-template-columns:none'
+        css = _arbitrary(value)
+        return css and f'grid-template-columns:{css}'
+    return None
+
+
+def _resolve_gap(utility, theme):
+    prefix, value = _prefixed(utility, ('gap', 'gap-x', 'gap-y'))
+    css = prefix and _spacing(value)
+    if not css:
+        return None
+    prop = {'gap': 'gap', 'gap-x': 'column-gap', 'gap-y': 'row-gap'}[prefix]
+    return f'{prop}:{css}'
+
+
+def _resolve_space(utility, theme):
+    negative = utility.startswith('-')
+    prefix, value = _prefixed(utility.lstrip('-'), ('space-x', 'space-y'))
+    css = prefix and _spacing(value, negative)
+    if not css:
+        return None
+    if prefix == 'space-x':
+        declarations = (f'--tw-space-x-reverse:0;margin-right:calc({css} * var(--tw-space-x-reverse));'
+                        f'margin-left:calc({css} * calc(1 - var(--tw-space-x-reverse)))')
+    else:
+        declarations = (f'--tw-space-y-reverse:0;margin-top:calc({css} * calc(1 - var(--tw-space-y-reverse)));'
+                        f'margin-bottom:calc({css} * var(--tw-space-y-reverse))')
+    return ('{} > :not([hidden]) ~ :not([hidden])', declarations)
+
+
+def _resolve_rounded(utility, theme):
+    if utility != 'rounded' and not utility.startswith('rounded-'):
+        return None
+    rest = utility[8:]
+    side, size = '', rest
+    if rest in ROUNDED_SIDES:
+        side, size = rest, ''
+    elif '-' in rest and rest.split('-', 1)[0] in ROUNDED_SIDES:
+        side, size = rest.split('-', 1)
+    css = BORDER_RADIUS.get(size) or _arbitrary(size)
+    if css is None:
+        return None
+    return ';'.join(f'border{corner}-radius:{css}' for corner in ROUNDED_SIDES[side])
+
+
+def _resolve_border_width(utility, theme):
+    if utility != 'border' and not utility.startswith('border-'):
+        return None
+    rest = utility[7:]
+    side, width = '', rest
+    if rest in BORDER_SIDES:
+        side, width = rest, ''
+    elif '-' in rest and rest.split('-', 1)[0] in BORDER_SIDES:
+        side, width = rest.split('-', 1)
+    css = {'': '1px', '0': '0px', '2': '2px', '4': '4px', '8': '8px'}.get(width)
+    if css is None:
+        return None
+    return ';'.join(f'border{edge}-width:{css}' for edge in BORDER_SIDES[side])
+
+
+def _resolve_border_color(utility, theme):
+    if utility.startswith('border-'):
+        return _color_declarations(theme, utility[7:], 'border-color', '--tw-border-opacity')
+    return None
+
+
+def _resolve_border_opacity(utility, theme):
+    if utility.startswith('border-opacity-') and utility[15:] in OPACITY:
+        return f'--tw-border-opacity:{OPACITY[utility[15:]]}'
+    return None
+
+
+def _resolve_bg_color(utility, theme):
+    if utility.startswith('bg-'):
+        return _color_declarations(theme, utility[3:], 'background-color', '--tw-bg-opacity')
+    return None
+
+
+def _resolve_bg_opacity(utility, theme):
+    if utility.startswith('bg-opacity-') and utility[11:] in OPACITY:
+        return f'--tw-bg-opacity:{OPACITY[utility[11:]]}'
+    return None
+
+
+def _resolve_bg_gradient(utility, theme):
+    if utility.startswith('bg-gradient-to-') and utility[15:] in GRADIENT_DIRECTIONS:
+        return f'background-image:linear-gradient({GRADIENT_DIRECTIONS[utility[15:]]}, var(--tw-gradient-stops))'
+    return None
+
+
+def _resolve_gradient_stops(utility, theme):
+    prefix, value = _prefixed(utility, ('from', 'via', 'to'))
+    if prefix is None:
+        return None
+    resolved = theme.color(value)
+    if resolved is None:
+        return None
+    color, rgb, alpha = resolved
+    if rgb is not None:
+        color = f'rgb({rgb} / {alpha})' if alpha is not None else color
+    transparent = _transparent(theme, value)
+    if prefix == 'from':
+        return (f'--tw-gradient-from:{color} var(--tw-gradient-from-position);'
+                f'--tw-gradient-to:{transparent} var(--tw-gradient-to-position);'
+                '--tw-gradient-stops:var(--tw-gradient-from), var(--tw-gradient-to)')
+    if prefix == 'via':
+        return (f'--tw-gradient-to:{transparent} var(--tw-gradient-to-position);'
+                f'--tw-gradient-stops:var(--tw-gradient-from), {color} var(--tw-gradient-via-position), '
+                'var(--tw-gradient-to)')
+    return f'--tw-gradient-to:{color} var(--tw-gradient-to-position)'
+
+
+def _resolve_padding(utility, theme):
+    prefix, value = _prefixed(utility, PADDING_PROPS)
+    css = prefix and _spacing(value)
+    if not css:
+        return None
+    return ';'.join(f'{prop}:{css}' for prop in PADDING_PROPS[prefix])
+
+
+def _resolve_font_family(utility, theme):
+    if utility.startswith('font-'):
+        stack = theme.font_stack(utility[5:])
+        return stack and f'font-family:{stack}'
+    return None
+
+
+def _resolve_font_size(utility, theme):
+    if utility.startswith('text-'):
+        value = utility[5:]
+        if value in FONT_SIZES:
+            size, line_height = FONT_SIZES[value]
+            return f'font-size:{size};line-height:{line_height}'
+        css = _arbitrary(value)
+        if css and re.match(r'[\d.]+(px|rem|em|%|vw|vh)$|clamp\(', css):
+            return f'font-size:{css}'
+    return None
+
+
+def _resolve_font_weight(utility, theme):
+    if utility.startswith('font-') and utility[5:] in FONT_WEIGHTS:
+        return f'font-weight:{FONT_WEIGHTS[utility[5:]]}'
+    return None
+
+
+def _resolve_line_height(utility, theme):
+    if utility.startswith('leading-'):
+        css = LINE_HEIGHTS.get(utility[8:]) or _arbitrary(utility[8:])
+        return css and f'line-height:{css}'
+    return None
+
+
+def _resolve_letter_spacing(utility, theme):
+    if utility.startswith('tracking-'):
+        css = LETTER_SPACING.get(utility[9:]) or _arbitrary(utility[9:])
+        return css and f'letter-spacing:{css}'
+    return None
+
+
+def _resolve_text_color(utility, theme):
+    if utility.startswith('text-'):
+        return _color_declarations(theme, utility[5:], 'color', '--tw-text-opacity')
+    return None
+
+
+def _resolve_text_opacity(utility, theme):
+    if utility.startswith('text-opacity-') and utility[13:] in OPACITY:
+        return f'--tw-text-opacity:{OPACITY[utility[13:]]}'
+    return None
+
+
+def _resolve_opacity(utility, theme):
+    if utility.startswith('opacity-') and utility[8:] in OPACITY:
+        return f'opacity:{OPACITY[utility[8:]]}'
+    return None
+
+
+def _resolve_shadow(utility, theme):
+    if utility != 'shadow' and not utility.startswith('shadow-'):
+        return None
+    shadow = BOX_SHADOWS.get(utility[7:])
+    if shadow is None:
+        return None
+    return f'--tw-shadow:{shadow[0]};--tw-shadow-colored:{shadow[1]};{BOX_SHADOW}'
+
+
+def _resolve_duration(utility, theme):
+    if utility.startswith('duration-') and utility[9:].isdigit():
+        return f'transition-duration:{utility[9:]}ms'
+    return None
+
+
+def _static(group):
+    utilities = STATIC_UTILITIES[group]
+
+    def resolve(utility, theme):
+        return utilities.get(utility)
+    return resolve
+
+
+# Resolvers in Tailwind's core plugin order, which is also the order of the
+# generated rules; the first resolver that accepts a utility wins
+RESOLVERS = [
+    _static('sr_only'),
+    _static('position'),
+    _resolve_inset,
+    _resolve_z_index,
+    _static('auto_margins'),
+    _resolve_margin,
+    _static('display'),
+    _static('height_keywords'),
+    _resolve_height,
+    _static('min_height_keywords'),
+    _resolve_min_height,
+    _static('width_keywords'),
+    _resolve_width,
+    _resolve_max_width,
+    _static('flex'),
+    _static('flex_shrink'),
+    _static('flex_grow'),
+    _static('transform'),
+    _resolve_scale,
+    _static('cursor'),
+    _static('list_style'),
+    _resolve_grid_cols,
+    _static('flex_direction'),
+    _static('flex_wrap'),
+    _static('align_items'),
+    _static('justify_content'),
+    _resolve_gap,
+    _resolve_space,
+    _static('overflow'),
+    _static('truncate'),
+    _static('whitespace'),
+    _static('word_break'),
+    _resolve_rounded,
+    _resolve_border_width,
+    _static('border_style'),
+    _resolve_border_color,
+    _resolve_border_opacity,
+    _resolve_bg_color,
+    _resolve_bg_opacity,
+    _static('bg_none'),
+    _resolve_bg_gradient,
+    _resolve_gradient_stops,
+    _static('background_clip'),
+    _static('object_fit'),
+    _resolve_padding,
+    _static('text_align'),
+    _static('vertical_align'),
+    _resolve_font_family,
+    _resolve_font_size,
+    _resolve_font_weight,
+    _static('text_transform'),
+    _static('font_style'),
+    _resolve_line_height,
+    _resolve_letter_spacing,
+    _resolve_text_color,
+    _resolve_text_opacity,
+    _static('text_decoration'),
+    _static('font_smoothing'),
+    _resolve_opacity,
+    _resolve_shadow,
+    _static('outline'),
+    _static('transition'),
+    _resolve_duration,
+]
+
+
+def resolve_class(name, theme):
+    """
+    Resolve a class name to a rule
+
+    Returns (sort key, media query or None, selector, declarations), or
+    None when the class is not a known Tailwind utility.
+    """
+    variants, utility = _split_variants(name)
+    screen = None
+    pseudo = ''
+    pseudo_rank = 0
+    for variant in variants:
+        if variant in SCREENS and screen is None:
+            screen = variant
+        elif variant in PSEUDO_CLASSES:
+            pseudo += PSEUDO_CLASSES[variant]
+            pseudo_rank = max(pseudo_rank, list(PSEUDO_CLASSES).index(variant) + 1)
+        else:
+            return None
+
+    for rank, resolver in enumerate(RESOLVERS):
+        result = resolver(utility, theme)
+        if result:
+            break
+    else:
+        return None
+
+    selector_template, declarations = result if isinstance(result, tuple) else ('{}', result)
+    selector = selector_template.format('.' + css_escape(name) + pseudo)
+    screen_rank = list(SCREENS).index(screen) + 1 if screen else 0
+    media = f'(min-width: {SCREENS[screen]})' if screen else None
+    return (screen_rank, pseudo_rank, rank, name), media, selector, declarations
+
+
+def generate_css(classes, tailwind_config=None):
+    """
+    Generate the stylesheet for a set of class names
+
+    Returns (css, unknown), unknown being the sorted class names that are
+    not Tailwind utilities.
+    """
+    theme = Theme(tailwind_config)
+    rules = []
+    unknown = []
+    for name in classes:
+        rule = resolve_class(name, theme)
+        if rule is None:
+            unknown.append(name)
+        else:
+            rules.append(rule)
+    rules.sort(key=lambda rule: rule[0])
+
+    lines = [PREFLIGHT.replace('{sans}', theme.font_stack('sans')).replace('{mono}', theme.font_stack('mono'))]
+    current_media = None
+    for _, media, selector, declarations in rules:
+        if media != current_media:
+            if current_media is not None:
+                lines.append('}\n')
+            if media is not None:
+                lines.append(f'@media {media}{{\n')
+            current_media = media
+        lines.append(f'{selector}{{{declarations}}}\n')
+    if current_media is not None:
+        lines.append('}\n')
+    return ''.join(lines), sorted(unknown)
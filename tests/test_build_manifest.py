@@ -0,0 +1,23 @@
+"""Regression tests for build_manifest"""
+
+import json
+
+from build_manifest import BuildManifest
+from output_sink import MemorySink
+
+
+def test_class_sets_are_stored_once_and_pruned(tmp_path):
+    path = tmp_path / 'manifest.json'
+    source = tmp_path / 'page.md'
+    source.write_text('# Page')
+    output = MemorySink()
+    manifest = BuildManifest(path)
+    for key, classes in [('a.md', {'flex', 'p-4'}), ('b.md', {'p-4', 'flex'}), ('c.md', {'grid'})]:
+        manifest.record_page(key, source, 'digest', {}, {}, {}, output, f'{key}.html', 'out', classes)
+    manifest.forget_page('c.md')
+    manifest.save()
+
+    data = json.loads(path.read_text())
+    assert list(data['class_sets'].values()) == [['flex', 'p-4']]
+    assert data['pages']['a.md']['classes'] == data['pages']['b.md']['classes']
+    assert BuildManifest.load(path).used_classes() == {'flex', 'p-4'}
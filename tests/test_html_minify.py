@@ -0,0 +1,58 @@
+"""Regression tests for html_minify"""
+
+from html_minify import minify_chunks, minify_html, minify_js
+
+
+def test_quoted_gt_in_attribute_value():
+    html = '<meta name="description" content="Budgets > savings, for 2 < 3" >'
+    assert minify_html(html) == '<meta name="description" content="Budgets > savings, for 2 < 3">'
+
+
+def test_single_quoted_gt_and_self_closing_tag():
+    html = "<img src=\"a  b.png\"   alt='x />' />"
+    assert minify_html(html) == "<img src=\"a  b.png\" alt='x />'/>"
+
+
+def test_space_before_self_closing_slash_kept_after_unquoted_value():
+    assert minify_html('<a href=foo />x</a>') == '<a href=foo />x</a>'
+
+
+def test_template_literal_kept_verbatim():
+    js = '''
+        const text = `first
+            // not a comment
+        ${ {a: 1}.a } last`;   // a comment
+    '''
+    assert minify_js(js) == '''const text = `first
+            // not a comment
+        ${ {a: 1}.a } last`;'''
+
+
+def test_strings_and_regexes_kept_verbatim():
+    js = '''
+        var url = "http://example.com";  /* block
+        comment */
+        var re = /\\/\\/x"/g, half = url.length / 2;
+    '''
+    assert minify_js(js) == (
+        'var url = "http://example.com";\n'
+        'var re = /\\/\\/x"/g, half = url.length / 2;'
+    )
+
+
+def test_script_element_with_template_literal():
+    html = '<script>\n    const t = `a\n    b`;\n</script>'
+    assert minify_html(html) == '<script>const t = `a\n    b`;</script>'
+
+
+def test_streaming_matches_batch_across_quoted_gt():
+    html = (
+        '<html><head><meta name="description" content="Budgets > savings, for 2 < 3" >'
+        "</head><body><p title='a > b'>Hi</p>\n <script>const t = `x\n  y`;</script></body></html>"
+    )
+    expected = minify_html(html)
+    boundary = html.index('> savings')
+    # Every split point, including the one right inside the quoted value
+    for split in [boundary, boundary + 1, *range(1, len(html))]:
+        assert ''.join(minify_chunks([html[:split], html[split:]])) == expected
+    assert ''.join(minify_chunks(html)) == expected
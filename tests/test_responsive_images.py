@@ -0,0 +1,21 @@
+"""Regression tests for responsive_images"""
+
+import pytest
+
+from responsive_images import encode_variants
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def test_alpha_band_survives_encoding(tmp_path):
+    image = Image.new('LA', (8, 8), (0, 0))
+    image.paste((255, 255), (0, 0, 4, 8))
+    source = tmp_path / 'source.png'
+    image.save(source)
+
+    cache_path = tmp_path / 'variant.webp'
+    encode_variants(source, 8, [('webp', cache_path)])
+    with Image.open(cache_path) as variant:
+        assert variant.mode == 'RGBA'
+        assert variant.getpixel((7, 0))[3] == 0
+        assert variant.getpixel((0, 0))[3] == 255
@@ -0,0 +1,46 @@
+"""Regression tests for search_index"""
+
+import pytest
+
+from output_sink import MemorySink
+from search_index import SearchIndex, page_terms
+
+
+def test_failed_build_leaves_no_unwritten_updates(tmp_path):
+    db_path = tmp_path / 'search.sqlite'
+    output = MemorySink()
+    with SearchIndex(db_path) as index:
+        index.update_page('a.md', '/a.html', 'A', '', {'alpha': 1})
+        index.write(output)
+
+    # The build fails after indexing a page, before writing its shards
+    with pytest.raises(RuntimeError):
+        with SearchIndex(db_path) as index:
+            index.update_page('a.md', '/a.html', 'A', '', {'zebra': 1})
+            raise RuntimeError('build failed')
+    assert not output.exists('search/terms/ze.json')
+
+    # The next build indexes the page again, so its shards are written
+    with SearchIndex(db_path) as index:
+        index.update_page('a.md', '/a.html', 'A', '', {'zebra': 1})
+        index.write(output)
+    assert output.exists('search/terms/ze.json')
+    assert not output.exists('search/terms/al.json')
+
+
+def test_interrupted_reset_is_reset_again(tmp_path):
+    db_path = tmp_path / 'search.sqlite'
+    with SearchIndex(db_path) as index:
+        index.update_page('a.md', '/a.html', 'A', '', {'alpha': 1})
+
+    with pytest.raises(RuntimeError):
+        with SearchIndex(db_path, reset=True):
+            raise RuntimeError('build failed')
+
+    with SearchIndex(db_path) as index:
+        assert index.created
+
+
+def test_stopwords_are_not_indexed():
+    terms = page_terms('The balance of an account', '', '<p>Track <em>the</em> total</p>')
+    assert sorted(terms) == ['account', 'balance', 'total', 'track']
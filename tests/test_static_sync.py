@@ -0,0 +1,31 @@
+"""Regression tests for static_sync"""
+
+import os
+
+from static_sync import sync_tree
+
+
+def test_targets_publish_one_copy_under_each_name(tmp_path):
+    src = tmp_path / 'static'
+    (src / 'images').mkdir(parents=True)
+    (src / 'images' / 'logo.svg').write_text('<svg/>')
+    (src / 'images' / 'shot.png').write_text('png')
+    dst = tmp_path / 'out'
+    names = {
+        'images/logo.svg': ['images/logo.1234abcd.svg', 'images/logo.svg'],
+        'images/shot.png': ['images/shot.5678abcd.png'],
+    }
+
+    sync_tree(src, dst, targets=names.get)
+    assert sorted(p.relative_to(dst).as_posix() for p in dst.rglob('*') if p.is_file()) == [
+        'images/logo.1234abcd.svg', 'images/logo.svg', 'images/shot.5678abcd.png',
+    ]
+
+    # A hardlink to the source, as left by 'hardlink' mode, becomes a copy,
+    # so editing the source in place cannot change the published file
+    published = dst / 'images' / 'shot.5678abcd.png'
+    published.unlink()
+    os.link(src / 'images' / 'shot.png', published)
+    stats = sync_tree(src, dst, targets=names.get)
+    assert stats.copied + stats.linked == 1
+    assert not os.path.samefile(src / 'images' / 'shot.png', published)